@@ -0,0 +1,104 @@
+"""
+Pages per second of the `default` and `lean` driver profiles against a local
+static site. Every page pulls a stylesheet, web fonts, images and a tracker
+script; assets are served with a delay to stand in for real network latency,
+and the tracker is served from a second "third-party" origin.
+
+    python scripts/bench_driver_profile.py --pages 60 --threads 4
+"""
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from oslm_crawler.crawler.utils import WebDriverPool, LEAN_BLOCKED_URLS
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--pages", type=int, default=60, help="Number of pages crawled per profile.")
+parser.add_argument("--threads", type=int, default=4, help="Size of the driver pool.")
+parser.add_argument("--latency", type=float, default=0.2, help="Seconds of delay for every asset.")
+parser.add_argument("--cache-dir", default=None, help="Shared cache root for the lean profile.")
+args = parser.parse_args()
+
+PAGE = """<!doctype html>
+<html><head>
+<link rel="stylesheet" href="/static/site.css">
+<script async src="http://{tracker}/collect.js"></script>
+</head><body><main>
+<h1>model-{i}</h1>
+<header><a href="#">Community <span>{i}</span></a></header>
+<div class="downloads">Downloads last month <span id="downloads">{downloads}</span></div>
+{images}
+</main></body></html>
+"""
+CSS = b"@font-face{font-family:f;src:url(/static/font.woff2)}body{font-family:f}"
+
+
+def make_handler(tracker: str):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.startswith('/models/'):
+                i = int(self.path.rsplit('/', 1)[-1])
+                images = "".join(f'<img src="/static/img-{i}-{k}.png">' for k in range(8))
+                body = PAGE.format(i=i, downloads=i * 7, images=images, tracker=tracker).encode()
+                content_type = 'text/html'
+            else:
+                time.sleep(args.latency)
+                body = CSS if self.path.endswith('.css') else b"\0" * 20_000
+                content_type = 'text/css' if self.path.endswith('.css') else 'application/octet-stream'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'max-age=3600')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(handler) -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"127.0.0.1:{server.server_address[1]}"
+
+
+def scrape(pool: WebDriverPool, url: str) -> str:
+    with pool.get_driver() as driver:
+        driver.get(url)
+        return WebDriverWait(driver, 30).until(
+            EC.visibility_of_element_located((By.ID, 'downloads'))).text
+
+
+def bench(profile: str, base: str, tracker: str) -> float:
+    cache_dir = args.cache_dir if profile == 'lean' else None
+    blocked = LEAN_BLOCKED_URLS + [f"*{tracker}*"] if profile == 'lean' else None
+    urls = [f"http://{base}/models/{i}" for i in range(args.pages)]
+    with WebDriverPool(args.threads, profile=profile, cache_dir=cache_dir, blocked_urls=blocked) as pool:
+        # Warm up every driver before timing.
+        with ThreadPoolExecutor(args.threads) as executor:
+            list(executor.map(lambda u: scrape(pool, u), urls[:args.threads]))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as executor:
+            results = list(executor.map(lambda u: scrape(pool, u), urls))
+        elapsed = time.perf_counter() - start
+    assert results == [str(i * 7) for i in range(args.pages)]
+    return args.pages / elapsed
+
+
+# Third-party origin: a second server that is as slow as the asset host.
+tracker_server, tracker = serve(make_handler(''))
+site_server, base = serve(make_handler(tracker))
+try:
+    for profile in ['default', 'lean']:
+        print(f"{profile:>8}: {bench(profile, base, tracker):.2f} pages/s")
+finally:
+    site_server.shutdown()
+    tracker_server.shutdown()
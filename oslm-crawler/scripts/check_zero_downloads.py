@@ -4,11 +4,15 @@ import argparse
 from loguru import logger
 from pathlib import Path
 from tqdm import tqdm
-from oslm_crawler.ai.screenshot_checker import check_image_info, CheckRequest
+from oslm_crawler.ai.screenshot_checker import verify_screenshots, CheckRequest
 
 
 parser = argparse.ArgumentParser()
 parser.add_argument("--from-log", help="Recover from log files instead of using AI to check.")
+parser.add_argument("--batch-size", type=int, default=32, help="Number of screenshots checked concurrently in one batch.")
+parser.add_argument("--max-side", type=int, default=1024, help="Screenshots are downscaled to this longer side before the check.")
+parser.add_argument("--crop", type=float, nargs=4, metavar=("LEFT", "TOP", "RIGHT", "BOTTOM"),
+                    help="Part of the screenshots holding the downloads, as fractions of the page. The whole page by default.")
 parser.add_argument("path", help="The location of the files to be checked must be the raw files crawled by ModelScope.")
 args = parser.parse_args()
 
@@ -36,32 +40,33 @@ else:
     path = Path(args.path)
     logger.remove()
     logger.add(path.parent / 'check.log', level="DEBUG")
-    buffer = []
     count = 0
-    total = 0
     with jsonlines.open(path, 'r') as f:
-        for item in f:
-            if item['total_downloads'] == 0 and item['img_path'] and Path(item['img_path']).exists():
-                total += 1
+        buffer = list(f)
+    candidates = []
+    for item in buffer:
+        assert 'total_downloads' in item
+        if item['total_downloads'] == 0 and item['img_path'] and Path(item['img_path']).exists():
+            candidates.append(item)
+    total = len(candidates)
     pbar = tqdm(total=total, desc="Error correction...")
-    with jsonlines.open(path, 'r') as f:
-        for item in f:
-            assert 'total_downloads' in item
-            if item['total_downloads'] == 0 and item['img_path'] and Path(item['img_path']).exists():
-                request = CheckRequest(item['img_path'], item['link'], 'ModelScope')
-                response = check_image_info([request])[0]
-                pbar.update(1)
-                if response.downloads is not None and response.downloads > 0:
-                    downloads = response.downloads
-                    logger.warning(f"Data error: {item}, downloads corrected from {item['total_downloads']} to {downloads}")
-                    count += 1
-                    item['total_downloads'] = downloads
-                elif response.downloads is not None and response.downloads == 0:
-                    count += 1
-                    logger.info("zero downloads.")
-                else:
-                    logger.error(f"Generate error: {response}")
-            buffer.append(item)
+    for i in range(0, total, args.batch_size):
+        batch = candidates[i:i + args.batch_size]
+        requests = [CheckRequest(item['img_path'], item['link'], 'ModelScope', args.max_side, args.crop) for item in batch]
+        responses = {response.link: response for response in verify_screenshots(requests)}
+        pbar.update(len(batch))
+        for item in batch:
+            response = responses.get(item['link'])
+            if response is not None and response.downloads is not None and response.downloads > 0:
+                downloads = response.downloads
+                logger.warning(f"Data error: {item}, downloads corrected from {item['total_downloads']} to {downloads}")
+                count += 1
+                item['total_downloads'] = downloads
+            elif response is not None and response.downloads is not None and response.downloads == 0:
+                count += 1
+                logger.info("zero downloads.")
+            else:
+                logger.error(f"Generate error: {response}")
     pbar.close()
     print(f'successful: {count}, total: {total}')
 
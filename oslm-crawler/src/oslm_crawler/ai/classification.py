@@ -0,0 +1,54 @@
+import itertools
+from typing import Any, Callable, Generator
+from loguru import logger
+from ..pipeline.engine import AsyncCrawlEngine
+
+
+class ClassificationService:
+    """
+    Runs LLM classification batches (`gen_model_info_*`, `gen_dataset_info_*`)
+    in the background, at most `concurrency` of them in flight and, with `rate`,
+    at most `rate` started per second. `submit` parks the records of a batch
+    until `completed` hands them back together with the infos of their links.
+    A batch that fails comes back with no infos.
+    """
+
+    def __init__(self, concurrency: int = 4, rate: float | None = None):
+        self.concurrency = concurrency
+        self.rate = rate
+        self._engine = None
+        self._ids = itertools.count()
+        self._parked = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._parked)
+
+    def submit(self, classify: Callable[[list[str]], list], links: list[str], records: Any):
+        if self._engine is None:
+            self._engine = AsyncCrawlEngine(self.concurrency, per_host=self.concurrency, rate=self.rate)
+            self._engine.start()
+        batch = next(self._ids)
+        self._parked[batch] = records
+        # All batches share one host, so `rate` limits the service as a whole.
+        self._engine.submit(batch, self._classify, classify, links, host='llm')
+
+    @staticmethod
+    def _classify(classify: Callable[[list[str]], list], links: list[str]) -> list:
+        try:
+            return classify(links)
+        except Exception:
+            logger.exception(f"Classification of {len(links)} links failed.")
+            return []
+
+    def completed(self, block: bool = False) -> Generator[tuple[Any, list], None, None]:
+        """Yield `(records, infos)` of the finished batches. With `block`, wait for at least one."""
+        if self._engine is None:
+            return
+        for batch, infos in self._engine.poll(block):
+            yield self._parked.pop(batch), infos
+
+    def close(self):
+        if self._engine is not None:
+            self._engine.close()
+            self._engine = None
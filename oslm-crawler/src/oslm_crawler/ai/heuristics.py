@@ -0,0 +1,165 @@
+"""
+Local pre-classifier of model repos, tried before `gen_model_info_*`. It guesses
+`modality` and `is_large_model` from name patterns, the pipeline tag of the
+detail page and the labels of siblings in the same repo; only guesses below the
+confidence threshold are left to the LLM.
+"""
+import re
+from dataclasses import dataclass
+from collections import Counter, defaultdict
+from typing import Mapping, Optional
+from loguru import logger
+
+Label = tuple[Optional[str], Optional[bool]]
+
+# (name, pattern on the lowercased model name, label, prior confidence). The
+# prior is blended with how often the rule agrees with the labeled models.
+NAME_RULES: list[tuple[str, str, Label, float]] = [
+    ('embedding', r'(^|[-_.])(bge|gte|e5|embed|embedding|embeddings|reranker|rerank|minilm|mpnet|sentence)([-_.]|$)',
+     ('Vector', True), 0.9),
+    ('speech', r'(^|[-_.])(whisper|tts|asr|wav2vec2?|hubert|cosyvoice|sensevoice|paraformer|conformer|'
+               r'fastconformer|sambert|vits|bark|speecht5|voice|audio|ctc|transducer)([-_.]|$)',
+     ('Speech', True), 0.85),
+    ('vision-language', r'(^|[-_.])(vl|vlm|llava|internvl\d*(\.\d+)?|paligemma\d*|clip|siglip\d*|blip\d*|'
+                        r'mobileclip\d*|omni|pix2struct)([-_.]|$)',
+     ('Multimodal', True), 0.85),
+    ('vision', r'(^|[-_.])(vit|dinov2|dinov3|sam|sam2|segformer|mask2former|detr|yolo\w*|mae|swin|convnext)([-_.]|$)',
+     ('Vision', True), 0.8),
+    ('protein', r'(^|[-_.])(esm\w*|protein\w*|prot\w*)([-_.]|$)', ('Protein', True), 0.85),
+    ('pre-llm', r'(^|[-_.])(bert|roberta|albert|distilbert|deberta(-?v\d)?|electra|xlm|t5|mt5|byt5|codet5|'
+                r'bart|mbart|tapas|marian|opus-mt|stanza)([-_.]|$)',
+     (None, False), 0.85),
+]
+
+# (label, confidence) of a pipeline tag. The labeled models carry no tags to
+# calibrate against, so generic tags whose models are labeled several ways
+# (gpt2 and Qwen under text-generation, ModernBERT under fill-mask, Stable
+# Diffusion as Multimodal and Vision) stay below the default threshold: they
+# only count next to a name rule or siblings.
+PIPELINE_TAGS: dict[str, tuple[Label, float]] = {
+    'feature-extraction': (('Vector', True), 0.6),
+    'sentence-similarity': (('Vector', True), 0.95),
+    'text-ranking': (('Vector', True), 0.95),
+    'automatic-speech-recognition': (('Speech', True), 0.95),
+    'text-to-speech': (('Speech', True), 0.95),
+    'text-to-audio': (('Speech', True), 0.9),
+    'audio-to-audio': (('Speech', True), 0.9),
+    'audio-classification': (('Speech', True), 0.85),
+    'voice-activity-detection': (('Speech', True), 0.85),
+    'image-text-to-text': (('Multimodal', True), 0.95),
+    'visual-question-answering': (('Multimodal', True), 0.9),
+    'video-text-to-text': (('Multimodal', True), 0.95),
+    'any-to-any': (('Multimodal', True), 0.95),
+    'text-to-image': (('Multimodal', True), 0.6),
+    'text-to-video': (('Multimodal', True), 0.6),
+    'image-to-text': (('Multimodal', True), 0.6),
+    'zero-shot-image-classification': (('Multimodal', True), 0.85),
+    'image-classification': (('Vision', True), 0.8),
+    'object-detection': (('Vision', True), 0.8),
+    'image-segmentation': (('Vision', True), 0.8),
+    'mask-generation': (('Vision', True), 0.85),
+    'depth-estimation': (('Vision', True), 0.85),
+    'image-to-image': (('Vision', True), 0.6),
+    'image-to-video': (('Vision', True), 0.6),
+    'image-to-3d': (('3D', True), 0.9),
+    'text-to-3d': (('3D', True), 0.9),
+    'robotics': (('Embodied', True), 0.9),
+    'text-generation': (('Language', True), 0.6),
+    'fill-mask': ((None, False), 0.6),
+}
+
+# Size, precision and chat/instruct suffixes that do not change what a model is.
+_VARIANT = re.compile(
+    r'^(\d+(\.\d+)?[bmk]|a\d+(\.\d+)?b|v?\d+(\.\d+)*|base|large|small|tiny|mini|medium|xl|xxl|instruct|chat|it|hf|'
+    r'gguf|awq|gptq|int[48]|fp8|fp16|bf16|\d+bit|preview|thinking)$'
+)
+
+
+@dataclass
+class Guess:
+    modality: Optional[str]
+    is_large_model: Optional[bool]
+    confidence: float
+    rule: str
+
+    @property
+    def label(self) -> Label:
+        return self.modality, self.is_large_model
+
+
+def family(name: str) -> str:
+    return '-'.join(t for t in re.split(r'[-_.\s]+', name.lower()) if t and not _VARIANT.match(t))
+
+
+class ModelHeuristics:
+    """
+    Built from the labeled models (`model-info`). Each name rule is trusted as much
+    as its prior, shrunk towards its agreement with those labels; siblings vote
+    with confidence n/(n+1) for n agreeing labeled models of the same family.
+    `classify` returns a guess only at `threshold` or above.
+    """
+
+    def __init__(self, infos: Mapping[str, dict], threshold: float = 0.85, shrink: int = 10):
+        self.threshold = threshold
+        self.families: dict[tuple[str, str], Counter] = defaultdict(Counter)
+        rule_hits = {name: Counter() for name, *_ in NAME_RULES}
+        self._rules = [(name, re.compile(pattern), label, prior) for name, pattern, label, prior in NAME_RULES]
+        for key, info in infos.items():
+            if '/' not in key or not isinstance(info, dict):
+                continue
+            label = (info.get('modality') or None, info.get('is_large_model'))
+            if label[1] is None:
+                continue
+            repo, name = key.rsplit('/', 1)
+            self.families[(repo.lower(), family(name))][label] += 1
+            for rule, pattern, rule_label, _ in self._rules:
+                if pattern.search(name.lower()):
+                    rule_hits[rule][rule_label == label] += 1
+        self.confidence = {}
+        for rule, _, _, prior in self._rules:
+            hits = rule_hits[rule]
+            self.confidence[rule] = (hits[True] + prior * shrink) / (hits[True] + hits[False] + shrink)
+        self.saved = Counter()
+
+    def guesses(self, key: str, metadata: dict | None = None) -> list[Guess]:
+        repo, name = key.rsplit('/', 1)
+        res = []
+        for rule, pattern, label, _ in self._rules:
+            if pattern.search(name.lower()):
+                res.append(Guess(*label, self.confidence[rule], f'name:{rule}'))
+        tag = (metadata or {}).get('pipeline_tag')
+        if tag in PIPELINE_TAGS:
+            label, confidence = PIPELINE_TAGS[tag]
+            res.append(Guess(*label, confidence, f'pipeline_tag:{tag}'))
+        siblings = self.families.get((repo.lower(), family(name)))
+        if siblings:
+            label, n = siblings.most_common(1)[0]
+            total = sum(siblings.values())
+            res.append(Guess(*label, n / (total + 1), 'siblings'))
+        return res
+
+    def classify(self, key: str, metadata: dict | None = None) -> Guess | None:
+        guesses = sorted(self.guesses(key, metadata), key=lambda g: g.confidence, reverse=True)
+        if not guesses:
+            return None
+        best = guesses[0]
+        # A dissenting signal takes away what it is sure of.
+        dissent = max((g.confidence for g in guesses[1:] if g.label != best.label), default=0)
+        confidence = best.confidence * (1 - dissent)
+        if confidence < self.threshold:
+            return None
+        return Guess(best.modality, best.is_large_model, confidence, best.rule)
+
+    def learn(self, key: str, label: Label):
+        """Count a new label, so later siblings of the same family can follow it."""
+        repo, name = key.rsplit('/', 1)
+        self.families[(repo.lower(), family(name))][label] += 1
+
+    def record(self, guess: Guess):
+        self.saved[guess.rule.split(':')[0]] += 1
+
+    def report(self, buffer_size: int):
+        total = sum(self.saved.values())
+        if total:
+            calls = -(-total // buffer_size)
+            logger.info(f"Heuristics classified {total} models locally ({dict(self.saved)}), saving ~{calls} LLM calls.")
@@ -0,0 +1,184 @@
+"""
+On-disk cache of LLM classifications, so links that are already settled cost no
+tokens on the next run. Entries are keyed by (link, prompt hash, model name); the
+raw response of each batch is stored once, addressed by its sha256.
+"""
+import json
+import time
+import yaml
+import sqlite3
+import hashlib
+import threading
+import functools
+from pathlib import Path
+from contextvars import ContextVar
+from typing import Any, Callable
+from loguru import logger
+
+ROOT_PATH = Path(__file__).parents[3]
+CONFIG_PATH = ROOT_PATH / 'config/env.yaml'
+
+_raw_response: ContextVar[list | None] = ContextVar('_raw_response', default=None)
+
+
+def prompt_hash(*prompts: str) -> str:
+    return hashlib.sha256('\0'.join(prompts).encode('utf-8')).hexdigest()[:16]
+
+
+def record_response(raw: str):
+    """Called by a classify function once its response parsed; only such batches are cached."""
+    responses = _raw_response.get()
+    if responses is not None:
+        responses.append(raw)
+
+
+class LLMCache:
+    """
+    `ttl_days` bounds the age of settled results, `negative_ttl_days` the age of
+    results with undetermined fields, after which their links are asked again.
+    `None` keeps them forever.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_days: float | None = None,
+        negative_ttl_days: float | None = 90,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_days = ttl_days
+        self.negative_ttl_days = negative_ttl_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                link TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                model TEXT NOT NULL,
+                result TEXT NOT NULL,
+                settled INTEGER NOT NULL,
+                response TEXT,
+                created REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS responses (sha TEXT PRIMARY KEY, raw TEXT NOT NULL);
+        """)
+
+    @staticmethod
+    def key(link: str, prompt: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}\0{link.rstrip('/')}".encode('utf-8')).hexdigest()
+
+    def get(self, link: str, prompt: str, model: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, settled, created FROM results WHERE key = ?", (self.key(link, prompt, model),)
+            ).fetchone()
+        if row is None:
+            return None
+        result, settled, created = row
+        ttl = self.ttl_days if settled else self.negative_ttl_days
+        if ttl is not None and time.time() - created > ttl * 86400:
+            return None
+        return json.loads(result)
+
+    def put(self, results: list[tuple[str, dict, bool]], prompt: str, model: str, raw: str | None = None):
+        """Store `(link, result, settled)` of one batch together with its raw response."""
+        sha = hashlib.sha256(raw.encode('utf-8')).hexdigest() if raw is not None else None
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if sha is not None:
+                    self._conn.execute("INSERT OR IGNORE INTO responses (sha, raw) VALUES (?, ?)", (sha, raw))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results "
+                    "(key, link, prompt, model, result, settled, response, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (self.key(link, prompt, model), link, prompt, model,
+                         json.dumps(result, ensure_ascii=False), int(settled), sha, now)
+                        for link, result, settled in results
+                    ],
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def default_cache() -> LLMCache | None:
+    """The cache configured by `LLM_CACHE` in config/env.yaml, None when disabled."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            conf = {}
+            if CONFIG_PATH.exists():
+                with CONFIG_PATH.open('r', encoding='utf-8') as f:
+                    conf = (yaml.safe_load(f) or {}).get('LLM_CACHE') or {}
+            if not conf.get('enabled', True):
+                _cache = False
+            else:
+                _cache = LLMCache(
+                    conf.get('path') or ROOT_PATH / '.cache/llm-cache.db',
+                    conf.get('ttl_days'),
+                    conf.get('negative_ttl_days', 90),
+                )
+        return _cache or None
+
+
+def cached(
+    model: str,
+    prompt: str,
+    info_cls: type,
+    settled: Callable[[Any], bool],
+    cache: Callable[[], LLMCache | None] = default_cache,
+):
+    """
+    Serve the links of a classify function (`urls -> infos`) from the cache and
+    send only the others to the LLM. `settled` tells whether an info is final;
+    the others are cached for the shorter negative TTL. Batches whose response
+    was not recorded with `record_response` (failed parses) are not cached.
+    """
+
+    def decorator(fn: Callable[[list[str]], list]):
+
+        @functools.wraps(fn)
+        def wrapper(urls: list[str]) -> list:
+            store = cache()
+            if store is None:
+                return fn(urls)
+            hits = {url: store.get(url, prompt, model) for url in urls}
+            misses = [url for url in urls if hits[url] is None]
+            if len(misses) < len(urls):
+                logger.debug(f"LLM cache: {len(urls) - len(misses)} of {len(urls)} links cached.")
+            returned = []
+            if misses:
+                responses = []
+                token = _raw_response.set(responses)
+                try:
+                    returned = fn(misses)
+                finally:
+                    _raw_response.reset(token)
+                if responses:
+                    infos = {info.link.rstrip('/'): info for info in returned}
+                    store.put([
+                        # Links the LLM left out are remembered as asked, with an empty result.
+                        (url, infos[url.rstrip('/')].model_dump(), settled(infos[url.rstrip('/')]))
+                        if url.rstrip('/') in infos else (url, {}, False)
+                        for url in misses
+                    ], prompt, model, '\n'.join(responses))
+            return [info_cls(**hits[url]) for url in urls if hits[url]] + list(returned)
+
+        return wrapper
+
+    return decorator
@@ -12,6 +12,8 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from pydantic import BaseModel, Field
 from typing import Literal, Optional
+from ..budget import llm_call
+from .llm_cache import cached, prompt_hash, record_response
 
 SCRIPT_PATH = Path(__file__)
 ROOT_PATH = SCRIPT_PATH.parents[3]
@@ -33,8 +35,13 @@ class ModelInfoList(BaseModel):
     infos: list[ModelInfo] = Field(description="The list of model information")
 
 
-llm_web_search = init_chat_model("grok-3-all", model_provider="openai")
-llm_json_parse = init_chat_model("gpt-5", model_provider="openai")
+# Models behind each classify function, also the keys of their cached answers.
+MODELSCOPE_MODEL = "kimi-k2-0905-preview"
+WEB_SEARCH_MODEL = "grok-3-all"
+JSON_PARSE_MODEL = "gpt-5"
+
+llm_web_search = init_chat_model(WEB_SEARCH_MODEL, model_provider="openai")
+llm_json_parse = init_chat_model(JSON_PARSE_MODEL, model_provider="openai")
 
 web_search_prompt = """\
 You are an expert in modern machine learning and model classification. Your task is to search all the following model repository links (HuggingFace or Modelscope), and judge based on the webpage information:
@@ -89,12 +96,11 @@ chain = (
 
 client = OpenAI(
     api_key=os.environ.get("MOONSHOT_API_KEY"),
-    base_url="https://api.moonshot.cn/v1",
+    base_url=os.environ.get("MOONSHOT_API_BASE", "https://api.moonshot.cn/v1"),
 )
 
 
-def gen_model_info_modelscope(urls: list[str]) -> list[ModelInfo]:
-    system_prompt = """\
+modelscope_system_prompt = """\
 You are an expert in modern machine learning and model classification.
 
 Your task:
@@ -120,12 +126,21 @@ Return your results in the following JSON format:
 }
 """
 
+
+def _settled(info: ModelInfo) -> bool:
+    # Anything the LLM could not determine is asked again once the negative TTL runs out.
+    return info.is_large_model is False or (info.is_large_model is True and info.modality is not None)
+
+
+@cached(MODELSCOPE_MODEL, prompt_hash(modelscope_system_prompt), ModelInfo, _settled)
+@llm_call()
+def gen_model_info_modelscope(urls: list[str]) -> list[ModelInfo]:
     user_prompt = "Here are the model links:\n" + "\n".join(urls)
 
     completion = client.chat.completions.create(
-        model="kimi-k2-0905-preview",
+        model=MODELSCOPE_MODEL,
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": modelscope_system_prompt},
             {"role": "user", "content": user_prompt},
         ],
         temperature=0,
@@ -143,15 +158,19 @@ Return your results in the following JSON format:
 
     try:
         result = ModelInfoList(**data)
+        record_response(content)
         return result.infos
     except Exception as e:
         print("Parsing error:", e)
         return [ModelInfo(link=url, modality=None, is_large_model=None) for url in urls]
 
 
+@cached(f"{WEB_SEARCH_MODEL}+{JSON_PARSE_MODEL}", prompt_hash(web_search_prompt, json_parse_prompt), ModelInfo, _settled)
+@llm_call()
 def gen_model_info_huggingface(urls: list[str]) -> list[ModelInfo]:
     result = chain.invoke({"model_links": urls})
     if result['parsing_error'] is None:
+        record_response(result['raw'].model_dump_json())
         return result['parsed'].infos
     else:
         print("Parsing error:", result['parsing_error'])
@@ -2,18 +2,27 @@
 Check screenshots of repository pages on HuggingFace or Modelscope to determine whether 
 the extraction of information such as model or dataset downloads is correct.
 """
+import io
 import os
 import yaml
 import base64
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from langchain.chat_models import init_chat_model
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from typing import Union, Literal, Optional
 from dataclasses import dataclass, field
+from ..budget import llm_call
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:  # The `screenshots` extra; without it screenshots are sent as they are.
+    Image = ImageChops = None
 
 SCRIPT_PATH = Path(__file__)
-ROOT_PATH = SCRIPT_PATH.parents[5]
+ROOT_PATH = SCRIPT_PATH.parents[3]
 CONFIG_PATH = ROOT_PATH / 'config/env.yaml'
 with CONFIG_PATH.open('r', encoding='utf-8') as f:
     config = yaml.safe_load(f)
@@ -35,21 +44,57 @@ class ImageInfoMS(BaseModel):
 class ImageInfo(BaseModel):
     output: Union[ImageInfoHF, ImageInfoMS] = Field(description="The image information from HuggingFace or ModelScope")
     
+def encode_screenshot(
+    img_path: str,
+    max_side: int | None = 1024,
+    crop: tuple[float, float, float, float] | None = None,
+) -> str:
+    """
+    Base64 PNG of a screenshot, cut to `crop` (left, top, right, bottom as
+    fractions of the page), trimmed of its blank margins and downscaled so that
+    its longer side is at most `max_side`. Smaller images cost fewer tokens.
+    There is no default crop: where the downloads sit depends on the source,
+    the repo type and the window size of the crawl.
+    """
+    with open(img_path, "rb") as img_file:
+        data = img_file.read()
+    if Image is None or (max_side is None and crop is None):
+        return base64.b64encode(data).decode('utf-8')
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("L")
+        if crop is not None:
+            w, h = img.size
+            img = img.crop((int(crop[0] * w), int(crop[1] * h), int(crop[2] * w), int(crop[3] * h)))
+        background = Image.new("L", img.size, img.getpixel((0, 0)))
+        bbox = ImageChops.difference(img, background).getbbox()
+        if bbox:
+            img = img.crop(bbox)
+        if max_side is not None and max(img.size) > max_side:
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG", optimize=True)
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
 @dataclass
 class CheckRequest:
-    img: str = field(init=False, metadata={"description": "The base64 encoded image data."})
+    img: Optional[str] = field(init=False, default=None, metadata={"description": "The base64 encoded image data."})
     img_path: str
     link: str
     source: Literal["HuggingFace", "ModelScope"]
-    
-    def __post_init__(self):
-        with open(self.img_path, "rb") as img_file:
+    max_side: Optional[int] = 1024
+    crop: Optional[tuple[float, float, float, float]] = None
+
+    def encode(self):
+        if self.img is None:
             try:
-                self.img = base64.b64encode(img_file.read()).decode('utf-8')
+                self.img = encode_screenshot(self.img_path, self.max_side, self.crop)
             except Exception as e:
                 raise ValueError(f"Failed to read or encode image file: {e}")
+        return self
     
     def to_dict(self):
+        self.encode()
         return {
             "source": self.source,
             "img": self.img
@@ -85,6 +130,7 @@ prompt_template = ChatPromptTemplate.from_messages([
 checker = llm.with_structured_output(ImageInfo, include_raw=True)
 chain = prompt_template | checker
 
+@llm_call()
 def check_image_info(requests: list[CheckRequest]) -> list[CheckResponse]:
     requests_dicts = [req.to_dict() for req in requests]
     responses = chain.batch_as_completed(requests_dicts)
@@ -104,6 +150,42 @@ def check_image_info(requests: list[CheckRequest]) -> list[CheckResponse]:
 
     return results
 
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _encoder() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(min(8, os.cpu_count() or 1), thread_name_prefix="screenshot")
+        return _pool
+
+
+def verify_screenshots(requests: list[CheckRequest]) -> list[CheckResponse]:
+    """
+    Encode the screenshots of `requests` in a shared worker pool, then check
+    them in one concurrent batch. Responses come in completion order; screenshots
+    that cannot be read come back with an error and are not sent.
+    """
+    def encode(request: CheckRequest) -> Optional[Exception]:
+        try:
+            request.encode()
+        except Exception as e:
+            return e
+
+    results, ready = [], []
+    for request, error in zip(requests, _encoder().map(encode, requests)):
+        if error is None:
+            ready.append(request)
+        else:
+            results.append(CheckResponse(request.link, request.source, error=str(error)))
+    if ready:
+        results.extend(check_image_info(ready))
+    return results
+
+
 if __name__ == "__main__":
     from pathlib import Path
     root_path = Path(__file__).parent.parent.parent
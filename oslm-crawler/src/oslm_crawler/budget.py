@@ -0,0 +1,68 @@
+"""
+Resources shared by crawl pipelines that run side by side: Chrome drivers and
+LLM requests in flight. The orchestrator creates one `ResourceBudget` and
+installs it in every pipeline process. A process without a budget is unlimited.
+"""
+import multiprocessing
+from dataclasses import dataclass
+from contextlib import contextmanager
+from typing import Any
+
+
+class BudgetExhausted(RuntimeError):
+    pass
+
+
+@dataclass
+class ResourceBudget:
+    drivers: Any = None    # Semaphore with one permit per Chrome driver
+    llm_calls: Any = None  # Semaphore with one permit per LLM request in flight
+
+    @classmethod
+    def create(
+        cls,
+        max_drivers: int | None = None,
+        max_llm_calls: int | None = None,
+        ctx=None,
+    ) -> 'ResourceBudget':
+        ctx = ctx or multiprocessing.get_context()
+        return cls(
+            ctx.BoundedSemaphore(max_drivers) if max_drivers else None,
+            ctx.BoundedSemaphore(max_llm_calls) if max_llm_calls else None,
+        )
+
+
+_budget = ResourceBudget()
+
+
+def install(budget: ResourceBudget | None):
+    global _budget
+    _budget = budget or ResourceBudget()
+
+
+def current() -> ResourceBudget:
+    return _budget
+
+
+def acquire_driver(block: bool = True, timeout: float | None = None) -> bool:
+    if _budget.drivers is None:
+        return True
+    return _budget.drivers.acquire(block, timeout)
+
+
+def release_driver():
+    if _budget.drivers is not None:
+        _budget.drivers.release()
+
+
+@contextmanager
+def llm_call():
+    """Hold one LLM permit for the duration of the block. Also usable as a decorator."""
+    sem = _budget.llm_calls
+    if sem is not None:
+        sem.acquire()
+    try:
+        yield
+    finally:
+        if sem is not None:
+            sem.release()
@@ -1,10 +1,15 @@
 import sys
 import yaml
+import pandas as pd
 import argparse
 from datetime import datetime
 from pathlib import Path
 from typing_extensions import deprecated
-from .core import AccumulateAndRankingPipeline, BAAIDataPipeline, HFPipeline, MSPipeline, MergeAndRankingPipeline, OpenDataLabPipeline
+from .core import AccumulateAndRankingPipeline, HFPipeline, MergeAndRankingPipeline
+from .orchestrator import PIPELINE_STEPS, CrawlOrchestrator, run_pipeline
+from .ranking.backfill import RankBackfill
+from .ranking.whatif import WhatIf, sensitivity
+from . import budget
 
 
 def main() -> None:
@@ -38,6 +43,8 @@ def init_config(args):
             case 'all':
                 pipelines = ["BAAIDataPipeline", "OpenDataLabPipeline", 
                              "ModelScopePipeline", "HuggingFacePipeline"]
+        # Only the selected pipelines are kept, `crawl` runs every one left.
+        config = {k: v for k, v in config.items() if k not in PIPELINE_STEPS or k in pipelines}
         for k, v in config.items():
             if k in pipelines:
                 if args.load_dir:
@@ -47,6 +54,13 @@ def init_config(args):
                 if args.log_path:
                     v['log_path'] = args.log_path
                 config[k] = v
+        orchestrator = config.setdefault('CrawlOrchestrator', {})
+        if args.sequential:
+            orchestrator['parallel'] = False
+        if args.max_drivers is not None:
+            orchestrator['max_drivers'] = args.max_drivers
+        if args.max_llm_calls is not None:
+            orchestrator['max_llm_calls'] = args.max_llm_calls
     elif args.command == 'gen-rank':
         if args.data_dir:
             config['MergeAndRankingPipeline']['data_dir'] = args.data_dir
@@ -57,6 +71,16 @@ def init_config(args):
             config['MergeAndRankingPipeline']['data_dir'] = args.data_dir
         elif args.all:
             config['MergeAndRankingPipeline']['data_dir'] = 'all'
+    elif args.command == 'what-if':
+        if args.data_dir:
+            config['MergeAndRankingPipeline']['data_dir'] = args.data_dir
+        what_if = config['MergeAndRankingPipeline'].setdefault('what_if', {})
+        if args.scenarios:
+            what_if['scenarios'] = args.scenarios
+        if args.accumulated:
+            what_if['accumulated'] = True
+        if args.output_dir:
+            what_if['output_dir'] = args.output_dir
         
     return config
     
@@ -70,9 +94,12 @@ def get_parser():
 
     crawl_parser = sub_parsers.add_parser("crawl", parents=[parent_parser], help="Crawl data from huggingface, modelscope, opendatalab, or baai")
     crawl_parser.add_argument("pipeline", choices=["huggingface", "modelscope", "opendatalab", "baaidata", "all"], help="Pipeline")
-    crawl_parser.add_argument("--load-dir", help="When skipping the prerequisite steps, the data required for subsequent steps is loaded from this path. The default value is data/{today-date}/HuggingFace. When an error occurs and you need to rerun, you should manually specify to the error output directory.")
+    crawl_parser.add_argument("--load-dir", help="When skipping the prerequisite steps, the data required for subsequent steps is loaded from this path. The default value is data/{today-date}/HuggingFace. When an error occurs and you need to rerun, you should manually specify to the error output directory. Interrupted HuggingFace and ModelScope crawls do not need this, rerunning the same command resumes from the checkpoint in save_dir.")
     crawl_parser.add_argument("--save-dir", help="Save directory for crawler results, default value is data/{today-date}/HuggingFace. The load_dir of post_process is different from other steps, it loads from save_dir by default.")
     crawl_parser.add_argument("--log-path", help=r"Log output directory, default value is logs/{task_name}-{datetime}")
+    crawl_parser.add_argument("--sequential", action="store_true", help="With `all`, run the pipelines one after another instead of in parallel processes.")
+    crawl_parser.add_argument("--max-drivers", type=int, help="Total number of Chrome drivers shared by all pipelines.")
+    crawl_parser.add_argument("--max-llm-calls", type=int, help="Total number of LLM requests in flight across all pipelines.")
     crawl_parser.set_defaults(func=crawl)
 
     gen_rank_parser = sub_parsers.add_parser("gen-rank", parents=[parent_parser], help="Merge data from different source and generate rank table.")
@@ -86,75 +113,35 @@ def get_parser():
     group.add_argument("--all", action="store_true", help="Generate accumulated rankings for all data in the default path.")
     group.add_argument("--data-dir", help="Data directory, default value is the current day")
     accumulate_parser.set_defaults(func=accumulate)
+
+    what_if_parser = sub_parsers.add_parser("what-if", parents=[parent_parser], help="Rerank a ranked snapshot under several weight scenarios and report which orgs keep their rank.")
+    what_if_parser.add_argument("scenarios", nargs='?', help="YAML file mapping scenario names to overrides of the ranking config, e.g. `eval-0.3: {ranking_weights: {data: 0.2, infra: 0, eval: 0.3}}`.")
+    what_if_parser.add_argument("--data-dir", help="Ranked data directory, default value is the current day")
+    what_if_parser.add_argument("--accumulated", action="store_true", help="Rerank the accumulated ranking instead of the monthly one.")
+    what_if_parser.add_argument("--output-dir", help="Directory of the results, default value is the data directory")
+    what_if_parser.set_defaults(func=what_if)
     
     return parser
 
 
 def crawl(config):
-    if 'HuggingFacePipeline' in config:
-        conf = config['HuggingFacePipeline']
-        proc = HFPipeline(
-            conf['task_name'],
-            conf['load_dir'],
-            conf['save_dir'],
-            conf['log_path'],
-        )
-        if 'init_org_links' in conf:
-            proc = proc.step('init_org_links', **conf['init_org_links'])
-        if 'crawl_repo_page' in conf:
-            proc = proc.step('crawl_repo_page' **conf['crawl_repo_page'])
-        if 'crawl_detail_page' in conf:
-            proc = proc.step('crawl_detail_page', **conf['crawl_detail_page'])
-        if 'post_process' in conf:
-            proc = proc.step('post_process', **conf['post_process'])
-        proc.done()
-    if 'ModelScopePipeline' in config:
-        conf = config['ModelScopePipeline']
-        proc = MSPipeline(
-            conf['task_name'],
-            conf['load_dir'],
-            conf['save_dir'],
-            conf['log_path'],
-        )
-        if 'init_org_links' in conf:
-            proc = proc.step('init_org_links', **conf['init_org_links'])
-        if 'crawl_repo_page' in conf:
-            proc = proc.step('crawl_repo_page', **conf['crawl_repo_page'])
-        if 'crawl_detail_page' in conf:
-            proc = proc.step('crawl_detail_page', **conf['crawl_detail_page'])
-        if 'post_process' in conf:
-            proc = proc.step('post_process', **conf['post_process'])
-        proc.done()
-    if 'OpenDataLabPipeline' in config:
-        conf = config['OpenDataLabPipeline']
-        proc = OpenDataLabPipeline(
-            conf['task_name'],
-            conf['load_dir'],
-            conf['save_dir'],
-            conf['log_path'],
-        )
-        if 'init_org_links' in conf:
-            proc = proc.step('init_org_links', **conf['init_org_links'])
-        if 'crawl_repo_page' in conf:
-            proc = proc.step('crawl_repo_page' **conf['crawl_repo_page'])
-        if 'post_process' in conf:
-            proc = proc.step('post_process', **conf['post_process'])
-        proc.done()
-    if 'BAAIDataPipeline' in config:
-        conf = config['BAAIDataPipeline']
-        proc = BAAIDataPipeline(
-            conf['task_name'],
-            conf['load_dir'],
-            conf['save_dir'],
-            conf['log_path'],
-        )
-        if 'init_org_links' in conf:
-            proc = proc.step('init_org_links', **conf['init_org_links'])
-        if 'crawl_repo_page' in conf:
-            proc = proc.step('crawl_repo_page' **conf['crawl_repo_page'])
-        if 'post_process' in conf:
-            proc = proc.step('post_process', **conf['post_process'])
-        proc.done()
+    conf = config.get('CrawlOrchestrator', {})
+    pipelines = {k: v for k, v in config.items() if k in PIPELINE_STEPS}
+    if len(pipelines) > 1 and conf.get('parallel', True):
+        codes = CrawlOrchestrator(
+            pipelines,
+            conf.get('max_drivers'),
+            conf.get('max_llm_calls'),
+            conf.get('log_dir'),
+        ).run()
+        failed = [name for name, code in codes.items() if code != 0]
+        if failed:
+            sys.exit(f"Failed pipelines: {', '.join(failed)}")
+        return
+    budget.install(budget.ResourceBudget.create(conf.get('max_drivers'), conf.get('max_llm_calls')))
+    for name in PIPELINE_STEPS:
+        if name in pipelines:
+            run_pipeline(name, pipelines[name])
 
 
 def gen_rank(config):
@@ -162,15 +149,8 @@ def gen_rank(config):
     if config['data_dir'] == "all":
         data_dir_base = Path(__file__).parents[2] / 'data'
         log_path = Path(__file__).parents[2] / f'logs/rank-all-{datetime.now().strftime(r"%Y-%m-%d_%H-%M-%S")}'
-        for data_dir in sorted(data_dir_base.glob(r"????-??-??"))[1:]:
-            proc = MergeAndRankingPipeline(data_dir, log_path/f"{data_dir.name}.log")
-            if 'merge_models' in config:
-                proc = proc.step('merge_models', **config['merge_models'])
-            if 'merge_datasets' in config:
-                proc = proc.step('merge_datasets', **config['merge_datasets'])
-            if 'ranking' in config:
-                proc = proc.step('ranking', **config['ranking'])
-            proc.done()
+        steps = {stage: config[stage] for stage in ['merge_models', 'merge_datasets', 'ranking'] if stage in config}
+        RankBackfill(MergeAndRankingPipeline, data_dir_base, log_path, config.get('backfill_workers')).run(steps)
     else:
         proc = MergeAndRankingPipeline(config['data_dir'])
         if 'merge_models' in config:
@@ -187,18 +167,39 @@ def accumulate(config):
     if config['data_dir'] == "all":
         data_dir_base = Path(__file__).parents[2] / 'data'
         log_path = Path(__file__).parents[2] / f'logs/rank-all-{datetime.now().strftime(r"%Y-%m-%d_%H-%M-%S")}'
-        for data_dir in sorted(data_dir_base.glob(r"????-??-??"))[1:]:
-            proc = AccumulateAndRankingPipeline(data_dir, log_path/f"{data_dir.name}.log")
-            proc = proc.step('accumulate')
-            proc = proc.step('ranking', **config['ranking'])
-            proc.done()
+        accumulate = config.get('accumulate', {})
+        # Every snapshot accumulates up to the same cutoff, fold the new months once before the workers load them.
+        AccumulateAndRankingPipeline.accumulate_totals(
+            data_dir_base, str(accumulate.get('cutoff') or datetime.today().date())
+        )
+        steps = {'accumulate': accumulate, 'ranking': config['ranking']}
+        RankBackfill(AccumulateAndRankingPipeline, data_dir_base, log_path, config.get('backfill_workers')).run(steps)
     else:
         proc = AccumulateAndRankingPipeline(config['data_dir'])
-        proc = proc.step('accumulate')
+        proc = proc.step('accumulate', **config.get('accumulate', {}))
         proc = proc.step('ranking', **config['ranking'])
         proc.done()
 
 
+def what_if(config):
+    config = config['MergeAndRankingPipeline']
+    conf = config.get('what_if') or {}
+    if not conf.get('scenarios'):
+        sys.exit("No scenarios given, pass a YAML file of scenarios.")
+    with open(conf['scenarios'], 'r') as f:
+        scenarios: dict = yaml.safe_load(f)
+    data_dir = Path(config['data_dir'] or Path(__file__).parents[2] / f'data/{datetime.today().date()}')
+    accumulated = conf.get('accumulated', False)
+    tables = WhatIf(data_dir, config['ranking'], accumulated).rank({'config': {}, **(scenarios or {})})
+    output_dir = Path(conf.get('output_dir') or data_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    prefix = 'what-if-accumulated' if accumulated else 'what-if'
+    pd.DataFrame({name: table['rank'] for name, table in tables.items()}).to_csv(output_dir / f'{prefix}-rank.csv')
+    report = sensitivity(tables)
+    report.to_csv(output_dir / f'{prefix}-sensitivity.csv')
+    print(report.to_string())
+
+
 def test_hf_pipeline():
     save_path = Path(__file__).parents[2] / 'tmp-data/hf-test'
     save_path.mkdir(exist_ok=True, parents=True)
@@ -282,11 +283,9 @@ def tmp_executor(target_org=None):
                 pbar.update(1)
                 continue
             if 'model_name' in data.data:
-                model_writer.parse_input(data)
-                res = next(model_writer.run())
+                res = model_writer.write(data)
             elif 'dataset_name' in data.data:
-                dataset_writer.parse_input(data)
-                res = next(dataset_writer.run())
+                res = dataset_writer.write(data)
             if res.error is not None:
                 error_writer.write(res.error)
                 error_f.flush()
@@ -328,11 +327,9 @@ def tmp_executor(target_org=None):
                 pbar.update(1)
                 continue
             if 'model_name' in data.data:
-                model_writer.parse_input(data)
-                res = next(model_writer.run())
+                res = model_writer.write(data)
             elif 'dataset_name' in data.data:
-                dataset_writer.parse_input(data)
-                res = next(dataset_writer.run())
+                res = dataset_writer.write(data)
             if res.error is not None:
                 error_writer.write(res.error)
                 error_f.flush()
@@ -352,8 +349,7 @@ def tmp_executor(target_org=None):
             error_writer.write(data.error)
             error_f.flush()
             continue
-        dataset_writer.parse_input(data)
-        res = next(dataset_writer.run())
+        res = dataset_writer.write(data)
         if res.error:
             error_writer.write(res.error)
             error_f.flush()
@@ -370,8 +366,7 @@ def tmp_executor(target_org=None):
             error_writer.write(data.error)
             error_f.flush()
             continue
-        dataset_writer.parse_input(data)
-        res = next(dataset_writer.run())
+        res = dataset_writer.write(data)
         if res.error:
             error_writer.write(res.error)
             error_f.flush()
@@ -1,27 +1,483 @@
+import os
 import re
 import jsonlines
 import sys
+import threading
 import pandas as pd
 import numpy as np
 from collections import defaultdict
 from typing import Literal
 from loguru import logger
-from oslm_crawler.pipeline.base import PipelineData
+from oslm_crawler.pipeline.base import PipelineData, PipelineStep
 from oslm_crawler.pipeline.processors import HFInfoProcessor
 from oslm_crawler.pipeline.processors import MSInfoProcessor
 from oslm_crawler.pipeline.processors import OpenDataLabInfoProcessor
 from oslm_crawler.pipeline.processors import BAAIDataInfoProcessor
 from tqdm import tqdm
 from pathlib import Path
-from .pipeline.readers import OrgLinksReader, JsonlineReader
+from .pipeline.readers import OrgLinksReader, JsonlineReader, JsonlineRows
 from .pipeline.crawlers import HFRepoPageCrawler, MSRepoPageCrawler
 from .pipeline.crawlers import HFDetailPageCrawler, MSDetailPageCrawler
 from .pipeline.crawlers import OpenDataLabCrawler, BAAIDatasetsCrawler
-from .pipeline.writers import ModelDatasetJsonlineWriter, JsonlineWriter
-from datetime import datetime, timedelta
+from .pipeline.writers import ModelDatasetJsonlineWriter, JsonlineWriter, DBWriter
+from .pipeline.incremental import IncrementalPlanner
+from .pipeline.checkpoint import Checkpoint
+from .pipeline.dag import StreamingDAG, Stage, MapStep
+from .database.history_index import nearest_date, month_before
+from .database.columnar import read_frame, write_columnar, convert
+from .ranking.summary import SummaryCube, data_summary, model_summary
+from .ranking.accumulator import Accumulator, to_records
+from .ranking.weights import compile_ranking
+from datetime import datetime
 
 
-class HFPipeline:
+def _reload_checkpointed(path, extra: dict) -> list[PipelineData]:
+    # Records written before the interruption, with the keys the writers dropped.
+    with jsonlines.open(path, 'r') as f:
+        return [PipelineData(item | extra, None, None) for item in f]
+
+
+def _skip_checkpointed(checkpoint: Checkpoint, inp: PipelineData) -> PipelineData:
+    if inp.data is None:
+        return inp
+    urls = [url for url in inp.data['detail_urls'] if not checkpoint.done('crawl_detail_page', url)]
+    return PipelineData(inp.data | {'detail_urls': urls}, inp.message, inp.error)
+
+
+def _snapshot_dates(data_dir: Path) -> list[str]:
+    # Only the snapshot directories are listed, the ranking never reads the raw files.
+    return sorted(p.name for p in data_dir.glob("????-??-??") if p.is_dir())
+
+
+def _detail_route(data: PipelineData) -> str:
+    if 'detail_urls' not in data.data:
+        # Carried forward from the previous snapshot, nothing to crawl.
+        return 'save_detail_page'
+    if (data.message or {}).get('cheap'):
+        return 'crawl_detail_page_cheap'
+    return 'crawl_detail_page'
+
+
+class _ErrorFiles:
+    """
+    Error records of each stage, written next to the log in the files the steps always used.
+    The DAG calls it from the worker threads of the stages, which may share a file, so every
+    file is written under its own lock.
+    """
+
+    def __init__(self, log_dir: Path, files: dict[str, tuple[str, str]]):
+        self.stage_files = {}
+        self.writers = {}
+        for stage, (filename, mode) in files.items():
+            if filename not in self.writers:
+                f = open(log_dir / filename, mode)
+                self.writers[filename] = (f, jsonlines.Writer(f), threading.Lock())
+            self.stage_files[stage] = filename
+
+    def __call__(self, stage: str, data: PipelineData):
+        f, writer, lock = self.writers[self.stage_files[stage]]
+        with lock:
+            writer.write(data.error)
+            f.flush()
+
+    def close(self):
+        for f, writer, lock in self.writers.values():
+            with lock:
+                writer.close()
+                f.close()
+
+
+class _StreamingSteps:
+    """
+    `crawl_repo_page`, `crawl_detail_page` and `post_process` of HuggingFace and
+    ModelScope as stages of a `StreamingDAG`. `step` runs the stages of one step
+    on the result of the previous one, `stream` chains the stages of several
+    steps so repo pages feed the detail crawl, and detail pages the post
+    processing, as soon as they are crawled.
+    """
+
+    source: str
+    downloads_key: str
+    repo_crawler: type[PipelineStep]
+    detail_crawler: type[PipelineStep]
+    processor: type[PipelineStep]
+    repo_keys: list[str]
+    detail_keys: list[str]
+    post_keys: list[str]
+
+    def stream(
+        self,
+        crawl_repo_page: dict | None = None,
+        crawl_detail_page: dict | None = None,
+        post_process: dict | None = None,
+    ):
+        """Run the given steps at once. Each takes the keyword arguments of `step`, `save` included."""
+        steps = {
+            'crawl_repo_page': (crawl_repo_page, self._repo_page_stages, 'save_repo_page'),
+            'crawl_detail_page': (crawl_detail_page, self._detail_page_stages, 'save_detail_page'),
+            'post_process': (post_process, self._post_process_stages, 'save_post_process'),
+        }
+        steps = {k: v for k, v in steps.items() if v[0] is not None}
+        self._errors = _ErrorFiles(self.error_f, {
+            stage: file
+            for step, files in [
+                ('crawl_repo_page', {
+                    'crawl_repo_page': ('org-links.jsonl', 'a'),
+                    'save_repo_page': ('org-links.jsonl', 'a'),
+                }),
+                ('crawl_detail_page', {
+                    'crawl_detail_page': ('repo-page.jsonl', 'a'),
+                    'crawl_detail_page_cheap': ('repo-page.jsonl', 'a'),
+                    'save_detail_page': ('repo-page.jsonl', 'a'),
+                }),
+                ('post_process', {
+                    'post_process': ('post-process-error.jsonl', 'w'),
+                    'save_post_process': ('post-process-error.jsonl', 'w'),
+                }),
+            ] if step in steps
+            for stage, file in files.items()
+        })
+        self._pbars = {}
+        dag = StreamingDAG(on_error=self._on_error)
+        inputs = {}
+        after, upstream = None, []
+        for kargs, build, tail in steps.values():
+            upstream = build(dag, inputs, after, upstream, **kargs)
+            after = tail
+        try:
+            for _ in dag.run(inputs):
+                pass
+        finally:
+            # Whatever was saved stays checkpointed, even when a stage failed.
+            self.checkpoint.sync()
+            for pbar in self._pbars.values():
+                pbar.close()
+            self._errors.close()
+        for step in steps:
+            getattr(self, f'_finish_{step}')()
+        return self
+
+    def _on_error(self, stage: str, data: PipelineData):
+        self._errors(stage, data)
+        if stage in self._pbars:
+            self._pbars[stage].update(1)
+
+    def _crawl_repo_page(self, save, **kargs):
+        return self.stream(crawl_repo_page=kargs | {'save': save})
+
+    def _crawl_detail_page(self, save, **kargs):
+        return self.stream(crawl_detail_page=kargs | {'save': save})
+
+    def _post_process(self, save, **kargs):
+        return self.stream(post_process=kargs | {'save': save})
+
+    def _repo_page_stages(self, dag: StreamingDAG, inputs: dict, after, upstream, save, **kargs):
+        logger.info(f"Crawl repo page of {self.source}")
+        if not hasattr(self, "_init_org_links_res"):
+            logger.info("Missing the running result of the previous step (init_org_links)")
+            logger.info(f"Trying load required data from {self.load_dir}")
+            reader = JsonlineReader(self.load_dir/'org-links.jsonl', required_keys=['repo_link'])
+            self._init_org_links_res = PipelineData({
+                self.source: [err['repo_link'] for err in reader.rows()],
+                "target_sources": [self.source],
+            }, None, None)
+        inp = self._init_org_links_res
+        kargs = {k: v for k, v in kargs.items() if k in self.repo_keys}
+        crawler = self.repo_crawler(**kargs)
+        res = []
+        self._repo_writer = None
+        if save:
+            save_path = self.save_dir / "repo-page.jsonl"
+            if self.checkpoint.restore(save_path):
+                crawler.parse_input(inp)
+                res.extend(_reload_checkpointed(save_path, crawler.data))
+                logger.info(f"Skip {len(res)} repo pages completed before.")
+            self._repo_writer = JsonlineWriter(save_path, drop_keys=['repo_org_mapper'], mode='a')
+        self._crawl_repo_page_res = res
+        pbar = tqdm(total=0, desc=f"Crawling repo infos from {self.source}...")
+        self._pbars['crawl_repo_page'] = pbar
+
+        def crawl(inp):
+            crawler.parse_input(inp)
+            crawler.input['link-category'] = [
+                lc for lc in crawler.input['link-category']
+                if not self.checkpoint.done('crawl_repo_page', f"{lc[1]}:{lc[0]}")
+            ]
+            pbar.total = len(crawler.input['link-category'])
+            pbar.refresh()
+            return crawler.run()
+
+        def save_repo_page(data):
+            pbar.write(f"{data.message['repo']} {self.source.lower()} has {data.message['total_links']} {data.message['category']}.")
+            pbar.update(1)
+            if save:
+                written = self._repo_writer.write(data)
+                if written.error is not None:
+                    return written
+                self.checkpoint.record(
+                    'crawl_repo_page', f"{data.message['category']}:{data.message['repo_url']}", self._repo_writer)
+                data = PipelineData(written.data, data.message, None)
+            res.append(data)
+            return data
+
+        dag.add(Stage('crawl_repo_page', lambda: MapStep(crawl)), after=after)
+        dag.add(Stage('save_repo_page', lambda: MapStep(save_repo_page)), after='crawl_repo_page')
+        inputs['crawl_repo_page'] = [inp]
+        return list(res)
+
+    def _finish_crawl_repo_page(self):
+        if self._repo_writer is not None:
+            self._repo_writer.close()
+
+    def _detail_page_planner(self, **kargs) -> IncrementalPlanner | None:
+        return None
+
+    def _detail_page_crawlers(self, **kargs) -> tuple[PipelineStep, PipelineStep | None]:
+        return self.detail_crawler(**kargs), None
+
+    def _detail_page_stages(self, dag: StreamingDAG, inputs: dict, after, upstream, save, **kargs):
+        logger.info(f"Crawl detail page of {self.source}")
+        if after is not None:
+            # Repo pages saved before an interruption, the rest arrive from `after`.
+            inps = upstream
+        else:
+            if not hasattr(self, "_crawl_repo_page_res"):
+                logger.info("Missing the running result of the previous step (crawl_repo_page)")
+                logger.info(f"Trying load required data from {self.load_dir}")
+                reader = JsonlineReader(self.load_dir/'repo-page.jsonl', required_keys=['category', 'detail_link'])
+                model_urls = []
+                dataset_urls = []
+                for err in reader.rows():
+                    if err['category'] == 'models':
+                        model_urls.append(err['detail_link'])
+                    elif err['category'] == 'datasets':
+                        dataset_urls.append(err['detail_link'])
+                self._crawl_repo_page_res = [PipelineData({
+                    'category': 'models',
+                    'detail_urls': model_urls
+                }, None, None), PipelineData({
+                    'category': 'datasets',
+                    'detail_urls': dataset_urls
+                }, None, None)]
+            inps = self._crawl_repo_page_res
+        res = []
+        self._detail_writer = None
+        if save:
+            resumed = [
+                self.checkpoint.restore(self.save_dir / "raw-models-info.jsonl"),
+                self.checkpoint.restore(self.save_dir / "raw-datasets-info.jsonl"),
+            ]
+            if any(resumed):
+                if inps:
+                    extra = {k: v for k, v in inps[0].data.items() if k not in ['category', 'detail_urls']}
+                else:
+                    extra = {
+                        k: v for k, v in getattr(self, '_init_org_links_res', PipelineData({}, None, None)).data.items()
+                        if k not in [self.source, 'target_sources']
+                    }
+                for filename in ["raw-models-info.jsonl", "raw-datasets-info.jsonl"]:
+                    res.extend(_reload_checkpointed(self.save_dir / filename, extra))
+                logger.info(f"Skip {len(res)} detail pages completed before.")
+            self._detail_writer = ModelDatasetJsonlineWriter(
+                str(self.save_dir / "raw-models-info.jsonl"),
+                str(self.save_dir / "raw-datasets-info.jsonl"),
+                ['repo_org_mapper'], ['repo_org_mapper'], mode='a'
+            )
+        self._crawl_detail_page_res = res
+        self._planner = self._detail_page_planner(**kargs)
+        kargs = {k: v for k, v in kargs.items() if k in self.detail_keys}
+        crawler, cheap_crawler = self._detail_page_crawlers(**kargs)
+        pbar = tqdm(total=0, desc=f"Crawling detail infos from {self.source}...")
+        self._pbars['crawl_detail_page'] = pbar
+        self._pbars['crawl_detail_page_cheap'] = pbar
+
+        def plan(inp):
+            if save:
+                inp = _skip_checkpointed(self.checkpoint, inp)
+            pbar.total += len(inp.data['detail_urls'])
+            pbar.refresh()
+            if self._planner is None:
+                return inp
+            full, cheap, carried = self._planner.split(inp)
+            if cheap is not None:
+                cheap = PipelineData(cheap.data, (cheap.message or {}) | {'cheap': True}, None)
+            return [full] + ([cheap] if cheap is not None else []) + carried
+
+        def save_detail_page(data):
+            if self._planner is not None and data.error is None and data.data:
+                data = PipelineData(self._planner.mark(data.data), data.message, None)
+            if save:
+                data = self._detail_writer.write(data)
+                if data.error is None:
+                    self.checkpoint.record('crawl_detail_page', data.data['link'], self._detail_writer.last_writer)
+            if data.error is None:
+                res.append(data)
+            pbar.update(1)
+            return data
+
+        crawl_stages = ['crawl_detail_page']
+        dag.add(Stage('plan_detail_page', lambda: MapStep(plan), route=_detail_route), after=after)
+        dag.add(Stage('crawl_detail_page', lambda: crawler, stream=True), after='plan_detail_page')
+        if cheap_crawler is not None:
+            dag.add(Stage('crawl_detail_page_cheap', lambda: cheap_crawler, stream=True), after='plan_detail_page')
+            crawl_stages.append('crawl_detail_page_cheap')
+        dag.add(
+            Stage('save_detail_page', lambda: MapStep(save_detail_page)),
+            after=['plan_detail_page'] + crawl_stages,
+        )
+        if inps:
+            inputs['plan_detail_page'] = inps
+        return list(res)
+
+    def _finish_crawl_detail_page(self):
+        if self._planner is not None:
+            self._planner.report()
+        if self._detail_writer is not None:
+            self._detail_writer.close()
+        count = defaultdict(int)
+        for data in self._crawl_detail_page_res:
+            if 'model_name' in data.data.keys():
+                count['models'] += 1
+            elif 'dataset_name' in data.data.keys():
+                count['datasets'] += 1
+        logger.info(f"Crawl detail page done. Total models: {count['models']}. Total datasets: {count['datasets']}")
+
+    def _post_process_stages(self, dag: StreamingDAG, inputs: dict, after, upstream, save, **kargs):
+        logger.info(f"Post Processing of {self.source} data.")
+        if after is not None:
+            # Detail pages saved before an interruption, the rest arrive from `after`.
+            inps = upstream
+        else:
+            if not hasattr(self, "_crawl_detail_page_res"):
+                logger.info("Missing the running result of the previous step (crawl_detail_page)")
+                logger.info(f"Trying load required data from {self.save_dir}")
+                org_links_reader = OrgLinksReader(sources=[self.source])
+                org_links_reader.parse_input()
+                shared = {'repo_org_mapper': next(org_links_reader.run()).data['repo_org_mapper']}
+                # Streamed from disk, by the post processing and again by its ai check.
+                self._crawl_detail_page_res = JsonlineRows(
+                    JsonlineReader(self.save_dir / 'raw-models-info.jsonl', shared=shared),
+                    JsonlineReader(self.save_dir / 'raw-datasets-info.jsonl', shared=shared),
+                )
+            inps = self._crawl_detail_page_res
+        self._post_kargs = {k: v for k, v in kargs.items() if k in self.post_keys}
+        processor = self.processor(**self._post_kargs)
+        self._post_processor = processor
+        res = []
+        self._post_writer = None
+        if save:
+            self._post_writer = ModelDatasetJsonlineWriter(
+                str(self.save_dir / 'processed-models-info.jsonl'),
+                str(self.save_dir / 'processed-datasets-info.jsonl'),
+            )
+
+        self._db_writer = DBWriter() if kargs.get('save_db', False) else None
+        self._columnar = save and kargs.get('columnar', False)
+
+        def save_post_process(data):
+            # Records of a failed database batch go to the error file, the
+            # JSONL output keeps them.
+            failed = []
+            if self._db_writer is not None and data.error is None:
+                self._db_writer.parse_input(data)
+                failed = [out for out in self._db_writer.run() if out.error is not None]
+            if save:
+                data = self._post_writer.write(data)
+            if data.error is None:
+                res.append(data)
+            return [data] + failed
+
+        dag.add(
+            Stage('post_process', lambda: processor, flush=lambda p: p.flush(update_infos=True)),
+            after=after,
+        )
+        dag.add(
+            Stage(
+                'save_post_process', lambda: MapStep(save_post_process),
+                flush=lambda _: self._db_writer.flush() if self._db_writer is not None else None,
+            ),
+            after='post_process',
+        )
+        if inps:
+            inputs['post_process'] = inps
+        self._post_process_res = res
+        return []
+
+    def _finish_post_process(self):
+        processor = self._post_processor
+        key = self.downloads_key
+        if self._post_kargs.get('ai_check', False):
+            model_check = {
+                f"{data['repo']}/{data['model_name']}": data[key]
+                for data in processor.models_check_buffer
+            }
+            dataset_check = {
+                f"{data['repo']}/{data['dataset_name']}": data[key]
+                for data in processor.datasets_check_buffer
+            }
+            raw_paths = [self.save_dir / "raw-models-info.jsonl", self.save_dir / "raw-datasets-info.jsonl"]
+            # Written aside and swapped in, the raw files may be what is being read.
+            back_writer = ModelDatasetJsonlineWriter(
+                str(raw_paths[0].with_suffix('.tmp.jsonl')),
+                str(raw_paths[1].with_suffix('.tmp.jsonl')),
+                ['repo_org_mapper'], ['repo_org_mapper']
+            )
+            for inp in self._crawl_detail_page_res:
+                if 'model_name' in inp.data.keys():
+                    name = f"{inp.data['repo']}/{inp.data['model_name']}"
+                    inp.data[key] = model_check.get(name, inp.data[key])
+                elif 'dataset_name' in inp.data.keys():
+                    name = f"{inp.data['repo']}/{inp.data['dataset_name']}"
+                    inp.data[key] = dataset_check.get(name, inp.data[key])
+                back_writer.write(inp)
+            back_writer.close()
+            # The raw files were rewritten, checkpointed offsets must follow.
+            for writer, path in zip([back_writer.model_writer, back_writer.dataset_writer], raw_paths):
+                os.replace(writer.path, path)
+                self.checkpoint.record_replaced('post_process', path)
+            self.checkpoint.sync()
+
+        if self._post_writer is not None:
+            self._post_writer.close()
+            if self._columnar:
+                convert(self.save_dir / 'processed-models-info.jsonl')
+                convert(self.save_dir / 'processed-datasets-info.jsonl')
+        if self._db_writer is not None:
+            self._db_writer.close()
+        count = defaultdict(int)
+        for data in self._post_process_res:
+            if 'model_name' in data.data.keys():
+                count['models'] += 1
+            elif 'dataset_name' in data.data.keys():
+                count['datasets'] += 1
+        logger.info(f"Post process done. Total models: {count['models']}. Total datasets: {count['datasets']}")
+        if hasattr(processor, 'history'):
+            # Index this snapshot for the post processing of next month.
+            processor.history.refresh()
+
+
+class HFPipeline(_StreamingSteps):
+
+    source = 'HuggingFace'
+    downloads_key = 'downloads_last_month'
+    repo_crawler = HFRepoPageCrawler
+    detail_crawler = HFDetailPageCrawler
+    processor = HFInfoProcessor
+    repo_keys = [
+        'category', 'threads', 'max_retries', 'backend', 'engine', 'concurrency', 'per_host', 'rate',
+        'driver_profile', 'cache_dir',
+        'max_threads', 'recycle_pages', 'recycle_minutes'
+    ]
+    detail_keys = [
+        'threads', 'max_retries', 'screenshot_path', 'backend', 'fallback',
+        'engine', 'concurrency', 'per_host', 'rate', 'driver_profile', 'cache_dir',
+        'max_threads', 'recycle_pages', 'recycle_minutes'
+    ]
+    post_keys = [
+        'dataset_info_path', 'model_info_path', 'ai_gen', 'ai_check',
+        'buffer_size', 'max_retries', 'llm_concurrency', 'llm_rate', 'heuristics', 'heuristics_threshold',
+        'screenshot_max_side', 'screenshot_crop'
+    ]
     
     def __init__(
         self, 
@@ -29,6 +485,7 @@ class HFPipeline:
         load_dir: str | None = None,
         save_dir: str | None = None,
         log_path: str | None = None,
+        resume: bool = True,
     ):
         self.task_name = task_name
         self.crawl_date = datetime.now().strftime(r"%Y-%m-%d_%H-%M-%S")
@@ -52,6 +509,8 @@ class HFPipeline:
         logger.add(sys.stderr, level="DEBUG")
         logger.add(log_path, level="DEBUG")
         self.error_f = log_path.parent
+        # Completed urls of this save_dir are skipped on a rerun unless resume is off.
+        self.checkpoint = Checkpoint(self.save_dir, fresh=not resume)
         
     def step_all(
         self,
@@ -103,220 +562,52 @@ class HFPipeline:
         if save:
             save_path = self.save_dir / "org-links.jsonl"
             writer = JsonlineWriter(save_path)
-            writer.parse_input(res)
-            res = next(writer.run())
+            res = writer.write(res)
         writer.close()
         self._init_org_links_res = res
         return self
     
-    def _crawl_repo_page(self, save, **kargs):
-        error_f = self.error_f / 'org-links.jsonl'
-        error_f = open(error_f, 'a')
-        self.error_writer = jsonlines.Writer(error_f)
-        logger.info("Crawl repo page of HuggingFace")
-        if not hasattr(self, "_init_org_links_res"):
-            logger.info("Missing the running result of the previous step (init_org_links)")
-            logger.info(f"Trying load required data from {self.load_dir}")
-            reader = JsonlineReader(self.load_dir/'org-links.jsonl')
-            error_list = next(reader.run()).data.get('content')
-            self._init_org_links_res = PipelineData({
-                "HuggingFace": [err['repo_link'] for err in error_list],
-                "target_sources": ["HuggingFace"],
-            }, None, None)
-        inp = self._init_org_links_res
-        kargs = {k: v for k, v in kargs.items() if k in ['category', 'threads', 'max_retries']}
-        crawler = HFRepoPageCrawler(**kargs)
-        crawler.parse_input(inp)
-        count = len(crawler.input['link-category'])
-        pbar = tqdm(total=count, desc="Crawling repo infos from HuggingFace...")
-        res = []
-        if save:
-            save_path = self.save_dir / "repo-page.jsonl"
-            writer = JsonlineWriter(save_path, drop_keys=['repo_org_mapper'])
-        for data in crawler.run():
-            if data.error is not None:
-                self.error_writer.write(data.error)
-                error_f.flush()
-                pbar.update(1)
-                continue
-            pbar.write(f"{data.message['repo']} huggingface has {data.message['total_links']} {data.message['category']}.")
-            if save:
-                writer.parse_input(data)
-                res.append(next(writer.run()))
-            else:
-                res.append(data)
-            pbar.update(1)
-        
-        writer.close()
-        pbar.close()
-        self.error_writer.close()
-        error_f.close()
-        self._crawl_repo_page_res = res
-        return self
+    def _detail_page_planner(self, **kargs) -> IncrementalPlanner | None:
+        if not kargs.get('incremental', False):
+            return None
+        return IncrementalPlanner(
+            'HuggingFace',
+            kargs.get('history_data_path'),
+            hot_threshold=kargs.get('hot_threshold', 1000),
+            refresh_days=kargs.get('refresh_days', 90),
+            # Long-tail repos are refreshed over plain HTTP unless that is already the backend.
+            cheap_path=kargs.get('backend', 'selenium') != 'http',
+        )
 
-    def _crawl_detail_page(self, save, **kargs):
-        error_f = self.error_f / 'repo-page.jsonl'
-        error_f = open(error_f, 'a')
-        self.error_writer = jsonlines.Writer(error_f)
-        logger.info("Crawl detail page of HuggingFace")
-        if not hasattr(self, "_crawl_repo_page_res"):
-            logger.info("Missing the running result of the previous step (crawl_repo_page)")
-            logger.info(f"Trying load required data from {self.load_dir}")
-            reader = JsonlineReader(self.load_dir/'repo-page.jsonl')
-            error_list = next(reader.run()).data.get('content')
-            model_urls = []
-            dataset_urls = []
-            for err in error_list:
-                if err['category'] == 'models':
-                    model_urls.append(err['detail_link'])
-                elif err['category'] == 'datasets':
-                    dataset_urls.append(err['detail_link'])
-            self._crawl_repo_page_res = [PipelineData({
-                'category': 'models',
-                'detail_urls': model_urls
-            }, None, None), PipelineData({
-                'category': 'datasets',
-                'detail_urls': dataset_urls
-            }, None, None)]
-        inps = self._crawl_repo_page_res
-        kargs = {k: v for k, v in kargs.items() if k in ['threads', 'max_retries', 'screenshot_path']}
-        crawler = HFDetailPageCrawler(**kargs)
-        count = sum(len(inp.data['detail_urls']) for inp in inps if inp.data is not None)
-        pbar = tqdm(total=count, desc="Crawling detail infos from HuggingFace...")
-        res = []
-        if save:
-            writer = ModelDatasetJsonlineWriter(
-                str(self.save_dir / "raw-models-info.jsonl"),
-                str(self.save_dir / "raw-datasets-info.jsonl"),
-                ['repo_org_mapper'], ['repo_org_mapper']
-            )
-        for inp in inps:
-            crawler.parse_input(inp)
-            for data in crawler.run():
-                if data.error is not None:
-                    self.error_writer.write(data.error)
-                    error_f.flush()
-                    pbar.update(1)
-                    continue
-                if save:
-                    writer.parse_input(data)
-                    res.append(next(writer.run()))
-                else:
-                    res.append(data)
-                pbar.update(1)
-        
-        writer.close()
-        pbar.close()
-        self.error_writer.close()
-        error_f.close()
-        count = defaultdict(int)
-        for data in res:
-            if 'model_name' in data.data.keys():
-                count['models'] += 1
-            elif 'dataset_name' in data.data.keys():
-                count['datasets'] += 1
-        logger.info(f"Crawl detail page done. Total models: {count['models']}. Total datasets: {count['datasets']}")
-        self._crawl_detail_page_res = res
-        return self
-    
-    def _post_process(self, save, **kargs):
-        error_f = self.error_f / 'post-process-error.jsonl'
-        error_f = open(error_f, 'w')
-        self.error_writer = jsonlines.Writer(error_f)
-        logger.info("Post Processing of HuggingFace data.")
-        if not hasattr(self, "_crawl_detail_page_res"):
-            logger.info("Missing the running result of the previous step (crawl_detail_page)")
-            logger.info(f"Trying load required data from {self.save_dir}")
-            org_links_reader = OrgLinksReader(sources=['HuggingFace'])
-            org_links_reader.parse_input()
-            models_reader = JsonlineReader(self.save_dir / 'raw-models-info.jsonl')
-            datasets_reader = JsonlineReader(self.save_dir / 'raw-datasets-info.jsonl')
-            repo_org_mapper = next(org_links_reader.run()).data['repo_org_mapper']
-            self._crawl_detail_page_res = next(models_reader.run()).data.get('content')
-            self._crawl_detail_page_res.extend(next(datasets_reader.run()).data.get('content'))
-            for inp in self._crawl_detail_page_res:
-                inp['repo_org_mapper'] = repo_org_mapper
-            self._crawl_detail_page_res = [
-                PipelineData(inp, None, None) for inp in self._crawl_detail_page_res
-            ]
-            
-        inps = self._crawl_detail_page_res
-        kargs = {k: v for k, v in kargs.items() if k in [
-            'dataset_info_path', 'model_info_path', 'ai_gen', 'ai_check',
-            'buffer_size', 'max_retries'
-        ]}
-        processor = HFInfoProcessor(**kargs)
-        res = []
-        if save:
-            writer = ModelDatasetJsonlineWriter(
-                str(self.save_dir / 'processed-models-info.jsonl'),
-                str(self.save_dir / 'processed-datasets-info.jsonl'),
-            )
-        for inp in inps:
-            processor.parse_input(inp)
-            for data in processor.run():
-                if data.error is not None:
-                    self.error_writer.write(data.error)
-                    error_f.flush()
-                    continue
-                if save:
-                    writer.parse_input(data)
-                    res.append(next(writer.run()))
-                else:
-                    res.append(data)
-        for data in processor.flush(update_infos=True):
-            if data.error is not None:
-                self.error_writer.write(data.error)
-                error_f.flush()
-                continue
-            if save:
-                writer.parse_input(data)
-                res.append(next(writer.run()))
-            else:
-                res.append(data)
+    def _detail_page_crawlers(self, **kargs) -> tuple[PipelineStep, PipelineStep | None]:
+        cheap_crawler = None
+        if self._planner is not None and self._planner.cheap_path:
+            cheap_crawler = HFDetailPageCrawler(**(kargs | {'backend': 'http'}))
+        return HFDetailPageCrawler(**kargs), cheap_crawler
 
-        if kargs.get('ai_check', False):
-            model_check = {
-                f'{data['repo']}/{data['model_name']}': data['downloads_last_month']
-                for data in processor.models_check_buffer
-            }
-            dataset_check = {
-                f'{data['repo']}/{data['dataset_name']}': data['downloads_last_month']
-                for data in processor.datasets_check_buffer
-            }
-            back_writer = ModelDatasetJsonlineWriter(
-                str(self.save_dir / "raw-models-info.jsonl"),
-                str(self.save_dir / "raw-datasets-info.jsonl"),
-                ['repo_org_mapper'], ['repo_org_mapper']
-            )
-            for inp in self._crawl_detail_page_res:
-                if 'model_name' in inp.data.keys():
-                    key = f'{inp.data['repo']}/{inp.data['model_name']}'
-                    downloads_last_month = model_check.get(key, inp.data['downloads_last_month'])
-                    inp.data['downloads_last_month'] = downloads_last_month
-                elif 'dataset_name' in inp.data.keys():
-                    key = f'{inp.data['repo']}/{inp.data['dataset_name']}'
-                    downloads_last_month = dataset_check.get(key, inp.data['downloads_last_month'])
-                    inp.data['downloads_last_month'] = downloads_last_month
-                back_writer.parse_input(inp)
-                next(back_writer.run())
-            back_writer.close()
-        
-        writer.close()
-        self.error_writer.close()
-        error_f.close()
-        count = defaultdict(int)
-        for data in res:
-            if 'model_name' in data.data.keys():
-                count['models'] += 1
-            elif 'dataset_name' in data.data.keys():
-                count['datasets'] += 1
-        logger.info(f"Post process done. Total models: {count['models']}. Total datasets: {count['datasets']}")
-        self._post_process_res = res
-        return self
 
+class MSPipeline(_StreamingSteps):
 
-class MSPipeline:
+    source = 'ModelScope'
+    downloads_key = 'total_downloads'
+    repo_crawler = MSRepoPageCrawler
+    detail_crawler = MSDetailPageCrawler
+    processor = MSInfoProcessor
+    repo_keys = [
+        'category', 'threads', 'max_retries', 'engine', 'per_host', 'rate',
+        'driver_profile', 'cache_dir',
+        'max_threads', 'recycle_pages', 'recycle_minutes'
+    ]
+    detail_keys = [
+        'threads', 'max_retries', 'screenshot_path', 'engine', 'per_host', 'rate',
+        'driver_profile', 'cache_dir',
+        'max_threads', 'recycle_pages', 'recycle_minutes'
+    ]
+    post_keys = [
+        'dataset_info_path', 'model_info_path', 'ai_gen', 'ai_check',
+        'buffer_size', 'max_retries', 'llm_concurrency', 'llm_rate', 'heuristics', 'heuristics_threshold',
+        'screenshot_max_side', 'screenshot_crop', 'history_data_path'
+    ]
     
     def __init__(
         self,
@@ -324,6 +615,7 @@ class MSPipeline:
         load_dir: str | None = None,
         save_dir: str | None = None,
         log_path: str | None = None,
+        resume: bool = True,
     ):
         self.task_name = task_name
         self.crawl_date = datetime.now().strftime(r"%Y-%m-%d_%H-%M-%S")
@@ -347,6 +639,8 @@ class MSPipeline:
         logger.add(sys.stderr, level="DEBUG")
         logger.add(log_path, level="DEBUG")
         self.error_f = log_path.parent
+        # Completed urls of this save_dir are skipped on a rerun unless resume is off.
+        self.checkpoint = Checkpoint(self.save_dir, fresh=not resume)
         
     def step_all(
         self,
@@ -398,216 +692,21 @@ class MSPipeline:
         if save:
             save_path = self.save_dir / "org-links.jsonl"
             writer = JsonlineWriter(save_path)
-            writer.parse_input(res)
-            res = next(writer.run())
+            res = writer.write(res)
             writer.close()
         self._init_org_links_res = res
         return self
     
-    def _crawl_repo_page(self, save, **kargs):
-        error_f = self.error_f / 'org-links.jsonl'
-        error_f = open(error_f, 'a')
-        self.error_writer = jsonlines.Writer(error_f)
-        logger.info("Crawl repo page of ModelScope")
-        if not hasattr(self, "_init_org_links_res"):
-            logger.info("Missing the running result of the previous step (init_org_links)")
-            logger.info(f"Trying load required data from {self.load_dir}")
-            reader = JsonlineReader(self.load_dir/'org-links.jsonl')
-            error_list = next(reader.run()).data.get('content')
-            self._init_org_links_res = PipelineData({
-                "ModelScope": [err['repo_link'] for err in error_list],
-                "target_sources": ["ModelScope"],
-            }, None, None)
-        inp = self._init_org_links_res
-        kargs = {k: v for k, v in kargs.items() if k in ['category', 'threads', 'max_retries']}
-        crawler = MSRepoPageCrawler(**kargs)
-        crawler.parse_input(inp)
-        count = len(crawler.input['link-category'])
-        pbar = tqdm(total=count, desc="Crawling repo infos from ModelScope...")
-        res = []
-        if save:
-            save_path = self.save_dir / "repo-page.jsonl"
-            writer = JsonlineWriter(save_path, drop_keys=['repo_org_mapper'])
-        for data in crawler.run():
-            if data.error is not None:
-                self.error_writer.write(data.error)
-                error_f.flush()
-                pbar.update(1)
-                continue
-            pbar.write(f"{data.message['repo']} modelscope has {data.message['total_links']} {data.message['category']}.")
-            if save:
-                writer.parse_input(data)
-                res.append(next(writer.run()))
-            else:
-                res.append(data)
-            pbar.update(1)
-        
-        writer.close()
-        pbar.close()
-        self.error_writer.close()
-        error_f.close()
-        self._crawl_repo_page_res = res
-        return self
-
-    def _crawl_detail_page(self, save, **kargs):
-        error_f = self.error_f / 'repo-page.jsonl'
-        error_f = open(error_f, 'a')
-        self.error_writer = jsonlines.Writer(error_f)
-        logger.info("Crawl detail page of ModelScope")
-        if not hasattr(self, "_crawl_repo_page_res"):
-            logger.info("Missing the running result of the previous step (crawl_repo_page)")
-            logger.info(f"Trying load required data from {self.load_dir}")
-            reader = JsonlineReader(self.load_dir/'repo-page.jsonl')
-            error_list = next(reader.run()).data.get('content')
-            model_urls = []
-            dataset_urls = []
-            for err in error_list:
-                if err['category'] == 'models':
-                    model_urls.append(err['detail_link'])
-                elif err['category'] == 'datasets':
-                    dataset_urls.append(err['detail_link'])
-            self._crawl_repo_page_res = [PipelineData({
-                'category': 'models',
-                'detail_urls': model_urls
-            }, None, None), PipelineData({
-                'category': 'datasets',
-                'detail_urls': dataset_urls
-            }, None, None)]
-        inps = self._crawl_repo_page_res
-        kargs = {k: v for k, v in kargs.items() if k in ['threads', 'max_retries', 'screenshot_path']}
-        crawler = MSDetailPageCrawler(**kargs)
-        count = sum(len(inp.data['detail_urls']) for inp in inps if inp.data is not None)
-        pbar = tqdm(total=count, desc="Crawling detail infos from ModelScope...")
-        res = []
-        if save:
-            writer = ModelDatasetJsonlineWriter(
-                str(self.save_dir / "raw-models-info.jsonl"),
-                str(self.save_dir / "raw-datasets-info.jsonl"),
-                ['repo_org_mapper'], ['repo_org_mapper']
-            )
-        for inp in inps:
-            crawler.parse_input(inp)
-            for data in crawler.run():
-                if data.error is not None:
-                    self.error_writer.write(data.error)
-                    error_f.flush()
-                    pbar.update(1)
-                    continue
-                if save:
-                    writer.parse_input(data)
-                    res.append(next(writer.run()))
-                else:
-                    res.append(data)
-                pbar.update(1)
-        
-        writer.close()
-        pbar.close()
-        self.error_writer.close()
-        error_f.close()
-        count = defaultdict(int)
-        for data in res:
-            if 'model_name' in data.data.keys():
-                count['models'] += 1
-            elif 'dataset_name' in data.data.keys():
-                count['datasets'] += 1
-        logger.info(f"Crawl detail page done. Total models: {count['models']}. Total datasets: {count['datasets']}")
-        self._crawl_detail_page_res = res
-        return self
-    
-    def _post_process(self, save, **kargs):
-        error_f = self.error_f / 'post-process-error.jsonl'
-        error_f = open(error_f, 'w')
-        self.error_writer = jsonlines.Writer(error_f)
-        logger.info("Post Processing of ModelScope data.")
-        if not hasattr(self, "_crawl_detail_page_res"):
-            logger.info("Missing the running result of the previous step (crawl_detail_page)")
-            logger.info(f"Trying load required data from {self.save_dir}")
-            org_links_reader = OrgLinksReader(sources=['ModelScope'])
-            org_links_reader.parse_input()
-            models_reader = JsonlineReader(self.save_dir / 'raw-models-info.jsonl')
-            datasets_reader = JsonlineReader(self.save_dir / 'raw-datasets-info.jsonl')
-            repo_org_mapper = next(org_links_reader.run()).data['repo_org_mapper']
-            self._crawl_detail_page_res = next(models_reader.run()).data.get('content')
-            self._crawl_detail_page_res.extend(next(datasets_reader.run()).data.get('content'))
-            for inp in self._crawl_detail_page_res:
-                inp['repo_org_mapper'] = repo_org_mapper
-            self._crawl_detail_page_res = [
-                PipelineData(inp, None, None) for inp in self._crawl_detail_page_res
-            ]
-        inps = self._crawl_detail_page_res
-        kargs = {k: v for k, v in kargs.items() if k in [
-            'dataset_info_path', 'model_info_path', 'ai_gen', 'ai_check',
-            'buffer_size', 'max_retries', 'history_data_path'
-        ]}
-        processor = MSInfoProcessor(**kargs)
-        res = []
-        if save:
-            writer = ModelDatasetJsonlineWriter(
-                str(self.save_dir / 'processed-models-info.jsonl'),
-                str(self.save_dir / 'processed-datasets-info.jsonl'),
-            )
-        for inp in inps:
-            processor.parse_input(inp)
-            for data in processor.run():
-                if data.error is not None:
-                    self.error_writer.write(data.error)
-                    error_f.flush()
-                    continue
-                if save:
-                    writer.parse_input(data)
-                    res.append(next(writer.run()))
-                else:
-                    res.append(data)
-        for data in processor.flush(update_infos=True):
-            if data.error is not None:
-                self.error_writer.write(data.error)
-                error_f.flush()
-                continue
-            if save:
-                writer.parse_input(data)
-                res.append(next(writer.run()))
-            else:
-                res.append(data)
-                
-        if kargs.get('ai_check', False):
-            model_check = {
-                f'{data['repo']}/{data['model_name']}': data['total_downloads']
-                for data in processor.models_check_buffer
-            }
-            dataset_check = {
-                f'{data['repo']}/{data['dataset_name']}': data['total_downloads']
-                for data in processor.datasets_check_buffer
-            }
-            back_writer = ModelDatasetJsonlineWriter(
-                str(self.save_dir / "raw-models-info.jsonl"),
-                str(self.save_dir / "raw-datasets-info.jsonl"),
-                ['repo_org_mapper'], ['repo_org_mapper']
-            )
-            for inp in self._crawl_detail_page_res:
-                if 'model_name' in inp.data.keys():
-                    key = f'{inp.data['repo']}/{inp.data['model_name']}'
-                    downloads = model_check.get(key, inp.data['total_downloads'])
-                    inp.data['total_downloads'] = downloads
-                elif 'dataset_name' in inp.data.keys():
-                    key = f'{inp.data['repo']}/{inp.data['dataset_name']}'
-                    downloads = dataset_check.get(key, inp.data['total_downloads'])
-                    inp.data['total_downloads'] = downloads
-                back_writer.parse_input(inp)
-                next(back_writer.run())
-            back_writer.close()
-        
-        writer.close()
-        self.error_writer.close()
-        error_f.close()
-        count = defaultdict(int)
-        for data in res:
-            if 'model_name' in data.data.keys():
-                count['models'] += 1
-            elif 'dataset_name' in data.data.keys():
-                count['datasets'] += 1
-        logger.info(f"Post process done. Total models: {count['models']}. Total datasets: {count['datasets']}")
-        self._post_process_res = res
-        return self
+    def _detail_page_planner(self, **kargs) -> IncrementalPlanner | None:
+        if not kargs.get('incremental', False):
+            return None
+        return IncrementalPlanner(
+            'ModelScope',
+            kargs.get('history_data_path'),
+            hot_threshold=kargs.get('hot_threshold', 1000),
+            refresh_days=kargs.get('refresh_days', 90),
+            cheap_path=False,
+        )
 
 
 class OpenDataLabPipeline:
@@ -677,8 +776,7 @@ class OpenDataLabPipeline:
         if save:
             save_path = self.save_dir / "org-links.jsonl"
             writer = JsonlineWriter(save_path)
-            writer.parse_input(res)
-            res = next(writer.run())
+            res = writer.write(res)
         writer.close()
         self._init_org_links_res = res
         return self
@@ -688,7 +786,10 @@ class OpenDataLabPipeline:
         if not hasattr(self, "_init_org_links_res"):
             raise RuntimeError("Missing the running result of the previous step (init_org_links)")
         inp = self._init_org_links_res
-        kargs = {k: v for k, v in kargs.items() if k in ['threads', 'max_retries']}
+        kargs = {k: v for k, v in kargs.items() if k in [
+            'threads', 'max_retries', 'driver_profile', 'cache_dir',
+            'max_threads', 'recycle_pages', 'recycle_minutes'
+        ]}
         crawler = OpenDataLabCrawler(**kargs)
         crawler.parse_input(inp)
         count = len(crawler.input['links'])
@@ -701,8 +802,7 @@ class OpenDataLabPipeline:
             if data.error is not None:
                 raise RuntimeError("Error crawling OpenDataLab page.")
             if save:
-                writer.parse_input(data)
-                res.append(next(writer.run()))
+                res.append(writer.write(data))
             else:
                 res.append(data)
             pbar.update(1)
@@ -719,16 +819,14 @@ class OpenDataLabPipeline:
         if not hasattr(self, "_crawl_repo_page_res"):
             logger.info("Missing the running result of the previous step (crawl_repo_page)")
             logger.info(f"Trying load required data from {self.save_dir}")
-            datasets_reader = JsonlineReader(self.save_dir / 'raw-datasets-info.jsonl')
-            self._crawl_repo_page_res = next(datasets_reader.run()).data.get('content')
-            self._crawl_repo_page_res = [
-                PipelineData(inp, None, None) for inp in self._crawl_repo_page_res
-            ]
+            self._crawl_repo_page_res = JsonlineReader(self.save_dir / 'raw-datasets-info.jsonl')
 
         inps = self._crawl_repo_page_res
+        db_writer = DBWriter() if kargs.get('save_db', False) else None
+        columnar = save and kargs.get('columnar', False)
         kargs = {k: v for k, v in kargs.items() if k in [
             'dataset_info_path', 'history_data_path', 'ai_gen',
-            'buffer_size', 'max_retries'
+            'buffer_size', 'max_retries', 'llm_concurrency', 'llm_rate'
         ]}
         processor = OpenDataLabInfoProcessor(**kargs)
         res = []
@@ -741,9 +839,14 @@ class OpenDataLabPipeline:
                     self.error_writer.write(data.error)
                     error_f.flush()
                     continue
+                if db_writer is not None:
+                    db_writer.parse_input(data)
+                    for out in db_writer.run():
+                        if out.error is not None:
+                            self.error_writer.write(out.error)
+                            error_f.flush()
                 if save:
-                    writer.parse_input(data)
-                    res.append(next(writer.run()))
+                    res.append(writer.write(data))
                 else:
                     res.append(data)
         for data in processor.flush(update_infos=True):
@@ -751,17 +854,30 @@ class OpenDataLabPipeline:
                 self.error_writer.write(data.error)
                 error_f.flush()
                 continue
+            if db_writer is not None:
+                db_writer.parse_input(data)
+                for out in db_writer.run():
+                    if out.error is not None:
+                        self.error_writer.write(out.error)
+                        error_f.flush()
             if save:
-                writer.parse_input(data)
-                res.append(next(writer.run()))
+                res.append(writer.write(data))
             else:
                 res.append(data)
         
         writer.close()
+        if columnar:
+            convert(self.save_dir / 'processed-datasets-info.jsonl')
+        if db_writer is not None:
+            for out in db_writer.flush():
+                self.error_writer.write(out.error)
+            db_writer.close()
         self.error_writer.close()
         error_f.close()
         count = len(res)
         logger.info(f"Post process done. Total datasets: {count}")
+        # Index this snapshot for the post processing of next month.
+        processor.history.refresh()
         self._post_process_res = res
         return self
 
@@ -833,8 +949,7 @@ class BAAIDataPipeline:
         if save:
             save_path = self.save_dir / "org-links.jsonl"
             writer = JsonlineWriter(save_path)
-            writer.parse_input(res)
-            res = next(writer.run())
+            res = writer.write(res)
         writer.close()
         self._init_org_links_res = res
         return self
@@ -855,8 +970,7 @@ class BAAIDataPipeline:
             if data.error is not None:
                 raise RuntimeError("Error crawling BAAIData.")
             if save:
-                writer.parse_input(data)
-                res.append(next(writer.run()))
+                res.append(writer.write(data))
             else:
                 res.append(data)
             
@@ -871,16 +985,14 @@ class BAAIDataPipeline:
         if not hasattr(self, "_crawl_repo_page_res"):
             logger.info("Missing the running result of the previous step (crawl_repo_page)")
             logger.info(f"Trying load required data from {self.save_dir}")
-            datasets_reader = JsonlineReader(self.save_dir / 'raw-datasets-info.jsonl')
-            self._crawl_repo_page_res = next(datasets_reader.run()).data.get('content')
-            self._crawl_repo_page_res = [
-                PipelineData(inp, None, None) for inp in self._crawl_repo_page_res
-            ]
+            self._crawl_repo_page_res = JsonlineReader(self.save_dir / 'raw-datasets-info.jsonl')
 
         inps = self._crawl_repo_page_res
+        db_writer = DBWriter() if kargs.get('save_db', False) else None
+        columnar = save and kargs.get('columnar', False)
         kargs = {k: v for k, v in kargs.items() if k in [
             'dataset_info_path', 'history_data_path', 'ai_gen',
-            'buffer_size', 'max_retries'
+            'buffer_size', 'max_retries', 'llm_concurrency', 'llm_rate'
         ]}
         processor = BAAIDataInfoProcessor(**kargs)
         res = []
@@ -893,9 +1005,14 @@ class BAAIDataPipeline:
                     self.error_writer.write(data.error)
                     error_f.flush()
                     continue
+                if db_writer is not None:
+                    db_writer.parse_input(data)
+                    for out in db_writer.run():
+                        if out.error is not None:
+                            self.error_writer.write(out.error)
+                            error_f.flush()
                 if save:
-                    writer.parse_input(data)
-                    res.append(next(writer.run()))
+                    res.append(writer.write(data))
                 else:
                     res.append(data)
         for data in processor.flush(update_infos=True):
@@ -903,21 +1020,54 @@ class BAAIDataPipeline:
                 self.error_writer.write(data.error)
                 error_f.flush()
                 continue
+            if db_writer is not None:
+                db_writer.parse_input(data)
+                for out in db_writer.run():
+                    if out.error is not None:
+                        self.error_writer.write(out.error)
+                        error_f.flush()
             if save:
-                writer.parse_input(data)
-                res.append(next(writer.run()))
+                res.append(writer.write(data))
             else:
                 res.append(data)
         
         writer.close()
+        if columnar:
+            convert(self.save_dir / 'processed-datasets-info.jsonl')
+        if db_writer is not None:
+            for out in db_writer.flush():
+                self.error_writer.write(out.error)
+            db_writer.close()
         self.error_writer.close()
         error_f.close()
         count = len(res)
         logger.info(f"Post process done. Total datasets: {count}")
+        # Index this snapshot for the post processing of next month.
+        processor.history.refresh()
         self._post_process_res = res
         return self
 
 
+def _other_source_datasets() -> pd.DataFrame | None:
+    # TODO temp handle other source dataset
+    data_path = Path(__file__).parents[2] / 'data/other-source-datasets.jsonl'
+    if data_path.exists():
+        return pd.read_json(data_path, lines=True)
+    return None
+
+
+# `<name>.csv` files of a ranking, summaries first. Ranks after the summaries
+# carry their change to last month as `delta rank`.
+RANKING_TABLES = [
+    'data-summary', 'model-summary',
+    'data-rank', 'model-rank', 'infra-rank', 'eval-rank', 'overall-rank',
+]
+ACCUMULATED_RANKING_TABLES = [
+    'data-accumulated-summary', 'model-accumulated-summary',
+    'data-accumulated-rank', 'model-accumulated-rank', 'overall-accumulated-rank',
+]
+
+
 class MergeAndRankingPipeline:
     
     def __init__(
@@ -943,24 +1093,16 @@ class MergeAndRankingPipeline:
         logger.add(sys.stderr, level="DEBUG")
         logger.add(log_path, level="DEBUG")
         
-    def _get_last_month_path(self, date: str):
-        date = datetime.strptime(date, r"%Y-%m-%d")
-        last_month_date = date - timedelta(days=30)
-        
-        min_diff = None
-        closest_date = None
-        
-        for d in (Path(__file__).parents[2]/'data').glob(r"????-??-??"):
-            cur_date = datetime.strptime(d.name, r"%Y-%m-%d")
-            diff = abs((cur_date - last_month_date).days)
-            if min_diff is None or diff < min_diff:
-                min_diff = diff
-                closest_date = d
-                
-        if min_diff > 15:
+    @staticmethod
+    def _get_last_month_path(date: str, data_dir: Path | None = None, ranked: list[str] = ()):
+        """The snapshot a month before `date` that is ranked, or is among the `ranked` dates of a backfill."""
+        data_dir = data_dir or Path(__file__).parents[2] / 'data'
+        closest_date = nearest_date(_snapshot_dates(data_dir), month_before(date))
+        if closest_date is None:
             return None
         
-        if (closest_date / 'overall-rank.csv').exists():
+        closest_date = data_dir / closest_date
+        if (closest_date / 'overall-rank.csv').exists() or closest_date.name in ranked:
             return closest_date
         return None
         
@@ -1019,6 +1161,8 @@ class MergeAndRankingPipeline:
                 } # TODO Currently missing the date_last_crawl and date_enter_db fields
                 writer.write(data)
                 res.append(data)
+        if kargs.get('columnar', False):
+            write_columnar(res, save_path)
         self._merge_models_res = res
         logger.info(f"Total model records: {len(buffer)}")
         return self
@@ -1058,6 +1202,8 @@ class MergeAndRankingPipeline:
                 } # TODO Currently missing the date_last_crawl and date_enter_db fields
                 writer.write(data)
                 res.append(data)
+        if kargs.get('columnar', False):
+            write_columnar(res, save_path)
         self._merge_datasets_res = res
         logger.info(f"Total datasets records: {len(buffer)}")
         return self
@@ -1068,64 +1214,8 @@ class MergeAndRankingPipeline:
         config: dict,
         target_orgs: list,
     ) -> pd.DataFrame:
-        weights: dict[str, float | int] = config[1]
-        if target_orgs[0] == 'all':
-            target_orgs = df['org'].unique()
-        res = pd.DataFrame(index=target_orgs)
-        lifecycle_mapper = {
-            'pretraining': 'Pre-training',
-            'finetuning': 'Fine-tuning',
-            'preference': 'Preference'
-        }
-        
-        # TODO temp handle other source dataset
-        data_path = Path(__file__).parents[2] / 'data/other-source-datasets.jsonl'
-        if data_path.exists():
-            other_data = pd.read_json(data_path, lines=True)
-        
-        for key in weights.keys():
-            if key.startswith('num'):
-                if key.split("_")[-1] in ['pretraining', 'finetuning', 'preference']:
-                    lifecycle = lifecycle_mapper.get(key.split("_")[-1])
-                    res[key] = df[df["lifecycle"] == lifecycle].groupby(
-                        'org').size().reindex(target_orgs, fill_value=0)
-                    
-                    # TODO temp handle other source dataset
-                    if data_path.exists():
-                        res[key] += other_data[other_data['lifecycle'] == lifecycle].groupby(
-                            'org').size().reindex(target_orgs, fill_value=0)
-                else:
-                    modality = key.split("_")[-1].title()
-                    res[key] = df[df['modality'] == modality].groupby(
-                        'org').size().reindex(target_orgs, fill_value=0)
-                    
-                    # TODO temp handle other source dataset
-                    if data_path.exists():
-                        res[key] += other_data[other_data['modality'] == modality].groupby(
-                            'org').size().reindex(target_orgs, fill_value=0)
-            elif key.startswith("downloads"):
-                if key.split("_")[-1] in ['pretraining', 'finetuning', 'preference']:
-                    lifecycle = lifecycle_mapper.get(key.split("_")[-1])
-                    res[key] = df[df["lifecycle"] == lifecycle].groupby(
-                        'org')['downloads_last_month'].sum().reindex(target_orgs, fill_value=0)
-                else: 
-                    modality = key.split("_")[-1].title()
-                    res[key] = df[df['modality'] == modality].groupby(
-                        'org')['downloads_last_month'].sum().reindex(target_orgs, fill_value=0)
-            elif key == 'dataset_usage':
-                res[key] = df.groupby('org')['dataset_usage'].sum().reindex(
-                    target_orgs, fill_value=0)
-            elif key == 'operators':
-                # TODO data process tool operators
-                res[key] = pd.Series({
-                    "BAAI": 24,
-                    "Ali": 105,
-                }).reindex(target_orgs, fill_value=0)
-            else:
-                raise RuntimeError(f"Unrecognized field {key}")
-            
-        res.index.name = 'org'
-        return res
+        cube = SummaryCube(df, 'downloads_last_month', _other_source_datasets())
+        return data_summary(cube, config[1], target_orgs)
 
     def _summary_model(
         self, 
@@ -1133,44 +1223,7 @@ class MergeAndRankingPipeline:
         config: dict,
         target_orgs: list,
     ) -> pd.DataFrame:
-        weights: dict[str, float | int] = config[1]
-        if target_orgs[0] == 'all':
-            target_orgs = df['org'].unique()
-        res = pd.DataFrame(index=target_orgs)
-        for key in weights.keys():
-            if key.startswith('num') and key != 'num_adapted_chips':
-                modality = key.split("_")[-1].title()
-                res[key] = df[df['modality'] == modality].groupby(
-                    'org').size().reindex(target_orgs, fill_value=0)
-            elif key.startswith('downloads'):
-                modality = key.split("_")[-1].title()
-                res[key] = df[df['modality'] == modality].groupby(
-                    'org')['downloads_last_month'].sum().reindex(
-                        target_orgs, fill_value=0)
-            elif key == 'descendants':
-                res[key] = df.groupby('org')['descendants'].sum().reindex(
-                    target_orgs, fill_value=0)
-            elif key == 'likes':
-                res[key] = df.groupby('org')[key].sum().reindex(
-                    target_orgs, fill_value=0)
-            elif key == 'issue':
-                res[key] = df.groupby('org')['community'].sum().reindex(
-                    target_orgs, fill_value=0)
-            elif key == 'num_adapted_chips':
-                # TODO chips model
-                res[key] = pd.Series({
-                    "BAAI": 4,
-                    "Baidu": 2,
-                    "Huawei": 2,
-                    "Meta": 2,
-                    "Google": 2,
-                    "ByteDance": 2
-                }).reindex(target_orgs, fill_value=1)
-            else:
-                raise RuntimeError(f"Unrecognized field {key}")
-
-        res.index.name = 'org'
-        return res
+        return model_summary(SummaryCube(df, 'downloads_last_month'), config[1], target_orgs)
 
     def _summary_infra(self, config: dict, target_orgs: list) -> pd.DataFrame:
         infra_path = self.data_dir / 'infra-summary.csv'
@@ -1194,11 +1247,7 @@ class MergeAndRankingPipeline:
 
     def _normalize_summary(self, summary: pd.DataFrame, config: dict) -> pd.DataFrame:
         df = summary.div(summary.max())
-        weights = config[1]
-        weights = {
-            k: v if isinstance(v, (int, float)) else eval(v)
-            for k, v in weights.items() if k in summary.columns
-        }
+        weights = {k: v for k, v in config[1].items() if k in summary.columns}
         if config[0] == 'average':
             df['score'] = df.mean(axis=1)
             df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
@@ -1210,25 +1259,30 @@ class MergeAndRankingPipeline:
         return df
 
     def _ranking(self, save, **kargs):
+        tables = self._rank_tables(**kargs)
+        self._save_ranking(self.data_dir, tables, self._load_last_month(self.data_dir_last_month))
+        return self
+
+    def _rank_tables(self, **kargs) -> dict[str, pd.DataFrame]:
+        """The summaries and rankings of this snapshot, without the changes to last month."""
         logger.info("Calculate ranking.")
 
         if not hasattr(self, "_merge_models_res"):
             logger.info(f"Trying load merged models from {self.data_dir}")
-            merged_models = pd.read_json(self.data_dir/'merged-models-info.jsonl', 
-                                         lines=True)
+            merged_models = read_frame(self.data_dir/'merged-models-info.jsonl')
         else:
             merged_models = pd.DataFrame(self._merge_models_res)
         if not hasattr(self, "_merge_datasets_res"):
             logger.info(f"Trying load merged datasets from {self.data_dir}")
-            merged_datasets = pd.read_json(self.data_dir/'merged-datasets-info.jsonl', 
-                                           lines=True)
+            merged_datasets = read_frame(self.data_dir/'merged-datasets-info.jsonl')
         else:
             merged_datasets = pd.DataFrame(self._merge_datasets_res)
 
         kargs = {k: v for k, v in kargs.items() if k in [
             'data_config', 'model_config', 'infra_config', 'eval_config',
-            'target_orgs', 'ranking_weights'
+            'target_orgs', 'ranking_weights', 'weights_total'
         ]}
+        kargs = compile_ranking(kargs)
         target_orgs = kargs.get('target_orgs', ['all'])
         
         # TODO Add embodied model? If not adding embodied model, then reset to multimodal.
@@ -1242,45 +1296,12 @@ class MergeAndRankingPipeline:
             target_orgs = infra_summary.index.tolist()
         data_summary = self._summary_data(merged_datasets, kargs['data_config'], target_orgs)
         model_summary = self._summary_model(merged_models, kargs['model_config'], target_orgs)
-        
-        if self.data_dir_last_month:
-            data_summary_last_month = pd.read_csv(self.data_dir_last_month/'data-summary.csv',
-                                                  index_col='org')
-            model_summary_last_month = pd.read_csv(self.data_dir_last_month/'model-summary.csv',
-                                                   index_col='org')
-            data_summary_delta = data_summary - data_summary_last_month
-            model_summary_delta = model_summary - model_summary_last_month
-            
-            data_summary_delta.to_csv(self.data_dir / "data-summary-delta.csv")
-            model_summary_delta.to_csv(self.data_dir / "model-summary-delta.csv")
-        
-        data_summary.to_csv(self.data_dir / "data-summary.csv")
-        model_summary.to_csv(self.data_dir / "model-summary.csv")
 
         logger.info("Normalize the summary table and calculate the rankings for each dimension.")
         data_normalization = self._normalize_summary(data_summary, kargs['data_config'])
         model_normalization = self._normalize_summary(model_summary, kargs['model_config'])
         infra_normalization = self._normalize_summary(infra_summary, kargs['infra_config'])
         eval_normalization = self._normalize_summary(eval_summary, kargs['eval_config'])
-        
-        if self.data_dir_last_month:
-            data_rank_last_month = pd.read_csv(self.data_dir_last_month/'data-rank.csv',
-                                               index_col='org')
-            model_rank_last_month = pd.read_csv(self.data_dir_last_month/'model-rank.csv',
-                                                index_col='org')
-            infra_rank_last_month = pd.read_csv(self.data_dir_last_month/'infra-rank.csv',
-                                                index_col='org')
-            eval_rank_last_month = pd.read_csv(self.data_dir_last_month/'eval-rank.csv',
-                                               index_col='org')
-            data_normalization['delta rank'] = data_rank_last_month['rank'] - data_normalization['rank']
-            model_normalization['delta rank'] = model_rank_last_month['rank'] - model_normalization['rank']
-            infra_normalization['delta rank'] = infra_rank_last_month['rank'] - infra_normalization['rank']
-            eval_normalization['delta rank'] = eval_rank_last_month['rank'] - eval_normalization['rank']
-        
-        data_normalization.to_csv(self.data_dir / 'data-rank.csv')
-        model_normalization.to_csv(self.data_dir / 'model-rank.csv')
-        infra_normalization.to_csv(self.data_dir / 'infra-rank.csv')
-        eval_normalization.to_csv(self.data_dir / 'eval-rank.csv')
 
         logger.info("Calculate overall ranking based on sub-dimension rankings.")
         orgs = data_normalization.index.intersection(
@@ -1296,21 +1317,37 @@ class MergeAndRankingPipeline:
         overall_ranking['model'] = 1 / np.log2(model_normalization['rank'] + 1)
         overall_ranking['infra'] = 1 / np.log2(infra_normalization['rank'] + 1)
         overall_ranking['eval'] = 1 / np.log2(eval_normalization['rank'] + 1)
-        overall_weights = kargs['ranking_weights']
-        overall_weights = {
-            k: v if isinstance(v, (int, float)) else eval(v)
-            for k, v in overall_weights.items()
-        }
-        overall_ranking['score'] = overall_ranking.mul(overall_weights).sum(axis=1)
+        overall_ranking['score'] = overall_ranking.mul(kargs['ranking_weights']).sum(axis=1)
         overall_ranking['rank'] = overall_ranking['score'].rank(ascending=False, method='dense').astype(int)
-        
-        if self.data_dir_last_month:
-            overall_ranking_last_month = pd.read_csv(self.data_dir_last_month/'overall-rank.csv',
-                                                     index_col='org')
-            overall_ranking['delta rank'] = overall_ranking_last_month['rank'] - overall_ranking['rank']
-        
-        overall_ranking.to_csv(self.data_dir / "overall-rank.csv")
-        return self
+        return {
+            'data-summary': data_summary,
+            'model-summary': model_summary,
+            'data-rank': data_normalization,
+            'model-rank': model_normalization,
+            'infra-rank': infra_normalization,
+            'eval-rank': eval_normalization,
+            'overall-rank': overall_ranking,
+        }
+
+    @staticmethod
+    def _load_last_month(data_dir_last_month: Path | None) -> dict[str, pd.DataFrame] | None:
+        if not data_dir_last_month:
+            return None
+        return {
+            name: pd.read_csv(data_dir_last_month/f'{name}.csv', index_col='org')
+            for name in RANKING_TABLES
+        }
+
+    @staticmethod
+    def _save_ranking(data_dir: Path, tables: dict[str, pd.DataFrame], last: dict[str, pd.DataFrame] | None):
+        """Write the `tables` of `_rank_tables` with their changes to the tables of `last` month."""
+        if last is not None:
+            (tables['data-summary'] - last['data-summary']).to_csv(data_dir / "data-summary-delta.csv")
+            (tables['model-summary'] - last['model-summary']).to_csv(data_dir / "model-summary-delta.csv")
+            for name in RANKING_TABLES[2:]:
+                tables[name]['delta rank'] = last[name]['rank'] - tables[name]['rank']
+        for name in RANKING_TABLES:
+            tables[name].to_csv(data_dir / f"{name}.csv")
 
 
 class AccumulateAndRankingPipeline:
@@ -1338,26 +1375,13 @@ class AccumulateAndRankingPipeline:
         logger.add(sys.stderr, level="DEBUG")
         logger.add(log_path, level="DEBUG")
         
-    def _get_last_month_path(self, date: str):
-        date = datetime.strptime(date, r"%Y-%m-%d")
-        last_month_date = date - timedelta(days=30)
-        
-        min_diff = None
-        closest_date = None
-        
-        for d in sorted((Path(__file__).parents[2]/'data').glob(r"????-??-??"))[1:]:
-            cur_date = datetime.strptime(d.name, r"%Y-%m-%d")
-            diff = abs((cur_date - last_month_date).days)
-            if min_diff is None or diff < min_diff:
-                min_diff = diff
-                closest_date = d
-                
-        if min_diff > 15:
+    @staticmethod
+    def _get_last_month_path(date: str, data_dir: Path | None = None, ranked: list[str] = ()):
+        data_dir = data_dir or Path(__file__).parents[2] / 'data'
+        closest_date = nearest_date(_snapshot_dates(data_dir)[1:], month_before(date))
+        if closest_date is None:
             return None
-        
-        if (closest_date / 'overall-accumulated-rank.csv').exists():
-            return closest_date
-        return closest_date
+        return data_dir / closest_date
         
     def step(
         self,
@@ -1378,121 +1402,39 @@ class AccumulateAndRankingPipeline:
         logger.success("AccumulateAndRankingPipeline done.")
     
     def _accumulate(self, save, **kargs):
-        date = datetime.strptime(self.date, r"%Y-%m-%d")
-        base_path = self.data_dir.parent
-        models_buffer = defaultdict(list)
-        datasets_buffer = defaultdict(list)
-        for path in sorted(base_path.glob("????-??-??"))[1:]:
-            if datetime.strptime(path.name, r"%Y-%m-%d") > date:
-                continue
-            with jsonlines.open(path/'merged-models-info.jsonl', 'r') as f:
-                for item in f:
-                    key = f"{item['repo']}/{item['model_name']}"
-                    models_buffer[key].append(item)
-            with jsonlines.open(path/'merged-datasets-info.jsonl', 'r') as f:
-                for item in f:
-                    key = f"{item['repo']}/{item['dataset_name']}"
-                    datasets_buffer[key].append(item)
-        models_buffer = [
-            {
-                'org': lst[0]['org'],
-                'repo': lst[0]['repo'],
-                'model_name': lst[0]['model_name'],
-                'modality': lst[0]['modality'],
-                'accumulated_downloads': sum(item['downloads_last_month'] for item in lst),
-                'likes': max([item['likes'] for item in lst]),
-                'community': max([item['community'] for item in lst]),
-                'descendants': max([item['descendants'] for item in lst]), 
-            }
-            for lst in models_buffer.values()
-        ]
-        datasets_buffer = [
-            {
-                'org': lst[0]['org'],
-                'repo': lst[0]['repo'],
-                'dataset_name': lst[0]['dataset_name'],
-                'modality': lst[0]['modality'],
-                'lifecycle': lst[0]['lifecycle'],
-                'accumulated_downloads': sum(item['downloads_last_month'] for item in lst),
-                'likes': max([item['likes'] for item in lst]),
-                'community': max([item['community'] for item in lst]),
-                'dataset_usage': max([item['dataset_usage'] for item in lst])
-            }
-            for lst in datasets_buffer.values()
-        ]
+        totals = self.accumulate_totals(self.data_dir.parent, str(kargs.get('cutoff') or self.date))
+        models_buffer = to_records(totals['models'])
+        datasets_buffer = to_records(totals['datasets'])
         with jsonlines.open(self.data_dir/'accumulated-models-info.jsonl', 'w') as f:
             f.write_all(models_buffer)
         with jsonlines.open(self.data_dir/'accumulated-datasets-info.jsonl', 'w') as f:
             f.write_all(datasets_buffer)
+        if kargs.get('columnar', False):
+            write_columnar(models_buffer, self.data_dir/'accumulated-models-info.jsonl')
+            write_columnar(datasets_buffer, self.data_dir/'accumulated-datasets-info.jsonl')
             
         self._accumulated_models = models_buffer
         self._accumulated_datasets = datasets_buffer
         return self
-        
+
+    @staticmethod
+    def accumulate_totals(base_path: Path, cutoff: str) -> dict[str, pd.DataFrame]:
+        """Totals of the snapshots under `base_path` up to `cutoff`, see `Accumulator`."""
+        dates = [path.name for path in sorted(base_path.glob("????-??-??"))[1:] if path.name <= cutoff]
+        accumulator = Accumulator(base_path)
+        try:
+            return accumulator.accumulate(dates)
+        finally:
+            accumulator.close()
+
     def _summary_data(
         self, 
         df: pd.DataFrame, 
         config: dict,
         target_orgs: list,
     ) -> pd.DataFrame:
-        weights: dict[str, float | int] = config[1]
-        if target_orgs[0] == 'all':
-            target_orgs = df['org'].unique()
-        res = pd.DataFrame(index=target_orgs)
-        lifecycle_mapper = {
-            'pretraining': 'Pre-training',
-            'finetuning': 'Fine-tuning',
-            'preference': 'Preference'
-        }
-        
-        # TODO temp handle other source dataset
-        data_path = Path(__file__).parents[2] / 'data/other-source-datasets.jsonl'
-        if data_path.exists():
-            other_data = pd.read_json(data_path, lines=True)
-            
-        for key in weights.keys():
-            if key.startswith('num'):
-                if key.split("_")[-1] in ['pretraining', 'finetuning', 'preference']:
-                    lifecycle = lifecycle_mapper.get(key.split("_")[-1])
-                    res[key] = df[df["lifecycle"] == lifecycle].groupby(
-                        'org').size().reindex(target_orgs, fill_value=0)
-                    
-                    # TODO temp handle other source dataset
-                    if data_path.exists():
-                        res[key] += other_data[other_data['lifecycle'] == lifecycle].groupby(
-                            'org').size().reindex(target_orgs, fill_value=0)
-                else:
-                    modality = key.split("_")[-1].title()
-                    res[key] = df[df['modality'] == modality].groupby(
-                        'org').size().reindex(target_orgs, fill_value=0)
-                    
-                    # TODO temp handle other source dataset
-                    if data_path.exists():
-                        res[key] += other_data[other_data['modality'] == modality].groupby(
-                            'org').size().reindex(target_orgs, fill_value=0)
-            elif key.startswith("downloads"):
-                if key.split("_")[-1] in ['pretraining', 'finetuning', 'preference']:
-                    lifecycle = lifecycle_mapper.get(key.split("_")[-1])
-                    res[key] = df[df["lifecycle"] == lifecycle].groupby(
-                        'org')['accumulated_downloads'].sum().reindex(target_orgs, fill_value=0)
-                else: 
-                    modality = key.split("_")[-1].title()
-                    res[key] = df[df['modality'] == modality].groupby(
-                        'org')['accumulated_downloads'].sum().reindex(target_orgs, fill_value=0)
-            elif key == 'dataset_usage':
-                res[key] = df.groupby('org')['dataset_usage'].sum().reindex(
-                    target_orgs, fill_value=0)
-            elif key == 'operators':
-                # TODO data process tool operators
-                res[key] = pd.Series({
-                    "BAAI": 24,
-                    "Ali": 105,
-                }).reindex(target_orgs, fill_value=0)
-            else:
-                raise RuntimeError(f"Unrecognized field {key}")
-            
-        res.index.name = 'org'
-        return res
+        cube = SummaryCube(df, 'accumulated_downloads', _other_source_datasets())
+        return data_summary(cube, config[1], target_orgs)
 
     def _summary_model(
         self, 
@@ -1500,45 +1442,8 @@ class AccumulateAndRankingPipeline:
         config: dict,
         target_orgs: list,
     ) -> pd.DataFrame:
-        weights: dict[str, float | int] = config[1]
-        if target_orgs[0] == 'all':
-            target_orgs = df['org'].unique()
-        res = pd.DataFrame(index=target_orgs)
-        for key in weights.keys():
-            if key.startswith('num') and key != 'num_adapted_chips':
-                modality = key.split("_")[-1].title()
-                res[key] = df[df['modality'] == modality].groupby(
-                    'org').size().reindex(target_orgs, fill_value=0)
-            elif key.startswith('downloads'):
-                modality = key.split("_")[-1].title()
-                res[key] = df[df['modality'] == modality].groupby(
-                    'org')['accumulated_downloads'].sum().reindex(
-                        target_orgs, fill_value=0)
-            elif key == 'descendants':
-                res[key] = df.groupby('org')['descendants'].sum().reindex(
-                    target_orgs, fill_value=0)
-            elif key == 'likes':
-                res[key] = df.groupby('org')[key].sum().reindex(
-                    target_orgs, fill_value=0)
-            elif key == 'issue':
-                res[key] = df.groupby('org')['community'].sum().reindex(
-                    target_orgs, fill_value=0)
-            elif key == 'num_adapted_chips':
-                # TODO chips model
-                res[key] = pd.Series({
-                    "BAAI": 4,
-                    "Baidu": 2,
-                    "Huawei": 2,
-                    "Meta": 2,
-                    "Google": 2,
-                    "ByteDance": 2
-                }).reindex(target_orgs, fill_value=1)
-            else:
-                raise RuntimeError(f"Unrecognized field {key}")
+        return model_summary(SummaryCube(df, 'accumulated_downloads'), config[1], target_orgs)
 
-        res.index.name = 'org'
-        return res
-    
     def _summary_infra(self, config: dict, target_orgs: list) -> pd.DataFrame:
         infra_path = self.data_dir / 'infra-summary.csv'
         weights: dict[str, float | int] = config[1]
@@ -1561,11 +1466,7 @@ class AccumulateAndRankingPipeline:
     
     def _normalize_summary(self, summary: pd.DataFrame, config: dict) -> pd.DataFrame:
         df = summary.div(summary.max())
-        weights = config[1]
-        weights = {
-            k: v if isinstance(v, (int, float)) else eval(v)
-            for k, v in weights.items() if k in summary.columns
-        }
+        weights = {k: v for k, v in config[1].items() if k in summary.columns}
         if config[0] == 'average':
             df['score'] = df.mean(axis=1)
             df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
@@ -1577,25 +1478,30 @@ class AccumulateAndRankingPipeline:
         return df
 
     def _ranking(self, save, **kargs):
+        tables = self._rank_tables(**kargs)
+        self._save_ranking(self.data_dir, tables, self._load_last_month(self.data_dir_last_month))
+        return self
+
+    def _rank_tables(self, **kargs) -> dict[str, pd.DataFrame]:
+        """The accumulated summaries and rankings of this snapshot, without the changes to last month."""
         logger.info("Calculate accumulated ranking.")
         
         if not hasattr(self, '_accumulated_models'):
             logger.info(f"Trying load accumulated models from {self.data_dir}")
-            accumulated_models = pd.read_json(self.data_dir/'accumulated-models-info.jsonl',
-                                              lines=True)
+            accumulated_models = read_frame(self.data_dir/'accumulated-models-info.jsonl')
         else:
             accumulated_models = pd.DataFrame(self._accumulated_models)
         if not hasattr(self, '_accumulated_datasets'):
             logger.info(f"Trying load accumulated datasets from {self.data_dir}")
-            accumulated_datasets = pd.read_json(self.data_dir/'accumulated-datasets-info.jsonl',
-                                                lines=True)
+            accumulated_datasets = read_frame(self.data_dir/'accumulated-datasets-info.jsonl')
         else:
             accumulated_datasets = pd.DataFrame(self._accumulated_datasets)
 
         kargs = {k: v for k, v in kargs.items() if k in [
             'data_config', 'model_config', 'infra_config', 'eval_config',
-            'target_orgs', 'ranking_weights'
+            'target_orgs', 'ranking_weights', 'weights_total'
         ]}
+        kargs = compile_ranking(kargs)
         target_orgs = kargs.get('target_orgs', ['all'])
         
         # TODO Add embodied model? If not adding embodied model, then reset to multimodal.
@@ -1610,27 +1516,11 @@ class AccumulateAndRankingPipeline:
         data_summary = self._summary_data(accumulated_datasets, kargs['data_config'], target_orgs)
         model_summary = self._summary_model(accumulated_models, kargs['model_config'], target_orgs)
         
-        data_summary.to_csv(self.data_dir/"data-accumulated-summary.csv")
-        model_summary.to_csv(self.data_dir/"model-accumulated-summary.csv")
-        
         logger.info("Normalize the summary table and calculate the rankings for datasets and models.")
         data_normalization = self._normalize_summary(data_summary, kargs['data_config'])
         model_normalization = self._normalize_summary(model_summary, kargs['model_config'])
         infra_normalization = self._normalize_summary(infra_summary, kargs['infra_config'])
         eval_normalization = self._normalize_summary(eval_summary, kargs['eval_config'])
-        
-        if self.data_dir_last_month:
-            data_rank_last_month = pd.read_csv(
-                self.data_dir_last_month/'data-accumulated-rank.csv',
-                index_col='org')
-            model_rank_last_month = pd.read_csv(
-                self.data_dir_last_month/'model-accumulated-rank.csv',
-                index_col='org')
-            data_normalization['delta rank'] = data_rank_last_month['rank'] - data_normalization['rank']
-            model_normalization['delta rank'] = model_rank_last_month['rank'] - model_normalization['rank']
-            
-        data_normalization.to_csv(self.data_dir/'data-accumulated-rank.csv')
-        model_normalization.to_csv(self.data_dir/'model-accumulated-rank.csv')
 
         logger.info("Calculate overall ranking based on sub-dimension rankings.")
         orgs = data_normalization.index.intersection(
@@ -1645,19 +1535,30 @@ class AccumulateAndRankingPipeline:
         overall_ranking['model'] = 1 / np.log2(model_normalization['rank'] + 1)
         overall_ranking['infra'] = 1 / np.log2(infra_normalization['rank'] + 1)
         overall_ranking['eval'] = 1 / np.log2(eval_normalization['rank'] + 1)
-        overall_weights = kargs['ranking_weights']
-        overall_weights = {
-            k: v if isinstance(v, (int, float)) else eval(v)
-            for k, v in overall_weights.items()
-        }
-        overall_ranking['score'] = overall_ranking.mul(overall_weights).sum(axis=1)
+        overall_ranking['score'] = overall_ranking.mul(kargs['ranking_weights']).sum(axis=1)
         overall_ranking['rank'] = overall_ranking['score'].rank(ascending=False, method='dense').astype(int)
-        
-        if self.data_dir_last_month:
-            overall_ranking_last_month = pd.read_csv(
-                self.data_dir_last_month/'overall-accumulated-rank.csv',
-                index_col='org')
-            overall_ranking['delta rank'] = overall_ranking_last_month['rank'] - overall_ranking['rank']
-        
-        overall_ranking.to_csv(self.data_dir/"overall-accumulated-rank.csv")
-        return self
+        return {
+            'data-accumulated-summary': data_summary,
+            'model-accumulated-summary': model_summary,
+            'data-accumulated-rank': data_normalization,
+            'model-accumulated-rank': model_normalization,
+            'overall-accumulated-rank': overall_ranking,
+        }
+
+    @staticmethod
+    def _load_last_month(data_dir_last_month: Path | None) -> dict[str, pd.DataFrame] | None:
+        if not data_dir_last_month:
+            return None
+        return {
+            name: pd.read_csv(data_dir_last_month/f'{name}.csv', index_col='org')
+            for name in ACCUMULATED_RANKING_TABLES[2:]
+        }
+
+    @staticmethod
+    def _save_ranking(data_dir: Path, tables: dict[str, pd.DataFrame], last: dict[str, pd.DataFrame] | None):
+        """Write the `tables` of `_rank_tables` with their changes to the ranks of `last` month."""
+        if last is not None:
+            for name in ACCUMULATED_RANKING_TABLES[2:]:
+                tables[name]['delta rank'] = last[name]['rank'] - tables[name]['rank']
+        for name in ACCUMULATED_RANKING_TABLES:
+            tables[name].to_csv(data_dir / f"{name}.csv")
@@ -1,5 +1,8 @@
 import re
+import requests
+from lxml import html
 from pathlib import Path
+from urllib.parse import urlsplit
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -250,6 +253,7 @@ class HFModelPage(object):
     )
     _likes = (By.XPATH, "/html/body/div/main/div[1]/header/div/h1/div[3]/button[2]")
     _model_tree = (By.XPATH, "/html/body/div/main/div[2]/section[2]")
+    _pipeline_tag = (By.XPATH, "//header//a[starts-with(@href, '/models?pipeline_tag=')]")
     _community_navigation = (
         By.XPATH,
         "/html/body/div/main/div[1]/header/div/div[2]/div[1]",
@@ -292,6 +296,7 @@ class HFModelPage(object):
             metadata["likes"] = self._get_likes()
             metadata["tree"] = self._get_model_tree_leaves()
             metadata["community"] = self._get_community()
+            metadata["pipeline_tag"] = self._get_pipeline_tag()
 
             if self.screenshot_path:
                 self.screenshot_path = Path(self.screenshot_path)
@@ -375,6 +380,13 @@ class HFModelPage(object):
         except Exception:
             raise
 
+    def _get_pipeline_tag(self) -> Optional[str]:
+        # Only a hint for the classification, many models have no tag.
+        tags = self.driver.find_elements(*self._pipeline_tag)
+        if not tags:
+            return None
+        return tags[0].get_attribute("href").split("pipeline_tag=")[-1].split("&")[0]
+
 
 class HFDatasetPage:
     _main_part = (By.XPATH, "/html/body/div/main/div[2]/section[2]")
@@ -498,3 +510,174 @@ class HFDatasetPage:
                 return "0"
         except Exception:
             raise
+
+
+def _hf_api_url(link: str, category: Literal['datasets', 'models']) -> str:
+    parts = urlsplit(link.rstrip('/'))
+    repo_id = '/'.join(parts.path.split('/')[-2:])
+    return f"{parts.scheme}://{parts.netloc}/api/{category}/{repo_id}"
+
+
+def _hf_fetch(session: requests.Session, url: str, timeout: float, as_json: bool = False):
+    resp = session.get(url, timeout=timeout)
+    resp.raise_for_status()
+    if as_json:
+        return resp.json()
+    return html.fromstring(resp.content)
+
+
+def _hf_get_community(tree: html.HtmlElement) -> str:
+    headers = tree.xpath('//main//header')
+    if not headers:
+        raise RuntimeError("Header not found in the static page")
+    m = None
+    for tab in headers[0].iter('a'):
+        text = tab.text_content()
+        if "Community" in text:
+            m = re.search(r"\d+", text)
+    if m:
+        return m.group(0)
+    return "0"
+
+
+class HFModelHTTPPage:
+    """
+    Plain HTTP counterpart of `HFModelPage`. Downloads, likes and pipeline tag come
+    from the JSON API, the model tree and community count from the static page 
+    parsed by lxml. Screenshots are not supported.
+    """
+    _main_part = '//main/div[2]/section[2]'
+
+    def __init__(self, session: requests.Session, link: str, timeout: float = 10):
+        self.session = session
+        self.link = link
+        self.timeout = timeout
+
+    def scrape(self) -> HFModelInfo:
+        date_crawl = str(datetime.today().date())
+        try:
+            metadata = self.get_model_info()
+            info = HFModelInfo(date_crawl, self.link, metadata=metadata)
+        except Exception as e:
+            info = HFModelInfo(date_crawl, self.link, None, e)
+        return info
+
+    def get_model_info(self) -> Optional[dict]:
+        api_info = _hf_fetch(
+            self.session, _hf_api_url(self.link, 'models'), self.timeout, as_json=True)
+        tree = _hf_fetch(self.session, self.link, self.timeout)
+        return {
+            "downloads_last_month": api_info.get("downloads", 0),
+            "likes": api_info.get("likes", 0),
+            "tree": self._get_model_tree_leaves(tree),
+            "community": _hf_get_community(tree),
+            "pipeline_tag": api_info.get("pipeline_tag"),
+        }
+
+    def _get_model_tree_leaves(self, tree: html.HtmlElement) -> list[str]:
+        sections = tree.xpath(self._main_part)
+        if not sections:
+            raise RuntimeError("Model tree section not found in the static page")
+        total = []
+        for div in sections[0].iter('div'):
+            matches = re.findall(r"(\d+)\s+models?", div.text_content())
+            if matches:
+                total.extend(matches)
+                break
+        return total
+
+
+class HFDatasetHTTPPage:
+    """
+    Plain HTTP counterpart of `HFDatasetPage`, see `HFModelHTTPPage`.
+    """
+    _main_part = '//main/div[2]/section[2]'
+    _dataset_usage = './/div[contains(concat(" ", normalize-space(@class), " "), " space-y-3 ")]'
+
+    def __init__(self, session: requests.Session, link: str, timeout: float = 10):
+        self.session = session
+        self.link = link
+        self.timeout = timeout
+
+    def scrape(self) -> HFDatasetInfo:
+        date_crawl = str(datetime.today().date())
+        try:
+            metadata = self.get_dataset_info()
+            info = HFDatasetInfo(date_crawl, self.link, metadata=metadata)
+        except Exception as e:
+            info = HFDatasetInfo(date_crawl, self.link, None, e)
+        return info
+
+    def get_dataset_info(self) -> Optional[dict]:
+        api_info = _hf_fetch(
+            self.session, _hf_api_url(self.link, 'datasets'), self.timeout, as_json=True)
+        tree = _hf_fetch(self.session, self.link, self.timeout)
+        return {
+            "downloads_last_month": api_info.get("downloads", 0),
+            "likes": api_info.get("likes", 0),
+            "community": _hf_get_community(tree),
+            "dataset_usage": self._get_dataset_usage(tree),
+        }
+
+    def _get_dataset_usage(self, tree: html.HtmlElement) -> int:
+        sections = tree.xpath(self._main_part)
+        if not sections:
+            raise RuntimeError("Main section not found in the static page")
+        usage_divs = sections[0].xpath(self._dataset_usage)
+        if not usage_divs:
+            return 0
+        expand = usage_divs[0].xpath('./a')
+        if expand:
+            m = re.search(r"(\d+)\s+models?", expand[0].text_content())
+            if m:
+                return str2int(m.group(1))
+            raise RuntimeError("Error when parse integer in dataset usage")
+        return len(usage_divs[0].xpath('./div'))
+
+
+class HFRepoHTTPPage:
+    """
+    Plain HTTP counterpart of `HFRepoPage`, lists the repos of an organization
+    through the paginated JSON API.
+    """
+
+    def __init__(self, session: requests.Session, link: str, timeout: float = 10):
+        self.session = session
+        self.link = link
+        self.timeout = timeout
+
+    def scrape(self, category: Literal["models", "datasets"]) -> HFRepoInfo:
+        repo = self.link.rstrip("/").split("/")[-1]
+        assert category in ["models", "datasets"]
+        try:
+            detail_urls = self.get_links(category)
+            total_links = len(detail_urls)
+            assert len(detail_urls) == len(set(detail_urls))
+            error_msg = None
+        except Exception as e:
+            error_msg = e
+            detail_urls = None
+            total_links = None
+
+        return HFRepoInfo(
+            repo=repo,
+            repo_url=self.link,
+            category=category,
+            detail_urls=detail_urls,
+            total_links=total_links,
+            error_msg=error_msg
+        )
+
+    def get_links(self, category: Literal["models", "datasets"]) -> list[str]:
+        parts = urlsplit(self.link.rstrip('/'))
+        base = f"{parts.scheme}://{parts.netloc}"
+        author = parts.path.split('/')[-1]
+        prefix = base if category == 'models' else f"{base}/datasets"
+        url = f"{base}/api/{category}?author={author}&limit=1000"
+        res = []
+        while url:
+            resp = self.session.get(url, timeout=self.timeout)
+            resp.raise_for_status()
+            res.extend(f"{prefix}/{item['id']}" for item in resp.json())
+            url = resp.links.get('next', {}).get('url')
+        return res
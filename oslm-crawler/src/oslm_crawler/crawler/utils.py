@@ -1,58 +1,290 @@
+import os
+import copy
+import time
 import queue
 import threading
-from typing import Generator
+import requests
+from pathlib import Path
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Generator, Literal
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver import ChromeOptions
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.remote.webdriver import WebDriver
 from webdriver_manager.chrome import ChromeDriverManager
 from loguru import logger
+from .. import budget
+from ..budget import BudgetExhausted
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def resolve_chromedriver_path() -> str:
+    """Locate (and if needed download) chromedriver once per process."""
+    global _chromedriver_path
+    if _chromedriver_path is None:
+        with _chromedriver_lock:
+            if _chromedriver_path is None:
+                _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
+
 
 def init_driver() -> WebDriver:
     options = ChromeOptions()
     options.add_argument('--headless')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()), options=options)
     
     return driver
 
 
+# Requests the crawled pages never need. Images are also switched off in the
+# renderer, the patterns catch what slips through (fonts, trackers, avatars).
+# Scripts are never blocked: ModelScope renders its pages with bundles served
+# from g.alicdn.com and aliyuncs.com, so only analytics hosts are listed.
+LEAN_BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*fonts.googleapis.com*', '*fonts.gstatic.com*', '*plausible.io*',
+    '*hm.baidu.com*', '*cnzz.com*',
+    '*cdn-avatars.huggingface.co*', '*gravatar.com*', '*sentry.io*',
+]
+
+
+def lean_chrome_options() -> ChromeOptions:
+    """
+    Headless Chrome that stops at DOMContentLoaded and skips images. Stylesheets
+    are kept, the scrapers wait on element visibility.
+    """
+    options = ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--disable-component-update')
+    options.add_argument('--disable-sync')
+    options.add_argument('--mute-audio')
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.default_content_setting_values.notifications': 2,
+    })
+    options.page_load_strategy = 'eager'
+    return options
+
+
+def init_session(pool_size: int = 10) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+                       '(KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36'),
+        'Accept-Language': 'en-US,en;q=0.9',
+    })
+    return session
+
+
+@dataclass
+class DriverStats:
+    created: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    pages: int = 0
+
+
+@dataclass
+class PoolMetrics:
+    acquired: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    grown: int = 0
+    shrunk: int = 0
+    recycled: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.acquired if self.acquired else 0.0
+
+
+def _process_tree_rss(pid: int) -> int:
+    """Resident memory in bytes of `pid` and all of its descendants."""
+    if psutil is not None:
+        try:
+            proc = psutil.Process(pid)
+            procs = [proc] + proc.children(recursive=True)
+        except psutil.Error:
+            return 0
+        rss = 0
+        for p in procs:
+            try:
+                rss += p.memory_info().rss
+            except psutil.Error:
+                pass
+        return rss
+    children = defaultdict(list)
+    for stat in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            # The command name may contain spaces, the ppid follows the last ')'.
+            fields = stat.read_text().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        children[int(fields[1])].append(int(stat.parent.name))
+    rss, stack = 0, [pid]
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    while stack:
+        p = stack.pop()
+        try:
+            rss += int(Path(f'/proc/{p}/statm').read_text().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        stack.extend(children[p])
+    return rss
+
+
 class WebDriverPool:
+    """
+    Pool of Chrome drivers. The pool starts with `size` drivers and, when
+    `max_size` is larger, grows by one whenever a caller has waited `grow_wait`
+    seconds for a driver, and retires drivers that sat idle for `idle_timeout`
+    seconds down to `size` again, checked whenever a driver is taken or
+    returned. Drivers are handed out most recently used first, so the ones the
+    load does not need stay idle. Drivers are recycled after `max_pages` pages
+    or `max_age` seconds to keep Chrome's memory in check.
+
+    Every driver holds a permit of the installed `budget`. Only the first
+    driver of an empty pool waits for one, the pool starts smaller or skips
+    growing while the budget is used up elsewhere.
+    """
 
-    def __init__(self, size: int = 1, options: ChromeOptions | None = None):
-        if options is None:
+    def __init__(
+        self,
+        size: int = 1,
+        options: ChromeOptions | None = None,
+        profile: Literal['default', 'lean'] = 'default',
+        cache_dir: str | None = None,
+        blocked_urls: list[str] | None = None,
+        max_size: int | None = None,
+        max_pages: int | None = None,
+        max_age: float | None = None,
+        grow_wait: float = 2.0,
+        idle_timeout: float = 300.0,
+    ):
+        assert profile in ['default', 'lean'], f"Unknown driver profile: {profile}"
+        if options is None and profile == 'lean':
+            options = lean_chrome_options()
+        elif options is None:
             options = ChromeOptions()
             options.add_argument('--headless')
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
             options.add_argument('--disable-gpu') 
+        if blocked_urls is None and profile == 'lean':
+            blocked_urls = LEAN_BLOCKED_URLS
+        max_size = max(size, max_size or size)
 
         self.options = options
-        self._pool = queue.Queue(maxsize=size)
+        self.blocked_urls = blocked_urls
+        # Chrome cannot open one disk cache from two processes, so every live
+        # driver gets its own slot under cache_dir. A replaced driver takes over
+        # the slot, and with it the warm cache, of the one it replaces.
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._free_slots = list(range(max_size))
+        self._slot_of = {}
+        self._slot_lock = threading.Lock()
+        self._pool = queue.LifoQueue(maxsize=max_size)
         self._lock = threading.Lock()
         self._current_size = 0
         self.target_size = size
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.grow_wait = grow_wait
+        self.idle_timeout = idle_timeout
+        self._stats: dict[str, DriverStats] = {}
+        self.metrics = PoolMetrics()
         self._shutdown = False
         self._initialize_pool()
 
     def _initialize_pool(self):
+        # Chrome start-up is mostly waiting on the browser process, so the
+        # drivers are launched side by side.
         with self._lock:
-            while self._current_size < self.target_size:
-                try:
-                    driver = self._create_driver()
-                    self._pool.put(driver)
-                    self._current_size += 1
-                except Exception:
-                    logger.exception("Failed to create driver during initialization.")
-                    break
+            missing = self.target_size - self._current_size
+            if missing <= 0:
+                return
+            granted = 0
+            while granted < missing and budget.acquire_driver(
+                    block=granted == 0 and self._current_size == 0):
+                granted += 1
+            if granted < missing:
+                logger.info(f"Driver budget allows {granted} of {missing} drivers for now.")
+            if granted == 0:
+                return
+            resolve_chromedriver_path()
+            with ThreadPoolExecutor(granted, thread_name_prefix='driver-warmup') as executor:
+                futures = [executor.submit(self._create_driver, True) for _ in range(granted)]
+                for future in as_completed(futures):
+                    try:
+                        self._pool.put(future.result())
+                        self._current_size += 1
+                    except Exception:
+                        logger.exception("Failed to create driver during initialization.")
 
-    def _create_driver(self) -> webdriver.Chrome:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=self.options)
+    def _create_driver(self, reserved: bool = False) -> webdriver.Chrome:
+        if not reserved and not budget.acquire_driver(block=False):
+            raise BudgetExhausted("No driver left in the budget.")
+        options = self.options
+        slot = None
+        try:
+            if self.cache_dir is not None:
+                with self._slot_lock:
+                    slot = self._free_slots.pop(0)
+                options = copy.deepcopy(self.options)
+                options.add_argument(f'--disk-cache-dir={self.cache_dir / f"driver-{slot}"}')
+                options.add_argument('--disk-cache-size=268435456')
+            driver = webdriver.Chrome(
+                service=Service(resolve_chromedriver_path()), options=options)
+            if self.blocked_urls:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+        except Exception:
+            budget.release_driver()
+            if slot is not None:
+                with self._slot_lock:
+                    self._free_slots.append(slot)
+            raise
+        with self._slot_lock:
+            if slot is not None:
+                self._slot_of[driver.session_id] = slot
+            self._stats[driver.session_id] = DriverStats()
         return driver
 
+    def _quit_driver(self, driver: webdriver.Chrome):
+        try:
+            driver.quit()
+        finally:
+            budget.release_driver()
+            with self._slot_lock:
+                self._stats.pop(driver.session_id, None)
+                slot = self._slot_of.pop(driver.session_id, None)
+                if slot is not None:
+                    self._free_slots.append(slot)
+
     def _is_driver_healthy(self, driver: webdriver.Chrome) -> bool:
         try:
             _ = driver.window_handles
@@ -64,7 +296,7 @@ class WebDriverPool:
     def _recreate_driver_if_needed(self, old_driver: webdriver.Chrome | None):
         if old_driver:
             try:
-                old_driver.quit()
+                self._quit_driver(old_driver)
             except Exception:
                 logger.warning("Failed to quit unhealthy driver.", exc_info=True)
             self._current_size -= 1
@@ -75,15 +307,96 @@ class WebDriverPool:
                 self._pool.put(new_driver)
                 self._current_size += 1
                 logger.info("Replaced an unhealthy driver. Pool size is now correct.")
+            except BudgetExhausted:
+                logger.debug("Unhealthy driver not replaced, the driver budget is used up.")
             except Exception:
                 logger.exception("Failed to create new driver during replacement.")
 
+    def _grow(self):
+        # The slot is reserved under the lock, Chrome is started outside of it.
+        with self._lock:
+            if self._shutdown or self._current_size >= self.max_size:
+                return
+            self._current_size += 1
+        try:
+            self._pool.put(self._create_driver())
+            with self._lock:
+                self.metrics.grown += 1
+            logger.debug(f"WebDriverPool grew to {self._current_size} drivers.")
+        except BudgetExhausted:
+            with self._lock:
+                self._current_size -= 1
+        except Exception:
+            with self._lock:
+                self._current_size -= 1
+            logger.exception("Failed to create driver while growing the pool.")
+
+    def _retire(self, driver: webdriver.Chrome, reason: str, replace: bool):
+        with self._lock:
+            self._current_size -= 1
+            if reason == 'idle':
+                self.metrics.shrunk += 1
+            else:
+                self.metrics.recycled[reason] += 1
+        try:
+            self._quit_driver(driver)
+        except Exception:
+            logger.warning(f"Failed to quit driver retired for {reason}.", exc_info=True)
+        if replace:
+            self._grow()
+
+    def _reap_idle(self):
+        # The least recently used driver sits at the bottom of the queue. If it
+        # has been idle long enough, the pool is larger than the load needs.
+        while True:
+            with self._lock:
+                if self._shutdown or self._current_size <= self.target_size:
+                    return
+                with self._pool.mutex:
+                    if not self._pool.queue:
+                        return
+                    driver = self._pool.queue[0]
+                    stats = self._stats.get(driver.session_id)
+                    if stats is None or time.monotonic() - stats.last_used < self.idle_timeout:
+                        return
+                    self._pool.queue.pop(0)
+                    self._pool.not_full.notify()
+                self._current_size -= 1
+                self.metrics.shrunk += 1
+            try:
+                self._quit_driver(driver)
+            except Exception:
+                logger.warning("Failed to quit driver retired for idle.", exc_info=True)
+
+    def _recycle_reason(self, driver: webdriver.Chrome) -> str | None:
+        stats = self._stats.get(driver.session_id)
+        if stats is None:
+            return None
+        if self.max_pages and stats.pages >= self.max_pages:
+            return 'pages'
+        if self.max_age and time.monotonic() - stats.created >= self.max_age:
+            return 'age'
+        return None
+
+    def _acquire(self) -> webdriver.Chrome:
+        while True:
+            try:
+                driver = self._pool.get(timeout=self.grow_wait)
+                break
+            except queue.Empty:
+                if self._shutdown:
+                    raise RuntimeError("WebDriverPool has been shut down while waiting for a driver.")
+                self._grow()
+        self._reap_idle()
+        return driver
+
     @contextmanager
     def get_driver(self) -> Generator[webdriver.Chrome, None, None]:
         if self._shutdown:
             raise RuntimeError("WebDriverPool has been shut down.")
 
-        driver = self._pool.get()
+        start = time.monotonic()
+        driver = self._acquire()
         is_healthy = self._is_driver_healthy(driver)
 
         while not is_healthy:
@@ -93,30 +406,71 @@ class WebDriverPool:
 
             if self._shutdown:
                  raise RuntimeError("WebDriverPool has been shut down while waiting for a healthy driver.")
-            driver = self._pool.get()
+            driver = self._acquire()
             is_healthy = self._is_driver_healthy(driver)
 
+        wait = time.monotonic() - start
+        with self._lock:
+            self.metrics.acquired += 1
+            self.metrics.total_wait += wait
+            self.metrics.max_wait = max(self.metrics.max_wait, wait)
         try:
             yield driver
         finally:
-            if not self._shutdown:
+            stats = self._stats.get(driver.session_id)
+            if stats is not None:
+                stats.pages += 1
+                stats.last_used = time.monotonic()
+            reason = None if self._shutdown else self._recycle_reason(driver)
+            if reason is not None:
+                self._retire(driver, reason, replace=True)
+            elif not self._shutdown:
                 self._pool.put(driver)
+                self._reap_idle()
             else:
                 try:
-                    driver.quit()
+                    self._quit_driver(driver)
                 except Exception:
                     pass
 
+    def driver_rss(self) -> int:
+        """Resident memory in bytes of the idle drivers' chromedriver and Chrome processes."""
+        rss = 0
+        for driver in list(self._pool.queue):
+            process = getattr(getattr(driver, 'service', None), 'process', None)
+            if process is not None:
+                rss += _process_tree_rss(process.pid)
+        return rss
+
+    def _report(self) -> dict:
+        return {
+            'size': self._current_size,
+            'acquired': self.metrics.acquired,
+            'mean_wait': round(self.metrics.mean_wait, 3),
+            'max_wait': round(self.metrics.max_wait, 3),
+            'grown': self.metrics.grown,
+            'shrunk': self.metrics.shrunk,
+            'recycled': dict(self.metrics.recycled),
+        }
+
+    def report(self) -> dict:
+        with self._lock:
+            report = self._report()
+        return report | {'driver_rss_mb': round(self.driver_rss() / 2**20, 1)}
+
     def cleanup(self):
         with self._lock:
             if self._shutdown:
                 return
+            if self.metrics.acquired:
+                report = self._report() | {'driver_rss_mb': round(self.driver_rss() / 2**20, 1)}
+                logger.info(f"WebDriverPool stats: {report}")
             self._shutdown = True
             
             while not self._pool.empty():
                 try:
                     driver = self._pool.get_nowait()
-                    driver.quit()
+                    self._quit_driver(driver)
                 except queue.Empty:
                     break 
                 except Exception:
@@ -0,0 +1,68 @@
+import os
+import pandas as pd
+from pathlib import Path
+from typing import Iterable
+from loguru import logger
+from ..pipeline.readers import JsonlineReader
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Few distinct values repeated on every row, stored once per file.
+DICTIONARY_COLUMNS = ['org', 'modality', 'lifecycle']
+
+
+def columnar_path(path: str | Path) -> Path:
+    """The Parquet copy of a jsonl file, `x.jsonl` -> `x.parquet`."""
+    return Path(path).with_suffix('.parquet')
+
+
+def write_columnar(rows: Iterable[dict], path: str | Path) -> Path | None:
+    """
+    Write `rows` as the Parquet copy of the jsonl file `path`. Returns None
+    without writing when pyarrow is not installed or the rows have no
+    consistent column types.
+    """
+    if pa is None:
+        logger.warning("pyarrow is not installed, no columnar copy is written.")
+        return None
+    save_path = columnar_path(path)
+    try:
+        table = pa.Table.from_pylist(list(rows))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        logger.exception(f"Rows of {path} have no consistent column types, no columnar copy is written.")
+        return None
+    for name in DICTIONARY_COLUMNS:
+        i = table.schema.get_field_index(name)
+        if i >= 0 and pa.types.is_string(table.schema.field(i).type):
+            table = table.set_column(i, name, table.column(i).dictionary_encode())
+    tmp_path = save_path.with_suffix('.parquet.tmp')
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, save_path)
+    return save_path
+
+
+def convert(path: str | Path) -> Path | None:
+    """Write the Parquet copy of the jsonl file `path`."""
+    return write_columnar(JsonlineReader(Path(path)).rows(), path)
+
+
+def has_columnar(path: str | Path) -> bool:
+    """Whether `path` has a Parquet copy written after its last change."""
+    path, save_path = Path(path), columnar_path(path)
+    if pq is None or not save_path.exists():
+        return False
+    return not path.exists() or save_path.stat().st_mtime >= path.stat().st_mtime
+
+
+def read_frame(path: str | Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Read the jsonl file `path` into a DataFrame, from its Parquet copy when it
+    is up to date. Dictionary columns are then categoricals.
+    """
+    if has_columnar(path):
+        return pq.read_table(columnar_path(path), columns=columns).to_pandas()
+    return pd.DataFrame(JsonlineReader(Path(path), required_keys=columns).rows(), columns=columns)
@@ -0,0 +1,179 @@
+import bisect
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+import json
+from loguru import logger
+
+# Sources whose raw files carry cumulative `total_downloads`; downloads of the
+# last month are the difference to the snapshot of a month before.
+SOURCES = ['ModelScope', 'OpenDataLab', 'BAAIData']
+CATEGORIES = {'models': 'model_name', 'datasets': 'dataset_name'}
+
+
+def nearest_date(dates: list[str], target: str, tolerance: int = 15) -> Optional[str]:
+    """The date of the sorted `dates` closest to `target`, if within `tolerance` days; the earlier one on a tie."""
+    if not dates:
+        return None
+    i = bisect.bisect_left(dates, target)
+    target = datetime.strptime(target, r"%Y-%m-%d")
+    best, best_diff = None, None
+    for date in dates[max(i - 1, 0):i + 1]:
+        diff = abs((datetime.strptime(date, r"%Y-%m-%d") - target).days)
+        if best_diff is None or diff < best_diff:
+            best, best_diff = date, diff
+    return best if best_diff <= tolerance else None
+
+
+def month_before(date: str, days: int = 30) -> str:
+    return (datetime.strptime(date, r"%Y-%m-%d") - timedelta(days=days)).strftime(r"%Y-%m-%d")
+
+
+class HistoryIndex:
+    """
+    `total_downloads` of every crawled snapshot (`data/<date>/<source>/raw-*-info.jsonl`)
+    in one SQLite file keyed by (source, category, repo/name, date), so the
+    processors look up a record of last month instead of re-reading the raw files
+    of that month. `refresh` indexes the snapshots that are new or changed since
+    the last call and only stats the others. A file that ends in a torn or
+    invalid line, such as the snapshot being crawled right now, is indexed up
+    to that line but not recorded, so the next `refresh` reads it again.
+    """
+
+    def __init__(self, data_dir: str | Path, path: str | Path | None = None):
+        self.data_dir = Path(data_dir)
+        self.path = Path(path) if path is not None else self.data_dir / 'history-index.db'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Lookups read pages straight from the mapped file.
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                source TEXT NOT NULL,
+                category TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS downloads (
+                source TEXT NOT NULL,
+                category TEXT NOT NULL,
+                key TEXT NOT NULL,
+                date TEXT NOT NULL,
+                total_downloads INTEGER,
+                PRIMARY KEY (source, category, key, date)
+            ) WITHOUT ROWID;
+        """)
+        self._dates: list[str] = []
+        self._source_dates: dict[str, list[str]] = {}
+
+    @classmethod
+    def open(cls, data_dir: str | Path) -> 'HistoryIndex':
+        index = cls(data_dir)
+        index.refresh()
+        return index
+
+    def refresh(self) -> int:
+        """Index new or changed raw files under `data_dir`. Returns the number of files indexed."""
+        snapshots = sorted(p for p in self.data_dir.glob("????-??-??") if p.is_dir())
+        with self._lock:
+            known = {
+                path: (mtime, size)
+                for path, mtime, size in self._conn.execute("SELECT path, mtime, size FROM files")
+            }
+        indexed = 0
+        for snapshot in snapshots:
+            for source in SOURCES:
+                for category in CATEGORIES:
+                    p = snapshot / source / f'raw-{category}-info.jsonl'
+                    if not p.exists():
+                        continue
+                    stat = p.stat()
+                    if known.get(str(p)) == (stat.st_mtime, stat.st_size):
+                        continue
+                    if self._ingest(p, snapshot.name, source, category, stat):
+                        indexed += 1
+        if indexed:
+            logger.info(f"Indexed {indexed} history files into {self.path}")
+        self._dates = [p.name for p in snapshots]
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT source, date FROM files ORDER BY date").fetchall()
+        self._source_dates = {}
+        for source, date in rows:
+            self._source_dates.setdefault(source, []).append(date)
+        return indexed
+
+    def _ingest(self, p: Path, date: str, source: str, category: str, stat) -> bool:
+        name_key = CATEGORIES[category]
+        rows = []
+        complete = True
+        with open(p, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('unterminated line')
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                except ValueError:
+                    complete = False
+                    break
+                if isinstance(item, dict) and 'total_downloads' in item and name_key in item:
+                    rows.append((source, category, f"{item['repo']}/{item[name_key]}", date, item['total_downloads']))
+        if not complete:
+            logger.warning(f"{p} ends in a torn or invalid line, indexed {len(rows)} records and will read it again.")
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM downloads WHERE source = ? AND category = ? AND date = ?", (source, category, date))
+                self._conn.executemany("INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?)", rows)
+                if complete:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                        (str(p), date, source, category, stat.st_mtime, stat.st_size),
+                    )
+                else:
+                    self._conn.execute("DELETE FROM files WHERE path = ?", (str(p),))
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return complete
+
+    def dates(self, source: str | None = None) -> list[str]:
+        """Sorted snapshot dates, of `source` only if given."""
+        if source is None:
+            return list(self._dates)
+        return list(self._source_dates.get(source, []))
+
+    def last_month(self, date: str, source: str | None = None, days: int = 30, tolerance: int = 15) -> Optional[str]:
+        """The snapshot closest to `days` before `date`, None if none is within `tolerance` days."""
+        return nearest_date(self.dates(source), month_before(date, days), tolerance)
+
+    def downloads(
+        self,
+        source: str,
+        category: Literal['models', 'datasets'],
+        key: str,
+        date: str | None,
+    ) -> Optional[int]:
+        """`total_downloads` of `repo/name` in the snapshot of `date`, None if it was not crawled then."""
+        if date is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total_downloads FROM downloads WHERE source = ? AND category = ? AND key = ? AND date = ?",
+                (source, category, key, date),
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,179 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+from contextlib import contextmanager
+from collections.abc import MutableMapping
+from loguru import logger
+
+
+class InfoStore(MutableMapping):
+    """
+    Classification infos (`model-info.json`, `dataset-info.json`) kept in SQLite
+    behind a dict-like API. Lookups hit the primary key, `update` writes a whole
+    batch in one transaction, so an interrupted run loses at most the batch in
+    flight. The store is created next to its JSON file and filled from it; the
+    hash of the JSON is kept, and when the file was edited since the last import
+    or export its infos are merged in again, the edited values winning.
+    `export_json` writes the JSON back when something changed, and refuses to
+    overwrite a JSON edited since it was last read.
+    """
+
+    def __init__(self, path: str | Path, json_path: str | Path | None = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.json_path = Path(json_path) if json_path is not None else None
+        # Processors are built in one thread and run in another, and several
+        # pipeline processes may share the file; SQLite serializes the writers.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS infos (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if self.json_path is not None and self._meta('json_hash') != self._json_hash(self.json_path):
+            self._migrate()
+
+    @classmethod
+    def from_json(cls, json_path: str | Path) -> 'InfoStore':
+        """The store of `json_path`, at the same path with a `.db` suffix."""
+        json_path = Path(json_path)
+        return cls(json_path.with_suffix('.db'), json_path)
+
+    def _meta(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _json_hash(path: Path) -> str | None:
+        if not path.exists():
+            return None
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+
+    def _migrate(self):
+        infos = {}
+        if self.json_path.exists():
+            data = self.json_path.read_bytes()
+            infos = json.loads(data)
+            json_hash = hashlib.sha1(data).hexdigest()
+        else:
+            json_hash = None
+        with self._transaction() as conn:
+            # Another process may have imported while we waited for the lock.
+            if json_hash is not None and self._meta('json_hash') == json_hash:
+                return
+            # Unexported changes of the store stay, the version is not bumped.
+            conn.executemany(
+                "INSERT INTO infos (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                ((k, json.dumps(v, ensure_ascii=False)) for k, v in infos.items()),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)", (str(self.json_path),))
+            if json_hash is not None:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_hash', ?)", (json_hash,))
+        logger.info(f"Imported {len(infos)} infos from {self.json_path} to {self.path}")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM infos WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key: str, value: Any):
+        self.update({key: value})
+
+    def __delitem__(self, key: str):
+        with self._transaction() as conn:
+            if conn.execute("DELETE FROM infos WHERE key = ?", (key,)).rowcount == 0:
+                raise KeyError(key)
+            self._bump(conn)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM infos WHERE key = ?", (key,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute("SELECT key FROM infos ORDER BY rowid")]
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM infos").fetchone()[0]
+
+    def update(self, other: Mapping[str, Any] = (), **kargs):
+        items = dict(other, **kargs)
+        if not items:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO infos (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                ((k, json.dumps(v, ensure_ascii=False)) for k, v in items.items()),
+            )
+            self._bump(conn)
+
+    def _bump(self, conn: sqlite3.Connection):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM infos ORDER BY rowid").fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+    def export_json(self, path: str | Path | None = None, force: bool = False) -> bool:
+        """
+        Write the infos to `path` (the JSON the store was imported from by default)
+        if they changed since the last export. The file is replaced atomically.
+        The JSON of the store is not overwritten when it was edited since the
+        last import or export, unless `force`; the next store opened on it
+        merges the edits in.
+        """
+        path = Path(path) if path is not None else self.json_path
+        if path is None:
+            raise ValueError("No JSON path to export to.")
+        own = self.json_path is not None and path.resolve() == self.json_path.resolve()
+        with self._lock:
+            version = self._meta('version')
+            if not force and version == self._meta('exported_version'):
+                return False
+            if not force and own and self._json_hash(path) not in (None, self._meta('json_hash')):
+                logger.warning(f"{path} changed since it was imported, not overwriting it.")
+                return False
+            rows = self._conn.execute("SELECT key, value FROM infos ORDER BY rowid").fetchall()
+        data = json.dumps({k: json.loads(v) for k, v in rows}, indent=4, ensure_ascii=False).encode('utf-8')
+        tmp = path.with_name(f'.{path.name}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        with self._transaction() as conn:
+            if version is not None:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('exported_version', ?)", (version,))
+            if own:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_hash', ?)",
+                             (hashlib.sha1(data).hexdigest(),))
+        return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,30 +1,148 @@
+import yaml
+import types
+import sqlite3
+import dataclasses
+from pathlib import Path
+from typing import Literal, Union, get_args, get_origin
 from .record import ModelRecord, DatasetRecord
 from .record import HFModelRecord, HFDatasetRecord
 from .record import MSModelRecord, MSDatasetRecord
 from .record import OpenDataLabRecord, BAAIDataRecord
 
+ROOT_PATH = Path(__file__).parents[3]
+CONFIG_PATH = ROOT_PATH / 'config/database.yaml'
+
+# One table per record type, looked up by the `source` of a processed record
+# and whether it is a model or a dataset.
+TABLES: dict[str, type] = {
+    'hf_models': HFModelRecord,
+    'hf_datasets': HFDatasetRecord,
+    'ms_models': MSModelRecord,
+    'ms_datasets': MSDatasetRecord,
+    'open_data_lab_datasets': OpenDataLabRecord,
+    'baai_data_datasets': BAAIDataRecord,
+}
+SOURCE_TABLES = {
+    ('HuggingFace', 'models'): 'hf_models',
+    ('HuggingFace', 'datasets'): 'hf_datasets',
+    ('ModelScope', 'models'): 'ms_models',
+    ('ModelScope', 'datasets'): 'ms_datasets',
+    ('OpenDataLab', 'datasets'): 'open_data_lab_datasets',
+    ('BAAIData', 'datasets'): 'baai_data_datasets',
+}
+
+
+def default_db_path() -> Path:
+    """`SQLITE.path` of config/database.yaml, data/oslm.db by default."""
+    conf = {}
+    if CONFIG_PATH.exists():
+        with CONFIG_PATH.open('r', encoding='utf-8') as f:
+            conf = (yaml.safe_load(f) or {}).get('SQLITE') or {}
+    return Path(conf.get('path') or ROOT_PATH / 'data/oslm.db')
+
+
+def connect(path: str | Path | None = None) -> sqlite3.Connection:
+    path = Path(path) if path is not None else default_db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def name_column(record_cls: type) -> str:
+    return 'model_name' if 'model_name' in record_cls.__dataclass_fields__ else 'dataset_name'
+
+
+def _sql_type(annotation) -> str:
+    origin = get_origin(annotation)
+    if origin is Union or origin is types.UnionType:
+        return _sql_type(next(a for a in get_args(annotation) if a is not type(None)))
+    if origin is Literal or annotation is str:
+        return 'TEXT'
+    if annotation is int or annotation is bool:
+        return 'INTEGER'
+    if annotation is float:
+        return 'REAL'
+    raise TypeError(f"No SQLite type for {annotation}")
+
+
 class TableInitializer:
-    
-    def __init__(self):
-        pass
-    
+    """
+    Creates the tables of the records in `database/record.py`, one per record type,
+    indexed on (org, date_crawl) for rankings and on (repo, name, date_crawl),
+    which also identifies a record, for histories.
+    """
+
+    def __init__(self, conn: sqlite3.Connection | str | Path | None = None):
+        self.conn = conn if isinstance(conn, sqlite3.Connection) else connect(conn)
+
     def init_hf_model_table(self):
-        pass
+        self._init_table('hf_models')
 
     def init_hf_dataset_table(self):
-        pass
+        self._init_table('hf_datasets')
 
     def init_ms_model_table(self):
-        pass
+        self._init_table('ms_models')
 
     def init_ms_dataset_table(self):
-        pass
+        self._init_table('ms_datasets')
 
     def init_open_data_lab_table(self):
-        pass
+        self._init_table('open_data_lab_datasets')
 
     def init_baai_data_table(self):
-        pass
+        self._init_table('baai_data_datasets')
+
+    def _init_table(self, table: str):
+        record_cls = TABLES[table]
+        name = name_column(record_cls)
+        # Only what identifies a record is required, the crawled values may be missing.
+        columns = ',\n'.join(
+            f'    {f.name} {_sql_type(f.type)}'
+            + (' NOT NULL' if f.name in ('org', 'repo', name, 'date_crawl') else '')
+            for f in dataclasses.fields(record_cls)
+        )
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+            {columns}
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_repo_name_date ON {table} (repo, {name}, date_crawl);
+            CREATE INDEX IF NOT EXISTS idx_{table}_org_date ON {table} (org, date_crawl);
+        """)
 
     def _init_database(self):
-        pass
+        self.init_hf_model_table()
+        self.init_hf_dataset_table()
+        self.init_ms_model_table()
+        self.init_ms_dataset_table()
+        self.init_open_data_lab_table()
+        self.init_baai_data_table()
+        return self.conn
+
+
+def upsert_sql(table: str) -> tuple[str, list[str]]:
+    """
+    The upsert of one record into `table` and the order of its parameters. A
+    missing `date_last_crawl` is the latest earlier `date_crawl` of the record.
+    """
+    record_cls = TABLES[table]
+    name = name_column(record_cls)
+    fields = [f.name for f in dataclasses.fields(record_cls)]
+    values = [
+        f"COALESCE(?, (SELECT MAX(date_crawl) FROM {table} "
+        f"WHERE repo = ? AND {name} = ? AND date_crawl < ?))"
+        if f == 'date_last_crawl' else '?'
+        for f in fields
+    ]
+    params = []
+    for f in fields:
+        params.extend(['date_last_crawl', 'repo', name, 'date_crawl'] if f == 'date_last_crawl' else [f])
+    updates = ', '.join(f'{f} = excluded.{f}' for f in fields if f not in ('repo', name, 'date_crawl', 'date_enter_db'))
+    sql = (
+        f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join(values)}) "
+        f"ON CONFLICT (repo, {name}, date_crawl) DO UPDATE SET {updates}"
+    )
+    return sql, params
+
@@ -0,0 +1,217 @@
+import os
+import sys
+import time
+import queue
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from functools import partial
+from typing import Callable
+from tqdm import tqdm
+from loguru import logger
+from . import budget
+from .budget import ResourceBudget
+
+# Steps in the order the pipelines run them.
+PIPELINE_STEPS = {
+    'HuggingFacePipeline': ['init_org_links', 'crawl_repo_page', 'crawl_detail_page', 'post_process'],
+    'ModelScopePipeline': ['init_org_links', 'crawl_repo_page', 'crawl_detail_page', 'post_process'],
+    'OpenDataLabPipeline': ['init_org_links', 'crawl_repo_page', 'post_process'],
+    'BAAIDataPipeline': ['init_org_links', 'crawl_repo_page', 'post_process'],
+}
+
+
+def run_pipeline(name: str, conf: dict, progress: Callable | None = None):
+    """Build the pipeline `name` from its config section and run the configured steps."""
+    from . import core
+    if progress is not None:
+        # Only ever done in a pipeline's own process, see `_worker`.
+        core.tqdm = progress
+    cls = {
+        'HuggingFacePipeline': core.HFPipeline,
+        'ModelScopePipeline': core.MSPipeline,
+        'OpenDataLabPipeline': core.OpenDataLabPipeline,
+        'BAAIDataPipeline': core.BAAIDataPipeline,
+    }[name]
+    args = [conf['task_name'], conf['load_dir'], conf['save_dir'], conf['log_path']]
+    if name in ['HuggingFacePipeline', 'ModelScopePipeline']:
+        args.append(conf.get('resume', True))
+    proc = cls(*args)
+    steps = [step for step in PIPELINE_STEPS[name] if step in conf]
+    if conf.get('streaming', True) and hasattr(proc, 'stream'):
+        if 'init_org_links' in steps:
+            proc = proc.step('init_org_links', **conf['init_org_links'])
+        streamed = {step: conf[step] for step in steps if step != 'init_org_links'}
+        if streamed:
+            proc = proc.stream(**streamed)
+    else:
+        for step in steps:
+            proc = proc.step(step, **conf[step])
+    proc.done()
+
+
+class QueueProgress:
+    """Stands in for tqdm inside a pipeline process and forwards progress to the orchestrator."""
+
+    def __init__(self, events, name: str, total: int | None = None, desc: str | None = None, **kargs):
+        self.events = events
+        self.name = name
+        self.n = 0
+        self.total = total
+        events.put(('stage', name, desc, total))
+
+    def update(self, n: int = 1):
+        self.n += n
+        self.events.put(('update', self.name, n))
+
+    def refresh(self):
+        # Streaming stages grow their total as the work arrives.
+        self.events.put(('total', self.name, self.total))
+
+    def write(self, s: str):
+        self.events.put(('write', self.name, s))
+
+    def close(self):
+        pass
+
+
+def _worker(runner: Callable, name: str, conf: dict, budget_: ResourceBudget, events, log_file: str):
+    # Console output of the pipeline, including Chrome's and any traceback,
+    # goes to its own log instead of interleaving with the others.
+    f = open(log_file, 'a', buffering=1, encoding='utf-8')
+    os.dup2(f.fileno(), sys.stderr.fileno())
+    sys.stderr = f
+    budget.install(budget_)
+    try:
+        runner(name, conf, progress=partial(QueueProgress, events, name))
+    except BaseException as e:
+        logger.exception(f"{name} failed.")
+        events.put(('failed', name, repr(e)))
+        raise
+    events.put(('done', name, None))
+
+
+class CrawlOrchestrator:
+    """
+    Runs the source pipelines side by side, one process each, and shows their
+    progress as one bar per pipeline. The pipelines share a `ResourceBudget` of
+    `max_drivers` Chrome drivers and `max_llm_calls` LLM requests in flight.
+    The console output of each pipeline is written to `{log_dir}/{name}.log`.
+    """
+
+    def __init__(
+        self,
+        pipelines: dict[str, dict],
+        max_drivers: int | None = None,
+        max_llm_calls: int | None = None,
+        log_dir: str | Path | None = None,
+        runner: Callable = run_pipeline,
+        start_method: str = 'spawn',
+    ):
+        self.pipelines = self._separate_logs(pipelines)
+        self.max_drivers = max_drivers
+        self.max_llm_calls = max_llm_calls
+        if log_dir is None:
+            log_dir = Path(__file__).parents[2] / f'logs/crawl-{datetime.now().strftime(r"%Y-%m-%d_%H-%M-%S")}'
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.runner = runner
+        self.ctx = multiprocessing.get_context(start_method)
+
+    @staticmethod
+    def _separate_logs(pipelines: dict[str, dict]) -> dict[str, dict]:
+        # Pipelines write their errors next to their log, so a log_path given
+        # for all of them (--log-path) is split into one directory per task.
+        log_paths = [conf.get('log_path') for conf in pipelines.values() if conf.get('log_path')]
+        res = {}
+        for name, conf in pipelines.items():
+            log_path = conf.get('log_path')
+            if log_path and log_paths.count(log_path) > 1:
+                log_path = Path(log_path)
+                conf = conf | {'log_path': str(log_path.parent / conf['task_name'] / log_path.name)}
+            res[name] = conf
+        return res
+
+    def run(self) -> dict[str, int]:
+        """Run every pipeline to the end and return their exit codes."""
+        sink = logger.add(self.log_dir / 'orchestrator.log', level="INFO")
+        budget_ = ResourceBudget.create(self.max_drivers, self.max_llm_calls, self.ctx)
+        events = self.ctx.Queue()
+        procs = {
+            name: self.ctx.Process(
+                target=_worker,
+                args=(self.runner, name, conf, budget_, events, str(self.log_dir / f'{name}.log')),
+                name=name,
+            )
+            for name, conf in self.pipelines.items()
+        }
+        bars = {
+            name: tqdm(total=0, desc=name, position=i, leave=True)
+            for i, name in enumerate(procs)
+        }
+        start = {}
+        elapsed = {}
+        try:
+            for name, p in procs.items():
+                p.start()
+                start[name] = time.monotonic()
+                logger.info(f"Started {name} (pid {p.pid}), log at {self.log_dir / f'{name}.log'}")
+            while any(p.is_alive() for p in procs.values()):
+                self._drain(events, bars, timeout=0.5)
+                for name, p in procs.items():
+                    if name not in elapsed and p.exitcode is not None:
+                        elapsed[name] = time.monotonic() - start[name]
+            for p in procs.values():
+                p.join()
+            self._drain(events, bars, timeout=None)
+        except KeyboardInterrupt:
+            # The pipelines got the interrupt as well; their checkpoints resume the crawl.
+            for p in procs.values():
+                p.join(10)
+                if p.is_alive():
+                    p.terminate()
+            raise
+        finally:
+            for bar in bars.values():
+                bar.close()
+
+        codes = {}
+        for name, p in procs.items():
+            codes[name] = p.exitcode
+            took = elapsed.get(name, time.monotonic() - start[name])
+            if p.exitcode == 0:
+                logger.info(f"{name} finished in {took:.0f}s.")
+            else:
+                logger.error(f"{name} exited with code {p.exitcode} after {took:.0f}s, see {self.log_dir / f'{name}.log'}")
+        logger.remove(sink)
+        return codes
+
+    def _drain(self, events, bars: dict[str, tqdm], timeout: float | None):
+        """Apply progress events; with `timeout=None` take what is queued without waiting."""
+        while True:
+            try:
+                if timeout is None:
+                    event = events.get_nowait()
+                else:
+                    event = events.get(timeout=timeout)
+                    timeout = 0.01
+            except queue.Empty:
+                return
+            kind, name, *payload = event
+            bar = bars[name]
+            match kind:
+                case 'stage':
+                    desc, total = payload
+                    bar.reset(total=total)
+                    bar.set_description(f"{name}: {desc}" if desc else name)
+                case 'total':
+                    bar.total = payload[0]
+                    bar.refresh()
+                case 'update':
+                    bar.update(payload[0])
+                case 'write':
+                    bar.write(f"[{name}] {payload[0]}")
+                case 'done':
+                    bar.set_postfix_str('done')
+                case 'failed':
+                    bar.set_postfix_str(f'failed: {payload[0]}')
@@ -0,0 +1,151 @@
+import os
+import json
+import time
+from pathlib import Path
+from collections import defaultdict
+from loguru import logger
+from .writers import JsonlineWriter
+
+
+class Checkpoint:
+    """
+    Append-only manifest of a run, kept at `{save_dir}/.checkpoint/manifest.jsonl`.
+
+    Every line records one completed unit of work (`stage`, `key`) together with
+    the size of the output file right after its record was written. A line is
+    held back while the record it points to is still buffered in its writer, and
+    appends are fsynced in batches (every `fsync_every` records or
+    `fsync_interval` seconds), after the output files they point into. On resume each output file is cut
+    back to its last recorded offset, so a record is either both written and
+    checkpointed or refetched.
+    """
+
+    def __init__(
+        self,
+        save_dir: str | Path,
+        fsync_every: int = 64,
+        fsync_interval: float = 5.0,
+        fresh: bool = False,
+    ):
+        self.save_dir = Path(save_dir)
+        self.path = self.save_dir / '.checkpoint' / 'manifest.jsonl'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fresh:
+            self.path.unlink(missing_ok=True)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.completed: dict[str, set[str]] = defaultdict(set)
+        self.offsets: dict[str, int] = {}
+        self._load()
+        self.f = open(self.path, 'a', encoding='utf-8')
+        self._writers: dict[str, JsonlineWriter] = {}
+        self._held: list[str] = []
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        good = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                good += len(line)
+                if entry.get('key') is not None:
+                    self.completed[entry['stage']].add(entry['key'])
+                if entry.get('file') is not None:
+                    self.offsets[entry['file']] = entry['offset']
+        if good < self.path.stat().st_size:
+            # Torn tail of a crash, drop it so new entries start on a fresh line.
+            with open(self.path, 'r+b') as f:
+                f.truncate(good)
+        if self.completed:
+            counts = {stage: len(keys) for stage, keys in self.completed.items()}
+            logger.info(f"Resuming from checkpoint {self.path}: {counts}")
+
+    def _rel(self, path: str | Path) -> str:
+        path = Path(path)
+        try:
+            return str(path.resolve().relative_to(self.save_dir.resolve()))
+        except ValueError:
+            return str(path)
+
+    def done(self, stage: str, key: str) -> bool:
+        return key in self.completed[stage]
+
+    def restore(self, path: str | Path) -> bool:
+        """
+        Cut `path` back to its last checkpointed size before it is reopened for
+        appending. Returns whether anything was checkpointed for it.
+        """
+        path = Path(path)
+        offset = self.offsets.get(self._rel(path), 0)
+        if path.exists() and path.stat().st_size > offset:
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+        return offset > 0
+
+    def record(
+        self,
+        stage: str,
+        key: str | None = None,
+        writer: JsonlineWriter | None = None,
+    ):
+        entry = {'stage': stage, 'key': key}
+        if writer is not None:
+            entry['file'] = self._rel(writer.path)
+            entry['offset'] = writer.tell()
+            self.offsets[entry['file']] = entry['offset']
+            self._writers[entry['file']] = writer
+        if key is not None:
+            self.completed[stage].add(key)
+        self._append(entry)
+
+    def record_replaced(self, stage: str, path: str | Path):
+        """Record the size of `path` after it was replaced by a rewritten file."""
+        entry = {'stage': stage, 'key': None, 'file': self._rel(path)}
+        with open(path, 'rb') as f:
+            os.fsync(f.fileno())
+            entry['offset'] = os.fstat(f.fileno()).st_size
+        self.offsets[entry['file']] = entry['offset']
+        self._writers.pop(entry['file'], None)
+        self._append(entry)
+
+    def _append(self, entry: dict):
+        self._held.append(json.dumps(entry, ensure_ascii=False) + '\n')
+        if not any(w.buffered for w in self._writers.values()):
+            self._release()
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    def _release(self):
+        if self._held:
+            self.f.write(''.join(self._held))
+            self._held.clear()
+
+    def sync(self):
+        # Output first, so the manifest never points past data on disk.
+        for writer in self._writers.values():
+            if not writer.f.closed:
+                writer.flush(fsync=True)
+        self._release()
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self.f.closed:
+            return
+        self.sync()
+        self.f.close()
+        self._writers.clear()
@@ -1,20 +1,195 @@
 import os
+import queue
+import threading
 import traceback
-from time import sleep
-from typing import Literal
+from typing import Callable, Generator, Iterable, Literal
 from dataclasses import asdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 from .base import PipelineStep, PipelineResult, PipelineData
-from ..crawler.huggingface import HFRepoPage, HFRepoInfo
+from .engine import AsyncCrawlEngine
+from .retry import RetryScheduler
+from ..crawler.huggingface import HFRepoPage, HFRepoInfo, HFRepoHTTPPage
 from ..crawler.huggingface import HFDatasetPage, HFDatasetInfo
 from ..crawler.huggingface import HFModelPage, HFModelInfo
+from ..crawler.huggingface import HFModelHTTPPage, HFDatasetHTTPPage
 from ..crawler.modelscope import MSRepoPage, MSRepoInfo
 from ..crawler.modelscope import MSDatasetPage, MSDatasetInfo
 from ..crawler.modelscope import MSModelPage, MSModelInfo
 from ..crawler.open_data_lab import OpenDataLabPage, OpenDataLabInfo
 from ..crawler.baai_data import BAAIDataPage
-from ..crawler.utils import WebDriverPool
+from ..crawler.utils import WebDriverPool, init_session
+
+
+def _new_driver_pool(step: PipelineStep) -> WebDriverPool:
+    # `threads` drivers are kept warm, the pool grows up to `max_threads`
+    # while workers wait for a driver.
+    return WebDriverPool(
+        step.threads,
+        profile=step.driver_profile,
+        cache_dir=step.cache_dir,
+        max_size=step.max_threads,
+        max_pages=step.recycle_pages,
+        max_age=step.recycle_minutes * 60 if step.recycle_minutes else None,
+    )
+
+
+def _workers(step: PipelineStep) -> int:
+    return max(step.threads, getattr(step, 'max_threads', None) or 0)
+
+
+def _error_msg(info) -> Exception | None:
+    return info.error_msg
+
+
+class _Feeder(threading.Thread):
+    """
+    Submits tasks from an iterable that may block, such as the input stream of a
+    `StreamingDAG` stage, with at most `limit` tasks unfinished at a time.
+    """
+
+    def __init__(self, tasks: Iterable, submit: Callable, limit: int, on_exit: Callable):
+        super().__init__(name='crawl-feeder', daemon=True)
+        self.tasks = tasks
+        self.submit = submit
+        self.on_exit = on_exit
+        self.slots = threading.BoundedSemaphore(limit)
+        self.stopped = threading.Event()
+        self.error = None
+
+    def run(self):
+        try:
+            for task in self.tasks:
+                while not self.slots.acquire(timeout=0.1):
+                    if self.stopped.is_set():
+                        return
+                if self.stopped.is_set():
+                    return
+                self.submit(task)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.on_exit()
+
+    def done(self):
+        """A task has been yielded for good, its slot is free again."""
+        self.slots.release()
+
+
+def _crawl_threads(
+    step: PipelineStep,
+    tasks: Iterable,
+    scrape: Callable,
+    resource,
+    error_of: Callable = _error_msg,
+) -> Generator[tuple, None, None]:
+    """
+    Yield `(task, result)` once each task succeeds or runs out of retries. Failed
+    tasks wait out their backoff in a `RetryScheduler` while the workers keep
+    going on the remaining ones. `tasks` is read lazily by a `_Feeder`.
+    """
+    scheduler = RetryScheduler(step.max_retries)
+    completed = queue.Queue()
+    fed = threading.Event()
+    lock = threading.Lock()
+    outstanding = 0
+    workers = _workers(step)
+    with ThreadPoolExecutor(workers) as executor:
+
+        def submit(task):
+            future = executor.submit(scrape, *_args(task), resource)
+            future.add_done_callback(lambda f: completed.put((task, f)))
+
+        def feed(task):
+            nonlocal outstanding
+            with lock:
+                outstanding += 1
+            submit(task)
+
+        def on_exit():
+            fed.set()
+            completed.put(None)
+
+        feeder = _Feeder(tasks, feed, 2 * workers, on_exit)
+        feeder.start()
+        try:
+            while True:
+                for task in scheduler.pop_ready():
+                    submit(task)
+                with lock:
+                    if fed.is_set() and outstanding == 0:
+                        break
+                try:
+                    item = completed.get(timeout=scheduler.next_delay())
+                except queue.Empty:
+                    continue
+                if item is None:
+                    continue
+                task, future = item
+                result = future.result()
+                e = error_of(result)
+                if e is None or not scheduler.schedule(task, e):
+                    with lock:
+                        outstanding -= 1
+                    feeder.done()
+                    yield task, result
+        finally:
+            feeder.stopped.set()
+    if feeder.error is not None:
+        raise feeder.error
+
+
+def _crawl_async(
+    step: PipelineStep,
+    tasks: Iterable,
+    scrape: Callable,
+    resource,
+    concurrency: int,
+    error_of: Callable = _error_msg,
+) -> Generator[tuple, None, None]:
+    # Same contract as `_crawl_threads`, the engine itself holds retries back
+    # for their backoff delay.
+    scheduler = RetryScheduler(step.max_retries)
+    with AsyncCrawlEngine(concurrency, step.per_host, step.rate) as engine:
+        engine.hold()
+        feeder = _Feeder(
+            tasks, lambda task: engine.submit(task, scrape, *_args(task), resource),
+            2 * concurrency, engine.release,
+        )
+        feeder.start()
+        try:
+            for task, result in engine.as_completed():
+                e = error_of(result)
+                delay = None if e is None else scheduler.backoff(task, e)
+                if delay is None:
+                    feeder.done()
+                    yield task, result
+                else:
+                    engine.submit(task, scrape, *_args(task), resource, delay=delay)
+        finally:
+            feeder.stopped.set()
+    if feeder.error is not None:
+        raise feeder.error
+
+
+def _stream_link_category(step: PipelineStep, inputs: Iterable[PipelineData]) -> Generator[tuple, None, None]:
+    # Repo results of a stream stage all carry the same extra keys, so the
+    # latest one stands for all of them.
+    for inp in inputs:
+        data = inp.data.copy()
+        category = data.pop('category')
+        detail_urls = data.pop('detail_urls')
+        step.data = data
+        for link in detail_urls:
+            yield link, category
+
+
+def _args(task) -> tuple:
+    return task if isinstance(task, tuple) else (task,)
+
+
+def _format_error(e: Exception) -> str:
+    return "".join(traceback.format_exception(type(e), e, e.__traceback__))
 
 
 class HFRepoPageCrawler(PipelineStep):
@@ -27,10 +202,32 @@ class HFRepoPageCrawler(PipelineStep):
         category: Literal['datasets', 'models'] | None = None,
         threads: int = 1,
         max_retries: int =20,
+        backend: Literal['selenium', 'http'] = 'selenium',
+        engine: Literal['thread', 'async'] = 'thread',
+        concurrency: int = 64,
+        per_host: int = 16,
+        rate: float | None = 10.0,
+        driver_profile: Literal['default', 'lean'] = 'default',
+        cache_dir: str | None = None,
+        max_threads: int | None = None,
+        recycle_pages: int | None = None,
+        recycle_minutes: float | None = None,
     ):
+        assert backend in ['selenium', 'http'], f"Unknown backend: {backend}"
+        assert engine in ['thread', 'async'], f"Unknown engine: {engine}"
         self.category = category
         self.threads = threads
         self.max_retries = max_retries
+        self.backend = backend
+        self.engine = engine
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.driver_profile = driver_profile
+        self.cache_dir = cache_dir
+        self.max_threads = max_threads
+        self.recycle_pages = recycle_pages
+        self.recycle_minutes = recycle_minutes
         
     def parse_input(self, input_data: PipelineData | None = None):
         self.data = input_data.data.copy()
@@ -60,65 +257,59 @@ class HFRepoPageCrawler(PipelineStep):
             ])
         
     def run(self) -> PipelineResult:
-        with ThreadPoolExecutor(self.threads) as executor, WebDriverPool(self.threads) as p:
-            task_retries = {lc: 0 for lc in self.input['link-category']}
-            completed_tasks = set()
-            retry_tasks: list[tuple[str, str]] = list()
-            futures = {
-                executor.submit(HFRepoPageCrawler._scrape, self, lc[0], lc[1], p): lc
-                for lc in self.input['link-category']}
-            
-            while futures or retry_tasks:
-                for lc in retry_tasks:
-                    sleep(5)
-                    futures.update({
-                        executor.submit(HFRepoPageCrawler._scrape, self, lc[0], lc[1], p): lc
-                    })
-                    task_retries[lc] += 1
-                retry_tasks.clear()
-                    
-                for future in as_completed(futures):
-                    lc = futures[future]
-                    info = future.result()
-                    if info.error_msg is None:
-                        data = {
-                            "category": info.category,
-                            "detail_urls": info.detail_urls
-                        }
-                        msg = {
-                            "repo": info.repo,
-                            "repo_url": info.repo_url,
-                            "category": info.category,
-                            "total_links": info.total_links
-                        }
-                        data.update(self.data)
-                        yield PipelineData(data, msg, None)
-                    else:
-                        if task_retries[lc] < self.max_retries:
-                            retry_tasks.append(lc)
-                        else:
-                            logger.opt(exception=info.error_msg).error(f"HFRepoPage Error with repo_link: {lc[0]} and category: {lc[1]}")
-                            e = info.error_msg
-                            error_msg = "".join(
-                                traceback.format_exception(type(e), e, e.__traceback__)
-                            )
-                            yield PipelineData(None, None, {
-                                "repo_link": lc[0],
-                                "category": lc[1],
-                                "error_msg": error_msg,
-                            })
-                            
-                    completed_tasks.add(future)
-                
-                futures = {f: tp for f, tp in futures.items() if f not in completed_tasks}
-                completed_tasks.clear()
+        if self.backend == 'http':
+            size = self.concurrency if self.engine == 'async' else self.threads
+            resource = init_session(size)
+            concurrency = self.concurrency
+        else:
+            resource = _new_driver_pool(self)
+            # Pages beyond the pool size would only queue up for a driver.
+            concurrency = min(self.concurrency, _workers(self))
+        with resource:
+            yield from self._crawl(resource, concurrency)
+    
+    def _crawl(self, resource, concurrency: int) -> PipelineResult:
+        tasks = self.input['link-category']
+        if self.engine == 'async':
+            results = _crawl_async(self, tasks, self._scrape, resource, concurrency)
+        else:
+            results = _crawl_threads(self, tasks, self._scrape, resource)
+        for lc, info in results:
+            if info.error_msg is None:
+                yield self._result(info)
+            else:
+                yield self._failure(lc, info.error_msg)
+    
+    def _result(self, info: HFRepoInfo) -> PipelineData:
+        data = {
+            "category": info.category,
+            "detail_urls": info.detail_urls
+        }
+        msg = {
+            "repo": info.repo,
+            "repo_url": info.repo_url,
+            "category": info.category,
+            "total_links": info.total_links
+        }
+        data.update(self.data)
+        return PipelineData(data, msg, None)
+    
+    def _failure(self, lc: tuple[str, str], e: Exception) -> PipelineData:
+        logger.opt(exception=e).error(f"HFRepoPage Error with repo_link: {lc[0]} and category: {lc[1]}")
+        return PipelineData(None, None, {
+            "repo_link": lc[0],
+            "category": lc[1],
+            "error_msg": _format_error(e),
+        })
         
     def _scrape(
         self, 
         repo_link: str, 
         category: Literal['datasets', 'models'],
-        driver_pool: WebDriverPool
+        driver_pool
     ) -> HFRepoInfo:
+        if self.backend == 'http':
+            return HFRepoHTTPPage(driver_pool, repo_link).scrape(category)
         with driver_pool.get_driver() as driver:
             page = HFRepoPage(driver, repo_link)
             info = page.scrape(category)
@@ -135,14 +326,46 @@ class HFDetailPageCrawler(PipelineStep):
         threads: int = 1,
         max_retries: int = 10,
         screenshot_path: str | None = None,
+        backend: Literal['selenium', 'http'] = 'selenium',
+        fallback: bool = True,
+        engine: Literal['thread', 'async'] = 'thread',
+        concurrency: int = 64,
+        per_host: int = 16,
+        rate: float | None = 10.0,
+        driver_profile: Literal['default', 'lean'] = 'default',
+        cache_dir: str | None = None,
+        max_threads: int | None = None,
+        recycle_pages: int | None = None,
+        recycle_minutes: float | None = None,
     ):
+        assert backend in ['selenium', 'http'], f"Unknown backend: {backend}"
+        assert engine in ['thread', 'async'], f"Unknown engine: {engine}"
         self.threads = threads
         self.max_retries = max_retries
         self.screenshot_path = screenshot_path
+        self.backend = backend
+        self.fallback = fallback
+        self.engine = engine
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.driver_profile = driver_profile
+        self.cache_dir = cache_dir
+        self.max_threads = max_threads
+        self.recycle_pages = recycle_pages
+        self.recycle_minutes = recycle_minutes
         if self.screenshot_path:
             os.makedirs(self.screenshot_path, exist_ok=True)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._session = None
         
-    def parse_input(self, input_data: PipelineData | None = None):
+    def parse_input(self, input_data: PipelineData | Iterable[PipelineData] | None = None):
+        if not isinstance(input_data, PipelineData):
+            # A stream of repo results, crawled as they arrive.
+            self.data = {}
+            self.input = {"link-category": _stream_link_category(self, input_data)}
+            return
         self.data = input_data.data.copy()
         required_data = {}
         self.input = {"link-category": []}
@@ -156,59 +379,79 @@ class HFDetailPageCrawler(PipelineStep):
             [(link, required_data['category']) for link in required_data['detail_urls']]
         )
         
+    def _driver_pool(self) -> WebDriverPool:
+        # With the http backend, Chrome is only started once a page needs the fallback.
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = _new_driver_pool(self)
+        return self._pool
+    
+    def _close_backends(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.cleanup()
+                self._pool = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        
     def run(self) -> PipelineResult:
-        with ThreadPoolExecutor(self.threads) as executor, WebDriverPool(self.threads) as p:
-            task_retries = {lc: 0 for lc in self.input['link-category']}
-            completed_tasks = set()
-            retry_tasks: list[tuple[str, str]] = list()
-            futures = {
-                executor.submit(HFDetailPageCrawler._scrape, self, lc[0], lc[1], p): lc
-                for lc in self.input['link-category']}
-            
-            while futures or retry_tasks:
-                for lc in retry_tasks:
-                    sleep(5)
-                    futures.update({
-                        executor.submit(HFDetailPageCrawler._scrape, self, lc[0], lc[1], p): lc
-                    })
-                    task_retries[lc] += 1
-                retry_tasks.clear()
-                    
-                for future in as_completed(futures):
-                    lc = futures[future]
-                    info = future.result()
-                    if info.error_msg is None:
-                        data = asdict(info)
-                        msg = data.copy()
-                        msg.pop('metadata')
-                        data.update(self.data)
-                        yield PipelineData(data, msg, None)
-                    else:
-                        if task_retries[lc] < self.max_retries:
-                            retry_tasks.append(lc)
-                        else:
-                            logger.opt(exception=info.error_msg).error(f"HFDetailPage Error with detail_link: {lc[0]} and category: {lc[1]}")
-                            e = info.error_msg
-                            error_msg = "".join(
-                                traceback.format_exception(type(e), e, e.__traceback__)
-                            )
-                            yield PipelineData(None, None, {
-                                "detail_link": lc[0],
-                                "category": lc[1],
-                                "error_msg": error_msg,
-                            })
-                    
-                    completed_tasks.add(future)
-                    
-                futures = {f: tp for f, tp in futures.items() if f not in completed_tasks}
-                completed_tasks.clear()
+        if self.backend == 'http':
+            size = self.concurrency if self.engine == 'async' else self.threads
+            self._session = init_session(size)
+            concurrency = self.concurrency
+        else:
+            self._driver_pool()
+            concurrency = min(self.concurrency, _workers(self))
+        try:
+            yield from self._crawl(self._pool, concurrency)
+        finally:
+            self._close_backends()
+    
+    def _crawl(self, resource, concurrency: int) -> PipelineResult:
+        tasks = self.input['link-category']
+        if self.engine == 'async':
+            results = _crawl_async(self, tasks, self._scrape, resource, concurrency)
+        else:
+            results = _crawl_threads(self, tasks, self._scrape, resource)
+        for lc, info in results:
+            if info.error_msg is None:
+                yield self._result(info)
+            else:
+                yield self._failure(lc, info.error_msg)
+    
+    def _result(self, info: HFModelInfo | HFDatasetInfo) -> PipelineData:
+        data = asdict(info)
+        msg = data.copy()
+        msg.pop('metadata')
+        data.update(self.data)
+        return PipelineData(data, msg, None)
+    
+    def _failure(self, lc: tuple[str, str], e: Exception) -> PipelineData:
+        logger.opt(exception=e).error(f"HFDetailPage Error with detail_link: {lc[0]} and category: {lc[1]}")
+        return PipelineData(None, None, {
+            "detail_link": lc[0],
+            "category": lc[1],
+            "error_msg": _format_error(e),
+        })
     
     def _scrape(
         self,
         detail_link: str,
         category: Literal['datasets', 'models'],
-        driver_pool: WebDriverPool
+        driver_pool: WebDriverPool | None = None
     ) -> HFModelInfo | HFDatasetInfo:
+        if self.backend == 'http':
+            if category == 'datasets':
+                page = HFDatasetHTTPPage(self._session, detail_link)
+            else:
+                page = HFModelHTTPPage(self._session, detail_link)
+            info = page.scrape()
+            # Screenshots are only needed to double check zero downloads (ai_check).
+            need_screenshot = self.screenshot_path and info.downloads_last_month == 0
+            if not self.fallback or (info.error_msg is None and not need_screenshot):
+                return info
+            driver_pool = self._driver_pool()
         with driver_pool.get_driver() as driver:
             if category == 'datasets':
                 page = HFDatasetPage(driver, detail_link, self.screenshot_path)
@@ -228,10 +471,27 @@ class MSRepoPageCrawler(PipelineStep):
         category: Literal['datasets', 'models'] | None = None,
         threads: int = 1,
         max_retries: int = 10,
+        engine: Literal['thread', 'async'] = 'thread',
+        per_host: int = 8,
+        rate: float | None = None,
+        driver_profile: Literal['default', 'lean'] = 'default',
+        cache_dir: str | None = None,
+        max_threads: int | None = None,
+        recycle_pages: int | None = None,
+        recycle_minutes: float | None = None,
     ):
+        assert engine in ['thread', 'async'], f"Unknown engine: {engine}"
         self.category = category
         self.threads = threads
         self.max_retries = max_retries
+        self.engine = engine
+        self.per_host = per_host
+        self.rate = rate
+        self.driver_profile = driver_profile
+        self.cache_dir = cache_dir
+        self.max_threads = max_threads
+        self.recycle_pages = recycle_pages
+        self.recycle_minutes = recycle_minutes
         
     def parse_input(self, input_data: PipelineData | None = None):
         self.data = input_data.data.copy()
@@ -261,58 +521,44 @@ class MSRepoPageCrawler(PipelineStep):
             ])
         
     def run(self) -> PipelineResult:
-        with ThreadPoolExecutor(self.threads) as executor, WebDriverPool(self.threads) as p:
-            task_retries = {lc: 0 for lc in self.input['link-category']}
-            completed_tasks = set()
-            retry_tasks: list[tuple[str, str]] = list()
-            futures = {
-                executor.submit(MSRepoPageCrawler._scrape, self, lc[0], lc[1], p): lc
-                for lc in self.input['link-category']}
-            
-            while futures or retry_tasks:
-                for lc in retry_tasks:
-                    sleep(5)
-                    futures.update({
-                        executor.submit(HFRepoPageCrawler._scrape, self, lc[0], lc[1], p): lc
-                    })
-                    task_retries[lc] += 1
-                retry_tasks.clear()
-                
-                for future in as_completed(futures):
-                    lc = futures[future]
-                    info = future.result()
-                    if info.error_msg is None:
-                        data = {
-                            "category": info.category,
-                            "detail_urls": info.detail_urls
-                        }
-                        msg = {
-                            "repo": info.repo,
-                            "repo_url": info.repo_url,
-                            "category": info.category,
-                            "total_links": info.total_links
-                        }
-                        data.update(self.data)
-                        yield PipelineData(data, msg, None)
-                    else:
-                        if task_retries[lc] < self.max_retries:
-                            retry_tasks.append(lc)
-                        else:
-                            logger.opt(exception=info.error_msg).error(f"MSRepoPage Error with repo_link: {lc[0]} and category: {lc[1]}")
-                            e = info.error_msg
-                            error_msg = "".join(
-                                traceback.format_exception(type(e), e, e.__traceback__)
-                            )
-                            yield PipelineData(None, None, {
-                                "repo_link": lc[0],
-                                "category": lc[1],
-                                "error_msg": error_msg,
-                            })
-                    
-                    completed_tasks.add(future)
-                    
-                futures = {f: lc for f, lc in futures.items() if f not in completed_tasks}
-                completed_tasks.clear()
+        with _new_driver_pool(self) as p:
+            # ModelScope pages are rendered client side, so every fetch needs
+            # a driver and the pool size bounds the concurrency.
+            yield from self._crawl(p, _workers(self))
+    
+    def _crawl(self, resource, concurrency: int) -> PipelineResult:
+        tasks = self.input['link-category']
+        if self.engine == 'async':
+            results = _crawl_async(self, tasks, self._scrape, resource, concurrency)
+        else:
+            results = _crawl_threads(self, tasks, self._scrape, resource)
+        for lc, info in results:
+            if info.error_msg is None:
+                yield self._result(info)
+            else:
+                yield self._failure(lc, info.error_msg)
+    
+    def _result(self, info: MSRepoInfo) -> PipelineData:
+        data = {
+            "category": info.category,
+            "detail_urls": info.detail_urls
+        }
+        msg = {
+            "repo": info.repo,
+            "repo_url": info.repo_url,
+            "category": info.category,
+            "total_links": info.total_links
+        }
+        data.update(self.data)
+        return PipelineData(data, msg, None)
+    
+    def _failure(self, lc: tuple[str, str], e: Exception) -> PipelineData:
+        logger.opt(exception=e).error(f"MSRepoPage Error with repo_link: {lc[0]} and category: {lc[1]}")
+        return PipelineData(None, None, {
+            "repo_link": lc[0],
+            "category": lc[1],
+            "error_msg": _format_error(e),
+        })
             
     def _scrape(
         self,
@@ -336,14 +582,36 @@ class MSDetailPageCrawler(PipelineStep):
         threads: int = 1,
         max_retries: int = 10,
         screenshot_path: str | None = None,
+        engine: Literal['thread', 'async'] = 'thread',
+        per_host: int = 8,
+        rate: float | None = None,
+        driver_profile: Literal['default', 'lean'] = 'default',
+        cache_dir: str | None = None,
+        max_threads: int | None = None,
+        recycle_pages: int | None = None,
+        recycle_minutes: float | None = None,
     ):
+        assert engine in ['thread', 'async'], f"Unknown engine: {engine}"
         self.threads = threads
         self.max_retries = max_retries
         self.screenshot_path = screenshot_path
+        self.engine = engine
+        self.per_host = per_host
+        self.rate = rate
+        self.driver_profile = driver_profile
+        self.cache_dir = cache_dir
+        self.max_threads = max_threads
+        self.recycle_pages = recycle_pages
+        self.recycle_minutes = recycle_minutes
         if self.screenshot_path:
             os.makedirs(self.screenshot_path, exist_ok=True)
         
-    def parse_input(self, input_data: PipelineData | None = None):
+    def parse_input(self, input_data: PipelineData | Iterable[PipelineData] | None = None):
+        if not isinstance(input_data, PipelineData):
+            # A stream of repo results, crawled as they arrive.
+            self.data = {}
+            self.input = {"link-category": _stream_link_category(self, input_data)}
+            return
         self.data = input_data.data.copy()
         required_data = {}
         self.input = {"link-category": []}
@@ -358,51 +626,35 @@ class MSDetailPageCrawler(PipelineStep):
         )
         
     def run(self) -> PipelineResult:
-        with ThreadPoolExecutor(self.threads) as executor, WebDriverPool(self.threads) as p:
-            task_retries = {lc: 0 for lc in self.input['link-category']}
-            completed_tasks = set()
-            retry_tasks: list[tuple[str, str]] = list()
-            futures = {
-                executor.submit(MSDetailPageCrawler._scrape, self, lc[0], lc[1], p): lc 
-                for lc in self.input['link-category']}
-            
-            while futures or retry_tasks:
-                for lc in retry_tasks:
-                    sleep(5)
-                    futures.update({
-                        executor.submit(MSDetailPageCrawler._scrape, self, lc[0], lc[1], p): lc
-                    })
-                    task_retries[lc] += 1
-                retry_tasks.clear()
-                
-                for future in as_completed(futures):
-                    lc = futures[future]
-                    info = future.result()
-                    if info.error_msg is None:
-                        data = asdict(info)
-                        msg = data.copy()
-                        msg.pop('metadata')
-                        data.update(self.data)
-                        yield PipelineData(data, msg, None)
-                    else:
-                        if task_retries[lc] < self.max_retries:
-                            retry_tasks.append(lc)
-                        else:
-                            logger.opt(exception=info.error_msg).error(f"MSDetailPage Error with detail_link: {lc[0]} and category: {lc[1]}")
-                            e = info.error_msg
-                            error_msg = "".join(
-                                traceback.format_exception(type(e), e, e.__traceback__)
-                            )
-                            yield PipelineData(None, None, {
-                                "detail_link": lc[0],
-                                "category": lc[1],
-                                "error_msg": error_msg,
-                            })
-                    
-                    completed_tasks.add(future)
-                
-                futures = {f: lc for f, lc in futures.items() if f not in completed_tasks}
-                completed_tasks.clear()
+        with _new_driver_pool(self) as p:
+            yield from self._crawl(p, _workers(self))
+    
+    def _crawl(self, resource, concurrency: int) -> PipelineResult:
+        tasks = self.input['link-category']
+        if self.engine == 'async':
+            results = _crawl_async(self, tasks, self._scrape, resource, concurrency)
+        else:
+            results = _crawl_threads(self, tasks, self._scrape, resource)
+        for lc, info in results:
+            if info.error_msg is None:
+                yield self._result(info)
+            else:
+                yield self._failure(lc, info.error_msg)
+    
+    def _result(self, info: MSModelInfo | MSDatasetInfo) -> PipelineData:
+        data = asdict(info)
+        msg = data.copy()
+        msg.pop('metadata')
+        data.update(self.data)
+        return PipelineData(data, msg, None)
+    
+    def _failure(self, lc: tuple[str, str], e: Exception) -> PipelineData:
+        logger.opt(exception=e).error(f"MSDetailPage Error with detail_link: {lc[0]} and category: {lc[1]}")
+        return PipelineData(None, None, {
+            "detail_link": lc[0],
+            "category": lc[1],
+            "error_msg": _format_error(e),
+        })
             
     def _scrape(
         self,
@@ -418,6 +670,7 @@ class MSDetailPageCrawler(PipelineStep):
             info = page.scrape()
         return info
         
+        
 
 class OpenDataLabCrawler(PipelineStep):
     
@@ -428,9 +681,19 @@ class OpenDataLabCrawler(PipelineStep):
         self,
         threads: int = 1,
         max_retries: int = 10,
+        driver_profile: Literal['default', 'lean'] = 'default',
+        cache_dir: str | None = None,
+        max_threads: int | None = None,
+        recycle_pages: int | None = None,
+        recycle_minutes: float | None = None,
     ):
         self.threads = threads
         self.max_retries = max_retries
+        self.driver_profile = driver_profile
+        self.cache_dir = cache_dir
+        self.max_threads = max_threads
+        self.recycle_pages = recycle_pages
+        self.recycle_minutes = recycle_minutes
         
     def parse_input(self, input_data: PipelineData | None = None):
         self.data = input_data.data.copy()
@@ -448,51 +711,25 @@ class OpenDataLabCrawler(PipelineStep):
         self.input['links'].extend(required_data['OpenDataLab'])
     
     def run(self) -> PipelineResult:
-        with ThreadPoolExecutor(self.threads) as executor, WebDriverPool(self.threads) as p:
-            task_retries = {link: 0 for link in self.input['links']}
-            completed_tasks = set()
-            retry_tasks: list[str] = list()
-            futures = {
-                executor.submit(OpenDataLabCrawler._scrape, self, link, p): link
-                for link in self.input['links']}
-            
-            while futures or retry_tasks:
-                for link in retry_tasks:
-                    sleep(5)
-                    futures.update({
-                        executor.submit(OpenDataLabCrawler._scrape, self, link, p)
+        with _new_driver_pool(self) as p:
+            results = _crawl_threads(
+                self, self.input['links'], self._scrape, p,
+                error_of=lambda infos: None if isinstance(infos, list) else infos
+            )
+            for link, infos in results:
+                if not isinstance(infos, list):
+                    logger.opt(exception=infos).error(f"OpenDataLab error with link={link}")
+                    yield PipelineData(None, None, {
+                        "link": link,
+                        "error_msg": _format_error(infos),
                     })
-                    task_retries[link] += 1
-                retry_tasks.clear()
-                
-                for future in as_completed(futures):
-                    link = futures[future]
-                    infos = future.result()
-                    if not isinstance(infos, list):
-                        if task_retries[link] < self.max_retries:
-                            retry_tasks.append(link)
-                        else:
-                            logger.opt(exception=infos).error(f"OpenDataLab error with link={link}")
-                            e = infos
-                            error_msg = "".join(
-                                traceback.format_exception(type(e), e, e.__traceback__)
-                            )
-                            yield PipelineData(None, None, {
-                                "link": link,
-                                "error_msg": error_msg,
-                            })
-                    else:
-                        for info in infos:
-                            data = asdict(info)
-                            msg = data.copy()
-                            msg.pop('metadata')
-                            data.update(self.data)
-                            yield PipelineData(data, msg, None)
-                    
-                    completed_tasks.add(future)
-                
-                futures = {f: link for f, link in futures.items() if f not in completed_tasks}
-                completed_tasks.clear()
+                else:
+                    for info in infos:
+                        data = asdict(info)
+                        msg = data.copy()
+                        msg.pop('metadata')
+                        data.update(self.data)
+                        yield PipelineData(data, msg, None)
     
     def _scrape(
         self,
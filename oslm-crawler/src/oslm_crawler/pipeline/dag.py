@@ -0,0 +1,216 @@
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Generator, Iterable, Iterator
+from loguru import logger
+from .base import PipelineStep, PipelineData, PipelineResult
+
+
+@dataclass
+class Stage:
+    name: str
+    step: Callable[[], PipelineStep]  # called once per worker
+    workers: int = 1
+    maxsize: int = 64  # bound of the input queue, producers block while it is full
+    stream: bool = False  # parse_input gets the whole input stream instead of one item at a time
+    flush: Callable[[PipelineStep], PipelineResult] | None = None  # run on each worker's step after the last input
+    route: Callable[[PipelineData], str] | None = None  # picks the next stage of each output, default is all of them
+
+
+class MapStep(PipelineStep):
+    """Turns a function of one `PipelineData` into a step. The function returns one item, an iterable of items or None."""
+
+    ptype = "🔀 MAP"
+
+    def __init__(self, fn: Callable[[PipelineData], PipelineData | Iterable[PipelineData] | None]):
+        self.fn = fn
+
+    def parse_input(self, input_data: PipelineData | None = None):
+        self.input = input_data
+
+    def run(self) -> PipelineResult:
+        res = self.fn(self.input)
+        if res is None:
+            return
+        if isinstance(res, PipelineData):
+            yield res
+        else:
+            yield from res
+
+
+class _Cancelled(Exception):
+    pass
+
+
+_DONE = object()
+
+
+class StreamingDAG:
+    """
+    Runs `PipelineStep`s as stages of a graph, each stage in its own worker
+    threads with a bounded queue in front of it. Items flow on as soon as a
+    stage yields them, a full queue blocks the stages feeding it. Outputs
+    carrying an `error` are handed to `on_error` instead of the next stages,
+    outputs of the stages nothing comes after are yielded by `run`, with at
+    most `maxsize` of them waiting for the caller.
+    """
+
+    def __init__(
+        self,
+        on_error: Callable[[str, PipelineData], None] | None = None,
+        maxsize: int = 64,
+    ):
+        self.on_error = on_error
+        self.maxsize = maxsize
+        self.stages: dict[str, Stage] = {}
+        self.parents: dict[str, list[str]] = {}
+        self.children: dict[str, list[str]] = {}
+
+    def add(self, stage: Stage, after: str | list[str] | None = None) -> 'StreamingDAG':
+        assert stage.name not in self.stages, f"Duplicate stage: {stage.name}"
+        after = [after] if isinstance(after, str) else list(after or [])
+        for parent in after:
+            assert parent in self.stages, f"Unknown stage: {parent}"
+            self.children[parent].append(stage.name)
+        self.stages[stage.name] = stage
+        self.parents[stage.name] = after
+        self.children[stage.name] = []
+        return self
+
+    def run(
+        self, inputs: dict[str, Iterable[PipelineData]]
+    ) -> Generator[tuple[str, PipelineData], None, None]:
+        """Feed `inputs` into their stages and yield `(stage, data)` for every output of a final stage."""
+        for name in inputs:
+            assert name in self.stages, f"Unknown stage: {name}"
+        self._cancel = threading.Event()
+        self._error = None
+        self._lock = threading.Lock()
+        self._queues = {name: queue.Queue(stage.maxsize) for name, stage in self.stages.items()}
+        self._out = queue.Queue(self.maxsize)
+        self._producers = {
+            name: sum(self.stages[p].workers for p in self.parents[name]) + (name in inputs)
+            for name in self.stages
+        }
+        self._sinks = sum(s.workers for n, s in self.stages.items() if not self.children[n])
+        threads = [
+            threading.Thread(target=self._feed, args=(name, items), name=f"dag-feed-{name}", daemon=True)
+            for name, items in inputs.items()
+        ]
+        for name, stage in self.stages.items():
+            if self._producers[name] == 0:
+                # Nothing will ever reach this stage, it only flushes.
+                for _ in range(stage.workers):
+                    self._queues[name].put(_DONE)
+            threads.extend(
+                threading.Thread(target=self._work, args=(stage,), name=f"dag-{name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            )
+        for t in threads:
+            t.start()
+        try:
+            finished = 0
+            while finished < self._sinks:
+                item = self._get(self._out)
+                if item is _DONE:
+                    finished += 1
+                else:
+                    yield item
+        except _Cancelled:
+            pass
+        finally:
+            self._cancel.set()
+            for t in threads:
+                t.join()
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, q: queue.Queue, item):
+        while True:
+            if self._cancel.is_set():
+                raise _Cancelled()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _get(self, q: queue.Queue):
+        while True:
+            if self._cancel.is_set():
+                raise _Cancelled()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    def _iter(self, name: str) -> Iterator[PipelineData]:
+        while (item := self._get(self._queues[name])) is not _DONE:
+            yield item
+
+    def _fail(self, e: BaseException):
+        with self._lock:
+            if self._error is None:
+                self._error = e
+        self._cancel.set()
+
+    def _close_one(self, name: str):
+        with self._lock:
+            self._producers[name] -= 1
+            done = self._producers[name] == 0
+        if done:
+            for _ in range(self.stages[name].workers):
+                self._put(self._queues[name], _DONE)
+
+    def _feed(self, name: str, items: Iterable[PipelineData]):
+        try:
+            for item in items:
+                self._put(self._queues[name], item)
+            self._close_one(name)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _emit(self, stage: Stage, data: PipelineData):
+        if data.error is not None:
+            if self.on_error is not None:
+                self.on_error(stage.name, data)
+            else:
+                logger.warning(f"Dropped an error of stage {stage.name}: {data.error}")
+            return
+        children = self.children[stage.name]
+        if not children:
+            self._put(self._out, (stage.name, data))
+        elif stage.route is not None:
+            target = stage.route(data)
+            assert target in children, f"Stage {stage.name} routed to {target}, which does not come after it"
+            self._put(self._queues[target], data)
+        else:
+            for child in children:
+                self._put(self._queues[child], data)
+
+    def _work(self, stage: Stage):
+        try:
+            step = stage.step()
+            if stage.stream:
+                step.parse_input(self._iter(stage.name))
+                for data in step.run() or []:
+                    self._emit(stage, data)
+            else:
+                for item in self._iter(stage.name):
+                    step.parse_input(item)
+                    for data in step.run() or []:
+                        self._emit(stage, data)
+            if stage.flush is not None:
+                for data in stage.flush(step) or []:
+                    self._emit(stage, data)
+            for child in self.children[stage.name]:
+                self._close_one(child)
+            if not self.children[stage.name]:
+                self._put(self._out, _DONE)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            logger.exception(f"Stage {stage.name} failed.")
+            self._fail(e)
@@ -0,0 +1,179 @@
+import time
+import queue
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generator, Hashable
+from urllib.parse import urlsplit
+
+_RELEASE = object()
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, burst: int | None = None):
+        assert rate > 0, 'rate must be positive'
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class AsyncCrawlEngine:
+    """
+    Runs blocking fetch functions from an asyncio event loop in a background thread.
+    In-flight fetches are bounded by `concurrency` in total and by `per_host` for
+    each host, and their start rate by a token bucket (`rate` fetches per second)
+    for each host. The blocking functions run on an executor of `concurrency`
+    threads, so the real ceiling for one host is `min(per_host, concurrency)`.
+    Results are handed back to the caller's thread by `as_completed`, so
+    `PipelineStep.run()` stays a plain generator.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 64,
+        per_host: int = 8,
+        rate: float | None = None,
+        burst: int | None = None,
+    ):
+        self.concurrency = concurrency
+        self.per_host = min(per_host, concurrency)
+        self.rate = rate
+        self.burst = burst
+        self._results = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def start(self):
+        self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix='crawl-engine')
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(self._executor)
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._global = asyncio.Semaphore(self.concurrency)
+        self._host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        self._buckets = {}
+
+    def close(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        self._thread.join()
+        self._loop.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._loop = None
+
+    async def _shutdown(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop.stop()
+
+    @staticmethod
+    def host_of(task: Any) -> str:
+        link = task[0] if isinstance(task, tuple) else task
+        return urlsplit(str(link)).netloc
+
+    def submit(
+        self,
+        task: Hashable,
+        fn: Callable,
+        *args,
+        delay: float = 0,
+        host: str | None = None
+    ):
+        """Schedule `fn(*args)` for `task`. Safe to call while iterating `as_completed`."""
+        if self._loop is None:
+            raise RuntimeError("AsyncCrawlEngine is not started.")
+        host = host if host is not None else self.host_of(task)
+        with self._lock:
+            self._pending += 1
+        asyncio.run_coroutine_threadsafe(self._fetch(task, fn, args, delay, host), self._loop)
+
+    def hold(self):
+        """Keep `as_completed` waiting for tasks that another thread may still submit, until `release`."""
+        with self._lock:
+            self._pending += 1
+
+    def release(self):
+        self._results.put((_RELEASE, None, None))
+
+    async def _fetch(self, task, fn, args, delay, host):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            async with self._global, self._host_limits[host]:
+                if self.rate:
+                    if host not in self._buckets:
+                        self._buckets[host] = TokenBucket(self.rate, self.burst)
+                    await self._buckets[host].acquire()
+                result = await self._loop.run_in_executor(None, fn, *args)
+            self._results.put((task, result, None))
+        except Exception as e:
+            self._results.put((task, None, e))
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def poll(self, block: bool = False) -> Generator[tuple[Hashable, Any], None, None]:
+        """Like `as_completed`, but stop at the first unfinished task. With `block`, wait for one result first."""
+        while True:
+            with self._lock:
+                if self._pending == 0:
+                    return
+            try:
+                task, result, exc = self._results.get(block=block)
+            except queue.Empty:
+                return
+            with self._lock:
+                self._pending -= 1
+            if task is _RELEASE:
+                continue
+            block = False
+            if exc is not None:
+                raise exc
+            yield task, result
+
+    def as_completed(self) -> Generator[tuple[Hashable, Any], None, None]:
+        while True:
+            with self._lock:
+                if self._pending == 0:
+                    return
+            task, result, exc = self._results.get()
+            with self._lock:
+                self._pending -= 1
+            if task is _RELEASE:
+                continue
+            if exc is not None:
+                raise exc
+            yield task, result
@@ -0,0 +1,199 @@
+import jsonlines
+from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Literal
+from loguru import logger
+from .base import PipelineData
+
+
+# The metric that tells how busy a repo was in the previous snapshot.
+TRAFFIC_KEY = {
+    'HuggingFace': 'downloads_last_month',
+    'ModelScope': 'total_downloads',
+}
+
+
+@dataclass
+class CrawlPlan:
+    category: Literal['datasets', 'models']
+    full: list[str] = field(default_factory=list)
+    cheap: list[str] = field(default_factory=list)
+    carried: list[dict] = field(default_factory=list)
+
+
+def find_previous_snapshot(
+    history_data_path: Path,
+    source: str,
+    date: str,
+) -> Path | None:
+    """Closest crawl of `source` to one month before `date`, the same way ranking looks up last month."""
+    last_month_date = datetime.strptime(date, r"%Y-%m-%d") - timedelta(days=30)
+    min_diff = None
+    closest = None
+    for d in history_data_path.glob("????-??-??"):
+        if d.name >= date or not (d / source).is_dir():
+            continue
+        diff = abs((datetime.strptime(d.name, r"%Y-%m-%d") - last_month_date).days)
+        if min_diff is None or diff < min_diff:
+            min_diff = diff
+            closest = d / source
+    if min_diff is None or min_diff > 15:
+        return None
+    return closest
+
+
+class IncrementalPlanner:
+    """
+    Splits the detail urls of a crawl against the previous snapshot:
+
+    - new repos, hot repos (traffic >= `hot_threshold`) and repos not crawled
+      in full for `refresh_days` are crawled in full;
+    - the remaining long-tail repos go to the cheap path (the `http` backend)
+      when the source has one;
+    - otherwise they are carried forward from the snapshot, marked with
+      `carried_from`.
+
+    `mark` records how each crawled repo was crawled (`crawl_mode`), so a
+    cheap crawl does not count as a full one at the next refresh. Carried
+    records keep the cumulative `total_downloads` of their last crawl, so
+    their monthly downloads are carried along as `carried_downloads_last_month`
+    and a refreshed record tells the processor since when its delta counts with
+    `downloads_since`.
+    """
+
+    def __init__(
+        self,
+        source: Literal['HuggingFace', 'ModelScope'],
+        history_data_path: str | None = None,
+        date: str | None = None,
+        hot_threshold: int = 1000,
+        refresh_days: int = 90,
+        cheap_path: bool = True,
+    ):
+        assert source in TRAFFIC_KEY, f"Incremental crawl is not supported for {source}"
+        self.source = source
+        self.date = date or str(datetime.today().date())
+        self.hot_threshold = hot_threshold
+        self.refresh_days = refresh_days
+        self.cheap_path = cheap_path
+        if history_data_path:
+            history_data_path = Path(history_data_path)
+        else:
+            history_data_path = Path(__file__).parents[3] / 'data'
+        self.history_data_path = history_data_path
+        self.snapshot = find_previous_snapshot(history_data_path, source, self.date)
+        self.previous = {
+            'models': self._load('raw-models-info.jsonl'),
+            'datasets': self._load('raw-datasets-info.jsonl'),
+        }
+        self.earlier = {}
+        self.cheap = set()
+        self.stats = {'full': 0, 'cheap': 0, 'carried': 0}
+        if self.snapshot is None:
+            logger.warning(f"No previous snapshot of {source} found, every repo is crawled in full.")
+        else:
+            logger.info(f"Incremental crawl of {source} against {self.snapshot}")
+
+    def _load(self, filename: str, snapshot: Path | None = None) -> dict[str, dict]:
+        snapshot = snapshot or self.snapshot
+        if snapshot is None or not (snapshot / filename).exists():
+            return {}
+        with jsonlines.open(snapshot / filename, 'r') as f:
+            return {
+                item['link']: item for item in f
+                if item.get('error_msg') is None and item.get(TRAFFIC_KEY[self.source]) is not None
+            }
+
+    def _last_full_crawl(self, item: dict) -> datetime:
+        if item.get('crawl_mode') == 'cheap':
+            date = item.get('last_full_crawl')
+        else:
+            date = item.get('carried_from')
+        return datetime.strptime(date or item['date_crawl'], r"%Y-%m-%d")
+
+    def _carried_downloads(self, category: str, item: dict) -> int | None:
+        # Downloads of the month before the snapshot, carried along while the
+        # repo is not crawled again. Only cumulative traffic needs it.
+        if self.source != 'ModelScope':
+            return item.get('downloads_last_month')
+        if item.get('carried_from'):
+            return item.get('carried_downloads_last_month')
+        if category not in self.earlier:
+            earlier = find_previous_snapshot(self.history_data_path, self.source, self.snapshot.parent.name)
+            self.earlier[category] = self._load(f'raw-{category}-info.jsonl', earlier) if earlier else {}
+        before = self.earlier[category].get(item['link'])
+        if before is None:
+            return None
+        return item['total_downloads'] - before['total_downloads']
+
+    def plan(
+        self,
+        category: Literal['datasets', 'models'],
+        detail_urls: list[str],
+    ) -> CrawlPlan:
+        plan = CrawlPlan(category)
+        previous = self.previous[category]
+        today = datetime.strptime(self.date, r"%Y-%m-%d")
+        for url in detail_urls:
+            item = previous.get(url)
+            if (
+                item is None
+                or item[TRAFFIC_KEY[self.source]] >= self.hot_threshold
+                or (today - self._last_full_crawl(item)).days >= self.refresh_days
+            ):
+                plan.full.append(url)
+            elif self.cheap_path:
+                plan.cheap.append(url)
+                self.cheap.add(url)
+            else:
+                carried = item.copy()
+                carried['crawl_mode'] = 'carried'
+                carried['carried_from'] = item.get('carried_from') or item['date_crawl']
+                carried['carried_downloads_last_month'] = self._carried_downloads(category, item)
+                carried['date_crawl'] = self.date
+                carried['img_path'] = None
+                plan.carried.append(carried)
+        self.stats['full'] += len(plan.full)
+        self.stats['cheap'] += len(plan.cheap)
+        self.stats['carried'] += len(plan.carried)
+        return plan
+
+    def split(
+        self, inp: PipelineData
+    ) -> tuple[PipelineData, PipelineData | None, list[PipelineData]]:
+        """Split a `crawl_repo_page` result into the full and cheap crawl inputs and the carried records."""
+        plan = self.plan(inp.data['category'], inp.data['detail_urls'])
+        extra = {k: v for k, v in inp.data.items() if k not in ['category', 'detail_urls']}
+        full = PipelineData(inp.data | {'detail_urls': plan.full}, inp.message, None)
+        cheap = None
+        if plan.cheap:
+            cheap = PipelineData(inp.data | {'detail_urls': plan.cheap}, inp.message, None)
+        carried = [PipelineData(item | extra, None, None) for item in plan.carried]
+        return full, cheap, carried
+
+    def mark(self, record: dict) -> dict:
+        """A crawled `record` with its `crawl_mode`, the date of its last full crawl when crawled cheap."""
+        if record.get('crawl_mode') == 'carried':
+            return record
+        category = 'models' if 'model_name' in record else 'datasets'
+        previous = self.previous[category].get(record['link'])
+        if record['link'] in self.cheap:
+            return record | {
+                'crawl_mode': 'cheap',
+                'last_full_crawl': self._last_full_crawl(previous).strftime(r"%Y-%m-%d"),
+            }
+        record = record | {'crawl_mode': 'full'}
+        if previous is not None and previous.get('carried_from'):
+            # Last month's total is the one of the last crawl before the carry.
+            record['downloads_since'] = previous['carried_from']
+        return record
+
+    def report(self):
+        saved = self.stats['cheap'] + self.stats['carried']
+        total = saved + self.stats['full']
+        logger.info(
+            f"Incremental crawl of {self.source}: {self.stats['full']} full, "
+            f"{self.stats['cheap']} cheap, {self.stats['carried']} carried forward. "
+            f"Saved {saved}/{total} browser fetches."
+        )
@@ -1,22 +1,153 @@
 import json
 import traceback
-from datetime import datetime, timedelta
 from pathlib import Path
+from datetime import datetime
 from typing import Literal, Optional
 from collections import defaultdict
 from typing_extensions import deprecated
-import jsonlines
 from loguru import logger
 from .base import PipelineStep, PipelineResult, PipelineData
 from ..ai.model_info_generator import ModelInfo, gen_model_info_huggingface, gen_model_info_modelscope
 from ..ai.dataset_info_generator import DatasetInfo, gen_dataset_info_huggingface, gen_dataset_info_modelscope
-from ..ai.screenshot_checker import check_image_info, CheckRequest
+from ..ai.screenshot_checker import verify_screenshots, CheckRequest
+from ..database.info_store import InfoStore
+from ..database.history_index import HistoryIndex
+from ..ai.classification import ClassificationService
+from ..ai.heuristics import ModelHeuristics
 
 
-class HFInfoProcessor(PipelineStep):
+class _BatchClassifier:
+    """
+    Records without a known modality are buffered by `_process_model` and
+    `_process_dataset`; full buffers go to `self.classifier` in the background
+    while the stream moves on, and the parked records are processed again once
+    their batch is classified. Models the local heuristics are sure about skip
+    the buffer altogether.
+    """
+
+    def _init_heuristics(self, enabled: bool, threshold: float):
+        self.heuristics = ModelHeuristics(self.model_infos.to_dict(), threshold) if enabled else None
+
+    def _guess_model_info(self, model_key: str, inp: dict) -> Optional[dict]:
+        if self.heuristics is None:
+            return None
+        guess = self.heuristics.classify(model_key, inp.get('metadata'))
+        if guess is None:
+            return None
+        self.heuristics.record(guess)
+        logger.debug(f"{model_key} classified by {guess.rule} ({guess.confidence:.2f}): {guess.label}")
+        return {'modality': guess.modality, 'is_large_model': guess.is_large_model}
+
+    def _submit_classification(self, category: Literal['models', 'datasets']):
+        buffer = getattr(self, f'{category}_buffer')
+        inps = buffer.copy()
+        buffer.clear()
+        self.classifier.submit(self.classify_fns[category], [inp['link'] for inp in inps], (category, inps))
+
+    def _classified(self, drain: bool = False) -> PipelineResult:
+        """Emit the records of the classified batches. With `drain`, classify the buffers and wait for all of them."""
+        while True:
+            if drain:
+                for category in self.classify_fns:
+                    if getattr(self, f'{category}_buffer'):
+                        self._submit_classification(category)
+                if self.classifier.pending == 0:
+                    break
+            for (category, inps), infos in self.classifier.completed(block=drain):
+                infos = self._gen_new_info(infos)
+                logger.info(f"Generate {category[:-1]} informations:\n{json.dumps(infos, indent=2, ensure_ascii=False)}")
+                if category == 'models':
+                    self.model_infos.update(infos)
+                    if self.heuristics is not None:
+                        for key, info in infos.items():
+                            self.heuristics.learn(key, (info['modality'], info['is_large_model']))
+                else:
+                    self.dataset_infos.update(infos)
+                yield from self._reprocess(category, inps)
+            if not drain:
+                break
+        if drain:
+            self.classifier.close()
+            if getattr(self, 'heuristics', None) is not None:
+                self.heuristics.report(self.buffer_size)
+        # Classified records may still wait for their screenshot, so checks drain last.
+        if getattr(self, 'checker', None) is not None:
+            yield from self._verified(drain)
+
+    def _reprocess(self, category: Literal['models', 'datasets'], inps: list[dict]) -> PipelineResult:
+        process = self._process_model if category == 'models' else self._process_dataset
+        for inp in inps:
+            try:
+                data = process(inp)
+                if data:
+                    data.data.update(self.data)
+                    yield data
+            except Exception as e:
+                logger.opt(exception=e).error(f"{self.__class__.__name__} Error with input: {inp}")
+                error_msg = traceback.format_exc()
+                yield PipelineData(None, None, {
+                    "type": type(e),
+                    "error_msg": error_msg
+                })
+
+    def _needs_check(self, inp: dict) -> bool:
+        img_path = inp['img_path']
+        return (self.ai_check and bool(img_path) and inp['link'] not in self.screenshots_checked
+                and Path(img_path).exists())
+
+    def _park_for_check(self, category: Literal['models', 'datasets'], inp: dict):
+        """
+        Park a record with zero downloads until the LLM has read its screenshot;
+        full batches are checked in the background like the classifications.
+        """
+        self.checks_buffer.append((category, inp.copy()))
+        if len(self.checks_buffer) >= self.buffer_size:
+            self._submit_checks()
+
+    def _submit_checks(self):
+        parked = self.checks_buffer.copy()
+        self.checks_buffer.clear()
+        requests = [
+            CheckRequest(inp['img_path'], inp['link'], self.check_source, self.screenshot_max_side, self.screenshot_crop)
+            for _, inp in parked
+        ]
+        self.checker.submit(verify_screenshots, requests, parked)
+
+    def _verified(self, drain: bool = False) -> PipelineResult:
+        key = 'downloads_last_month' if self.check_source == 'HuggingFace' else 'total_downloads'
+        while True:
+            if drain:
+                if self.checks_buffer:
+                    self._submit_checks()
+                if self.checker.pending == 0:
+                    break
+            for parked, responses in self.checker.completed(block=drain):
+                responses = {response.link: response for response in responses}
+                for category, inp in parked:
+                    self.screenshots_checked.add(inp['link'])
+                    response = responses.get(inp['link'])
+                    if response is None:
+                        continue
+                    downloads = response.downloads_last_month if key == 'downloads_last_month' else response.downloads
+                    if downloads is not None and downloads > 0:
+                        logger.warning(f"Data error: {inp}, {key} corrected from {inp[key]} to {downloads}.")
+                        inp[key] = downloads
+                        getattr(self, f'{category}_check_buffer').append(inp)
+                    elif response.error:
+                        logger.error(f"Screenshot check of {inp['link']} failed: {response.error}")
+                for category in ('models', 'datasets'):
+                    yield from self._reprocess(category, [inp for c, inp in parked if c == category])
+            if not drain:
+                break
+        if drain:
+            self.checker.close()
+
+
+class HFInfoProcessor(_BatchClassifier, PipelineStep):
     
     ptype = "🚗 PROCESSOR"
     required_keys = ["repo_org_mapper"]
+    check_source = "HuggingFace"
     
     def __init__(
         self,
@@ -26,12 +157,25 @@ class HFInfoProcessor(PipelineStep):
         ai_check: bool = False,
         buffer_size: int = 8,
         max_retries: int = 3,
+        llm_concurrency: int = 4,
+        llm_rate: float | None = None,
+        heuristics: bool = True,
+        heuristics_threshold: float = 0.85,
+        screenshot_max_side: int | None = 1024,
+        screenshot_crop: list[float] | None = None,
     ):
         self.ai_gen = ai_gen
         self.ai_check = ai_check
         self.buffer_size = buffer_size
         self.max_retries = max_retries
+        self.classifier = ClassificationService(llm_concurrency, llm_rate)
+        self.classify_fns = {'models': gen_model_info_huggingface, 'datasets': gen_dataset_info_huggingface}
         
+        self.checker = ClassificationService(llm_concurrency, llm_rate) if ai_check else None
+        self.checks_buffer = []
+        self.screenshots_checked = set()
+        self.screenshot_max_side = screenshot_max_side
+        self.screenshot_crop = tuple(screenshot_crop) if screenshot_crop else None
         if ai_check:
             self.models_check_buffer = []
             self.datasets_check_buffer = []
@@ -49,15 +193,14 @@ class HFInfoProcessor(PipelineStep):
         self.dataset_info_path = dataset_info_path
         self.model_infos = self._init_info(model_info_path)
         self.dataset_infos = self._init_info(dataset_info_path)
+        self._init_heuristics(heuristics, heuristics_threshold)
         self.models_buffer = []
         self.models_buffer_counter = defaultdict(int)
         self.datasets_buffer = []
         self.datasets_buffer_counter = defaultdict(int)
         
-    def _init_info(self, path):
-        with open(path, 'r', encoding='utf-8') as f:
-            info = json.load(f)
-        return info
+    def _init_info(self, path) -> InfoStore:
+        return InfoStore.from_json(path)
         
     def parse_input(self, input_data: PipelineData | None = None):
         self.required_keys = [
@@ -94,6 +237,8 @@ class HFInfoProcessor(PipelineStep):
                 return None
             model_key = f'{repo}/{model_name}'
             model_info = self.model_infos.get(model_key, None)
+            if not model_info:
+                model_info = self._guess_model_info(model_key, inp)
             if model_info:
                 modality = model_info['modality']
                 is_large_model = model_info['is_large_model']
@@ -105,14 +250,9 @@ class HFInfoProcessor(PipelineStep):
             if is_large_model:
                 downloads_last_month = inp['downloads_last_month']
                 img_path = inp['img_path']
-                if downloads_last_month == 0 and self.ai_check and img_path and Path(img_path).exists():
-                    request = CheckRequest(img_path, inp['link'], 'HuggingFace')
-                    response = check_image_info([request])[0]
-                    if response.downloads_last_month is not None and response.downloads_last_month > 0:
-                        downloads_last_month = response.downloads_last_month
-                        logger.warning(f"Data error: {inp}, downloads_last_month corrected from {inp['downloads_last_month']} to {downloads_last_month}.")
-                        inp['downloads_last_month'] = response.downloads_last_month
-                        self.models_check_buffer.append(inp)
+                if downloads_last_month == 0 and self._needs_check(inp):
+                    self._park_for_check('models', inp)
+                    return None
                 if downloads_last_month < 50:
                     return None
                 return PipelineData({
@@ -159,14 +299,9 @@ class HFInfoProcessor(PipelineStep):
             if is_valid:
                 downloads_last_month = inp['downloads_last_month']
                 img_path = inp['img_path']
-                if downloads_last_month == 0 and self.ai_check and img_path and Path(img_path).exists():
-                    request = CheckRequest(img_path, inp['link'], 'HuggingFace')
-                    response = check_image_info([request])[0]
-                    if response.downloads_last_month is not None and response.downloads_last_month > 0:
-                        downloads_last_month = response.downloads_last_month
-                        logger.warning(f"Data error: {inp}, downloads_last_month corrected from {inp['downloads_last_month']} to {downloads_last_month}.")
-                        inp['downloads_last_month'] = response.downloads_last_month
-                        self.datasets_check_buffer.append(inp)
+                if downloads_last_month == 0 and self._needs_check(inp):
+                    self._park_for_check('datasets', inp)
+                    return None
                 return PipelineData({
                     "org": org,
                     "repo": repo,
@@ -213,12 +348,10 @@ class HFInfoProcessor(PipelineStep):
         return res
     
     def update_model_info(self):
-        with open(self.model_info_path, 'w') as f:
-            json.dump(self.model_infos, f, indent=4, ensure_ascii=False)
+        self.model_infos.export_json(self.model_info_path)
             
     def update_dataset_info(self):
-        with open(self.dataset_info_path, 'w') as f:
-            json.dump(self.dataset_infos, f, indent=4, ensure_ascii=False)
+        self.dataset_infos.export_json(self.dataset_info_path)
             
     def run(self) -> PipelineResult:
         try:
@@ -241,103 +374,25 @@ class HFInfoProcessor(PipelineStep):
             })
 
         if len(self.models_buffer) >= self.buffer_size:
-            urls = [inp['link'] for inp in self.models_buffer]
-            model_infos = gen_model_info_huggingface(urls)
-            model_infos = self._gen_new_info(model_infos)
-            logger.info(f"Generate model informations:\n{json.dumps(model_infos, indent=2, ensure_ascii=False)}")
-            self.model_infos.update(model_infos)
-            self.update_model_info()
-            inps = self.models_buffer.copy()
-            self.models_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_model(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"HFInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
-        
+            self._submit_classification('models')
+
         if len(self.datasets_buffer) >= self.buffer_size:
-            urls = [inp['link'] for inp in self.datasets_buffer]
-            dataset_infos = gen_dataset_info_huggingface(urls)
-            dataset_infos = self._gen_new_info(dataset_infos)
-            logger.info(f"Generate dataset informations:\n{json.dumps(dataset_infos, indent=2, ensure_ascii=False)}")
-            self.dataset_infos.update(dataset_infos)
-            self.update_dataset_info()
-            inps = self.datasets_buffer.copy()
-            self.datasets_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_dataset(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"HFInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
-            
+            self._submit_classification('datasets')
+        yield from self._classified()
+
     def flush(self, update_infos: bool = True) -> Optional[PipelineResult]:
-        if len(self.models_buffer) > 0:
-            urls = [inp['link'] for inp in self.models_buffer]
-            model_infos = gen_model_info_huggingface(urls)
-            model_infos = self._gen_new_info(model_infos)
-            logger.info(f"Generate model informations:\n{json.dumps(model_infos, indent=2, ensure_ascii=False)}")
-            self.model_infos.update(model_infos)
+        yield from self._classified(drain=True)
+
+        if update_infos:
             self.update_model_info()
-            inps = self.models_buffer.copy()
-            self.models_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_model(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"HFInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
-        
-        if len(self.datasets_buffer) > 0:
-            urls = [inp['link'] for inp in self.datasets_buffer]
-            dataset_infos = gen_dataset_info_huggingface(urls)
-            dataset_infos = self._gen_new_info(dataset_infos)
-            logger.info(f"Generate dataset informations:\n{json.dumps(dataset_infos, indent=2, ensure_ascii=False)}")
-            self.dataset_infos.update(dataset_infos)
             self.update_dataset_info()
-            inps = self.datasets_buffer.copy()
-            self.datasets_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_dataset(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"HFInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
 
 
-class MSInfoProcessor(PipelineStep):
+class MSInfoProcessor(_BatchClassifier, PipelineStep):
     
     ptype = "🚗 PROCESSOR"
     required_keys = ["repo_org_mapper"]
+    check_source = "ModelScope"
     
     def __init__(
         self,
@@ -348,12 +403,25 @@ class MSInfoProcessor(PipelineStep):
         ai_check: bool = False,
         buffer_size: int = 8,
         max_retries: int = 3,
+        llm_concurrency: int = 4,
+        llm_rate: float | None = None,
+        heuristics: bool = True,
+        heuristics_threshold: float = 0.85,
+        screenshot_max_side: int | None = 1024,
+        screenshot_crop: list[float] | None = None,
     ):
         self.ai_gen = ai_gen
         self.ai_check = ai_check
         self.buffer_size = buffer_size
         self.max_retries = max_retries
+        self.classifier = ClassificationService(llm_concurrency, llm_rate)
+        self.classify_fns = {'models': gen_model_info_modelscope, 'datasets': gen_dataset_info_modelscope}
         
+        self.checker = ClassificationService(llm_concurrency, llm_rate) if ai_check else None
+        self.checks_buffer = []
+        self.screenshots_checked = set()
+        self.screenshot_max_side = screenshot_max_side
+        self.screenshot_crop = tuple(screenshot_crop) if screenshot_crop else None
         if ai_check:
             self.models_check_buffer = []
             self.datasets_check_buffer = []
@@ -371,56 +439,20 @@ class MSInfoProcessor(PipelineStep):
             model_info_path = Path(model_info_path)
         else:
             model_info_path = curr_path.parents[3] / 'config/model-info.json'
-        self.history_data_path = {}
-        for p in history_data_path.glob("????-??-??"):
-            self.history_data_path[p.name] = p
+        self.history = HistoryIndex.open(history_data_path)
         self.model_info_path = model_info_path
         self.dataset_info_path = dataset_info_path
         self.model_infos = self._init_info(model_info_path)
         self.dataset_infos = self._init_info(dataset_info_path)
+        self._init_heuristics(heuristics, heuristics_threshold)
         self.models_buffer = []
         self.models_buffer_counter = defaultdict(int)
         self.datasets_buffer = []
         self.datasets_buffer_counter = defaultdict(int)
-        self.last_month_downloads_of = {}
+        self.last_month_snapshot = {}
         
-    def _init_info(self, path):
-        with open(path, 'r', encoding='utf-8') as f:
-            info = json.load(f)
-        return info
-    
-    def _get_last_month_downloads_of(self, date_crawl: str) -> dict[str, int]:
-        date_crawl = datetime.strptime(date_crawl, r"%Y-%m-%d")
-        last_month_date = date_crawl - timedelta(days=30)
-        
-        min_diff = None
-        closest_date = None
-        
-        for date in self.history_data_path.keys():
-            cur_date = datetime.strptime(date, r"%Y-%m-%d")
-            diff = abs((cur_date - last_month_date).days)
-            if min_diff is None or diff < min_diff:
-                min_diff = diff
-                closest_date = date
-        
-        last_month_downloads = {}
-        if min_diff > 15:
-            return last_month_downloads
-        
-        p = self.history_data_path[closest_date] / 'ModelScope/raw-models-info.jsonl'
-        if p.exists():
-            with jsonlines.open(p, 'r') as f:
-                for item in f:
-                    key = f"{item['repo']}/{item['model_name']}"
-                    last_month_downloads[key] = item['total_downloads']
-        p = self.history_data_path[closest_date] / 'ModelScope/raw-datasets-info.jsonl'
-        if p.exists():
-            with jsonlines.open(p, 'r') as f:
-                for item in f:
-                    key = f"{item['repo']}/{item['dataset_name']}"
-                    last_month_downloads[key] = item['total_downloads']
-
-        return last_month_downloads
+    def _init_info(self, path) -> InfoStore:
+        return InfoStore.from_json(path)
     
     def parse_input(self, input_data: PipelineData | None = None):
         self.required_keys = [
@@ -442,10 +474,27 @@ class MSInfoProcessor(PipelineStep):
                 raise KeyError(f"key '{k}' not found in input_data.data "
                                f"{list(input_data.data.keys())} of {self.__class__}")
             self.input[k] = self.data.pop(k)
+        for k in ['carried_from', 'carried_downloads_last_month', 'downloads_since']:
+            self.input[k] = self.data.get(k)
         
         date_crawl = self.input['date_crawl']
-        if date_crawl not in self.last_month_downloads_of:
-            self.last_month_downloads_of[date_crawl] = self._get_last_month_downloads_of(date_crawl)
+        if date_crawl not in self.last_month_snapshot:
+            self.last_month_snapshot[date_crawl] = self.history.last_month(date_crawl, 'ModelScope')
+
+    @staticmethod
+    def _monthly_downloads(inp: dict, last_month_downloads: int) -> int | None:
+        # A carried record still has the total of its last crawl, it keeps the
+        # monthly downloads it was carried with. The first crawl after a carry
+        # spreads the downloads since the last crawl over the months between.
+        if inp.get('carried_from'):
+            return inp.get('carried_downloads_last_month')
+        downloads = inp['total_downloads'] - last_month_downloads
+        if inp.get('downloads_since'):
+            days = (datetime.strptime(inp['date_crawl'], r"%Y-%m-%d")
+                    - datetime.strptime(inp['downloads_since'], r"%Y-%m-%d")).days
+            if days > 45:
+                downloads = round(downloads * 30 / days)
+        return downloads
             
     def _process_model(self, inp: dict) -> Optional[PipelineData]:
         try:
@@ -456,11 +505,14 @@ class MSInfoProcessor(PipelineStep):
                 return None
             model_key = f'{repo}/{model_name}'
             date_crawl = inp['date_crawl']
-            last_month_downloads = self.last_month_downloads_of[date_crawl].get(model_key, None)
+            last_month_downloads = self.history.downloads(
+                'ModelScope', 'models', model_key, self.last_month_snapshot[date_crawl])
             if last_month_downloads is None:
                 is_large_model = False
             else:
                 model_info = self.model_infos.get(model_key, None)
+                if not model_info:
+                    model_info = self._guess_model_info(model_key, inp)
                 if model_info:
                     modality = model_info['modality']
                     is_large_model = model_info['is_large_model']
@@ -473,16 +525,11 @@ class MSInfoProcessor(PipelineStep):
             if is_large_model:
                 downloads = inp['total_downloads']
                 img_path = inp['img_path']
-                if downloads == 0 and self.ai_check and img_path and Path(img_path).exists():
-                    request = CheckRequest(img_path, inp['link'], 'ModelScope')
-                    response = check_image_info([request])[0]
-                    if response.downloads is not None and response.downloads > 0:
-                        downloads = response.downloads
-                        logger.warning(f"Data error: {inp}, downloads corrected from {inp['total_downloads']} to {downloads}.")
-                        inp['total_downloads'] = response.downloads
-                        self.models_check_buffer.append(inp)
-                downloads_last_month = downloads - last_month_downloads
-                if downloads_last_month < 50:
+                if downloads == 0 and self._needs_check(inp):
+                    self._park_for_check('models', inp)
+                    return None
+                downloads_last_month = self._monthly_downloads(inp, last_month_downloads)
+                if downloads_last_month is None or downloads_last_month < 50:
                     return None
                 return PipelineData({
                     "org": org,
@@ -516,7 +563,8 @@ class MSInfoProcessor(PipelineStep):
                 return None
             dataset_key = f"{repo}/{dataset_name}"
             date_crawl = inp['date_crawl']
-            last_month_downloads = self.last_month_downloads_of[date_crawl].get(dataset_key, None)
+            last_month_downloads = self.history.downloads(
+                'ModelScope', 'datasets', dataset_key, self.last_month_snapshot[date_crawl])
             
             dataset_info = self.dataset_infos.get(dataset_key, None)
             if dataset_info:
@@ -532,16 +580,11 @@ class MSInfoProcessor(PipelineStep):
             if is_valid:
                 downloads = inp['total_downloads']
                 img_path = inp['img_path']
-                if downloads == 0 and self.ai_check and img_path and Path(img_path).exists():
-                    request = CheckRequest(img_path, inp['link'], 'ModelScope')
-                    response = check_image_info([request])[0]
-                    if response.downloads is not None and response.downloads > 0:
-                        downloads = response.downloads
-                        logger.warning(f"Data error: {inp}, downloads corrected from {inp['total_downloads']} to {downloads}.")
-                        inp['total_downloads'] = response.downloads
-                        self.datasets_check_buffer.append(inp)
+                if downloads == 0 and self._needs_check(inp):
+                    self._park_for_check('datasets', inp)
+                    return None
                 if last_month_downloads:
-                    downloads_last_month = downloads - last_month_downloads
+                    downloads_last_month = self._monthly_downloads(inp, last_month_downloads) or 0
                 else:
                     downloads_last_month = 0
                 return PipelineData({
@@ -590,12 +633,10 @@ class MSInfoProcessor(PipelineStep):
         return res
     
     def update_model_info(self):
-        with open(self.model_info_path, 'w') as f:
-            json.dump(self.model_infos, f, indent=4, ensure_ascii=False)
+        self.model_infos.export_json(self.model_info_path)
     
     def update_dataset_info(self):
-        with open(self.dataset_info_path, 'w') as f:
-            json.dump(self.dataset_infos, f, indent=4, ensure_ascii=False)
+        self.dataset_infos.export_json(self.dataset_info_path)
     
     def run(self) -> PipelineResult:
         try:
@@ -618,100 +659,21 @@ class MSInfoProcessor(PipelineStep):
             })
             
         if len(self.models_buffer) >= self.buffer_size:
-            urls = [inp['link'] for inp in self.models_buffer]
-            model_infos = gen_model_info_modelscope(urls)
-            model_infos = self._gen_new_info(model_infos)
-            logger.info(f"Generate model informations:\n{json.dumps(model_infos, indent=2, ensure_ascii=False)}")
-            self.model_infos.update(model_infos)
-            self.update_model_info()
-            inps = self.models_buffer.copy()
-            self.models_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_model(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"MSInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
-        
+            self._submit_classification('models')
+
         if len(self.datasets_buffer) >= self.buffer_size:
-            urls = [inp['link'] for inp in self.datasets_buffer]
-            dataset_infos = gen_dataset_info_modelscope(urls)
-            dataset_infos = self._gen_new_info(dataset_infos)
-            logger.info(f"Generate dataset informations:\n{json.dumps(dataset_infos, indent=2, ensure_ascii=False)}")
-            self.dataset_infos.update(dataset_infos)
-            self.update_dataset_info()
-            inps = self.datasets_buffer.copy()
-            self.datasets_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_dataset(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"MSInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
-            
+            self._submit_classification('datasets')
+        yield from self._classified()
+
     def flush(self, update_infos: bool = True) -> Optional[PipelineResult]:
-        if len(self.models_buffer) > 0:
-            urls = [inp['link'] for inp in self.models_buffer]
-            model_infos = gen_model_info_modelscope(urls)
-            model_infos = self._gen_new_info(model_infos)
-            logger.info(f"Generate model informations:\n{json.dumps(model_infos, indent=2, ensure_ascii=False)}")
-            self.model_infos.update(model_infos)
+        yield from self._classified(drain=True)
+
+        if update_infos:
             self.update_model_info()
-            inps = self.models_buffer.copy()
-            self.models_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_model(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"MSInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
-        
-        if len(self.datasets_buffer) > 0:
-            urls = [inp['link'] for inp in self.datasets_buffer]
-            dataset_infos = gen_dataset_info_modelscope(urls)
-            dataset_infos = self._gen_new_info(dataset_infos)
-            logger.info(f"Generate dataset informations:\n{json.dumps(dataset_infos, indent=2, ensure_ascii=False)}")
-            self.dataset_infos.update(dataset_infos)
             self.update_dataset_info()
-            inps = self.datasets_buffer.copy()
-            self.datasets_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_dataset(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"MSInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
 
     
-class OpenDataLabInfoProcessor(PipelineStep):
+class OpenDataLabInfoProcessor(_BatchClassifier, PipelineStep):
     
     ptype = "🚗 PROCESSOR"
     required_keys = [
@@ -726,10 +688,14 @@ class OpenDataLabInfoProcessor(PipelineStep):
         ai_gen: bool = True,
         buffer_size: int = 8,
         max_retries: int = 3,
+        llm_concurrency: int = 4,
+        llm_rate: float | None = None,
     ):
         self.ai_gen = ai_gen
         self.buffer_size = buffer_size
         self.max_retries = max_retries
+        self.classifier = ClassificationService(llm_concurrency, llm_rate)
+        self.classify_fns = {'datasets': gen_dataset_info_huggingface}
 
         curr_path = Path(__file__)
         if history_data_path:
@@ -740,46 +706,15 @@ class OpenDataLabInfoProcessor(PipelineStep):
             dataset_info_path = Path(dataset_info_path)
         else:
             dataset_info_path = curr_path.parents[3] / 'config/dataset-info.json'
-        self.history_data_path = {}
-        for p in history_data_path.glob("????-??-??"):
-            self.history_data_path[p.name] = p
+        self.history = HistoryIndex.open(history_data_path)
         self.dataset_info_path = dataset_info_path
         self.dataset_infos = self._init_info(dataset_info_path)
         self.datasets_buffer = []
         self.datasets_buffer_counter = defaultdict(int)
-        self.last_month_downloads_of = {}
+        self.last_month_snapshot = {}
         
-    def _init_info(self, path):
-        with open(path, 'r', encoding='utf-8') as f:
-            info = json.load(f)
-        return info
-    
-    def _get_last_month_downloads_of(self, date_crawl: str) -> dict[str, int]:
-        date_crawl = datetime.strptime(date_crawl, r"%Y-%m-%d")
-        last_month_date = date_crawl - timedelta(days=30)
-        
-        min_diff = None
-        closest_date = None
-        
-        for date in self.history_data_path.keys():
-            cur_date = datetime.strptime(date, r"%Y-%m-%d")
-            diff = abs((cur_date - last_month_date).days)
-            if min_diff is None or diff < min_diff:
-                min_diff = diff
-                closest_date = date
-        
-        last_month_downloads = {}
-        if min_diff > 15:
-            return last_month_downloads
-        
-        p = self.history_data_path[closest_date] / 'OpenDataLab/raw-datasets-info.jsonl'
-        if p.exists():
-            with jsonlines.open(p, 'r') as f:
-                for item in f:
-                    key = f"{item['repo']}/{item['dataset_name']}"
-                    last_month_downloads[key] = item['total_downloads']
-        
-        return last_month_downloads
+    def _init_info(self, path) -> InfoStore:
+        return InfoStore.from_json(path)
     
     def parse_input(self, input_data: PipelineData | None = None):
         self.data = input_data.data.copy()
@@ -791,8 +726,8 @@ class OpenDataLabInfoProcessor(PipelineStep):
             self.input[k] = self.data.pop(k)
         
         date_crawl = self.input['date_crawl']
-        if date_crawl not in self.last_month_downloads_of:
-            self.last_month_downloads_of[date_crawl] = self._get_last_month_downloads_of(date_crawl)
+        if date_crawl not in self.last_month_snapshot:
+            self.last_month_snapshot[date_crawl] = self.history.last_month(date_crawl, 'OpenDataLab')
             
     def _process_dataset(self, inp: dict) -> Optional[PipelineData]:
         try:
@@ -801,7 +736,8 @@ class OpenDataLabInfoProcessor(PipelineStep):
             org = inp['org']
             dataset_key = f"{repo}/{dataset_name}"
             date_crawl = inp['date_crawl']
-            last_month_downloads = self.last_month_downloads_of[date_crawl].get(dataset_key, None)
+            last_month_downloads = self.history.downloads(
+                'OpenDataLab', 'datasets', dataset_key, self.last_month_snapshot[date_crawl])
             if last_month_downloads is None:
                 is_valid = False
             else:
@@ -859,8 +795,7 @@ class OpenDataLabInfoProcessor(PipelineStep):
         return res
     
     def update_dataset_info(self):
-        with open(self.dataset_info_path, 'w') as f:
-            json.dump(self.dataset_infos, f, indent=4, ensure_ascii=False)
+        self.dataset_infos.export_json(self.dataset_info_path)
     
     def run(self) -> PipelineResult:
         try:
@@ -878,54 +813,17 @@ class OpenDataLabInfoProcessor(PipelineStep):
             })
             
         if len(self.datasets_buffer) >= self.buffer_size:
-            urls = [inp['link'] for inp in self.datasets_buffer]
-            dataset_infos = gen_dataset_info_huggingface(urls)
-            dataset_infos = self._gen_new_info(dataset_infos)
-            logger.info(f"Generate dataset informations:\n{json.dumps(dataset_infos, indent=2, ensure_ascii=False)}")
-            self.dataset_infos.update(dataset_infos)
-            self.update_dataset_info()
-            inps = self.datasets_buffer.copy()
-            self.datasets_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_dataset(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"OpenDataLabInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
-            
+            self._submit_classification('datasets')
+        yield from self._classified()
+
     def flush(self, update_infos: bool = True) -> Optional[PipelineResult]:
-        if len(self.datasets_buffer) > 0:
-            urls = [inp['link'] for inp in self.datasets_buffer]
-            dataset_infos = gen_dataset_info_huggingface(urls)
-            dataset_infos = self._gen_new_info(dataset_infos)
-            logger.info(f"Generate dataset informations:\n{json.dumps(dataset_infos, indent=2, ensure_ascii=False)}")
-            self.dataset_infos.update(dataset_infos)
+        yield from self._classified(drain=True)
+
+        if update_infos:
             self.update_dataset_info()
-            inps = self.datasets_buffer.copy()
-            self.datasets_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_dataset(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"OpenDataLabInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
 
 
-class BAAIDataInfoProcessor(PipelineStep):
+class BAAIDataInfoProcessor(_BatchClassifier, PipelineStep):
     
     ptype = "🚗 PROCESSOR"
     required_keys = [
@@ -940,10 +838,14 @@ class BAAIDataInfoProcessor(PipelineStep):
         ai_gen: bool = True,
         buffer_size: int = 8,
         max_retries: int = 3,
+        llm_concurrency: int = 4,
+        llm_rate: float | None = None,
     ):
         self.ai_gen = ai_gen
         self.buffer_size = buffer_size
         self.max_retries = max_retries
+        self.classifier = ClassificationService(llm_concurrency, llm_rate)
+        self.classify_fns = {'datasets': gen_dataset_info_huggingface}
 
         curr_path = Path(__file__)
         if history_data_path:
@@ -954,46 +856,15 @@ class BAAIDataInfoProcessor(PipelineStep):
             dataset_info_path = Path(dataset_info_path)
         else:
             dataset_info_path = curr_path.parents[3] / 'config/dataset-info.json'
-        self.history_data_path = {}
-        for p in history_data_path.glob("????-??-??"):
-            self.history_data_path[p.name] = p
+        self.history = HistoryIndex.open(history_data_path)
         self.dataset_info_path = dataset_info_path
         self.dataset_infos = self._init_info(dataset_info_path)
         self.datasets_buffer = []
         self.datasets_buffer_counter = defaultdict(int)
-        self.last_month_downloads_of = {}
+        self.last_month_snapshot = {}
         
-    def _init_info(self, path):
-        with open(path, 'r', encoding='utf-8') as f:
-            info = json.load(f)
-        return info
-    
-    def _get_last_month_downloads_of(self, date_crawl: str) -> dict[str, int]:
-        date_crawl = datetime.strptime(date_crawl, r"%Y-%m-%d")
-        last_month_date = date_crawl - timedelta(days=30)
-        
-        min_diff = None
-        closest_date = None
-        
-        for date in self.history_data_path.keys():
-            cur_date = datetime.strptime(date, r"%Y-%m-%d")
-            diff = abs((cur_date - last_month_date).days)
-            if min_diff is None or diff < min_diff:
-                min_diff = diff
-                closest_date = date
-        
-        last_month_downloads = {}
-        if min_diff > 15:
-            return last_month_downloads
-        
-        p = self.history_data_path[closest_date] / 'BAAIData/raw-datasets-info.jsonl'
-        if p.exists():
-            with jsonlines.open(p, 'r') as f:
-                for item in f:
-                    key = f"{item['repo']}/{item['dataset_name']}"
-                    last_month_downloads[key] = item['total_downloads']
-        
-        return last_month_downloads
+    def _init_info(self, path) -> InfoStore:
+        return InfoStore.from_json(path)
     
     def parse_input(self, input_data: PipelineData | None = None):
         self.data = input_data.data.copy()
@@ -1005,8 +876,8 @@ class BAAIDataInfoProcessor(PipelineStep):
             self.input[k] = self.data.pop(k)
         
         date_crawl = self.input['date_crawl']
-        if date_crawl not in self.last_month_downloads_of:
-            self.last_month_downloads_of[date_crawl] = self._get_last_month_downloads_of(date_crawl)
+        if date_crawl not in self.last_month_snapshot:
+            self.last_month_snapshot[date_crawl] = self.history.last_month(date_crawl, 'BAAIData')
             
     def _process_dataset(self, inp: dict) -> Optional[PipelineData]:
         try:
@@ -1015,7 +886,8 @@ class BAAIDataInfoProcessor(PipelineStep):
             org = inp['org']
             dataset_key = f"{repo}/{dataset_name}"
             date_crawl = inp['date_crawl']
-            last_month_downloads = self.last_month_downloads_of[date_crawl].get(dataset_key, None)
+            last_month_downloads = self.history.downloads(
+                'BAAIData', 'datasets', dataset_key, self.last_month_snapshot[date_crawl])
             if last_month_downloads is None:
                 is_valid = False
             else:
@@ -1088,53 +960,14 @@ class BAAIDataInfoProcessor(PipelineStep):
             })
             
         if len(self.datasets_buffer) >= self.buffer_size:
-            urls = [inp['link'] for inp in self.datasets_buffer]
-            dataset_infos = gen_dataset_info_huggingface(urls)
-            dataset_infos = self._gen_new_info(dataset_infos)
-            logger.info(f"Generate dataset informations:\n{json.dumps(dataset_infos, indent=2, ensure_ascii=False)}")
-            self.dataset_infos.update(dataset_infos)
-            inps = self.datasets_buffer.copy()
-            self.datasets_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_dataset(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"BAAIDataInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
-            
+            self._submit_classification('datasets')
+        yield from self._classified()
+
     def flush(self, update_infos: bool = True) -> Optional[PipelineResult]:
-        if len(self.datasets_buffer) > 0:
-            urls = [inp['link'] for inp in self.datasets_buffer]
-            dataset_infos = gen_dataset_info_huggingface(urls)
-            dataset_infos = self._gen_new_info(dataset_infos)
-            logger.info(f"Generate dataset informations:\n{json.dumps(dataset_infos, indent=2, ensure_ascii=False)}")
-            self.dataset_infos.update(dataset_infos)
-            inps = self.datasets_buffer.copy()
-            self.datasets_buffer.clear()
-            for inp in inps:
-                try:
-                    data = self._process_dataset(inp)
-                    if data:
-                        data.data.update(self.data)
-                        yield data
-                except Exception as e:
-                    logger.opt(exception=e).error(f"BAAIDataInfoProcessor Error with input: {inp}")
-                    error_msg = traceback.format_exc()
-                    yield PipelineData(None, None, {
-                        "type": type(e),
-                        "error_msg": error_msg
-                    })
+        yield from self._classified(drain=True)
 
         if update_infos:
-            with open(self.dataset_info_path, 'w') as f:
-                json.dump(self.dataset_infos, f, indent=4, ensure_ascii=False)
+            self.dataset_infos.export_json(self.dataset_info_path)
     
 @deprecated("MultiSourceInfoMerge PipelineStep is deprecated. Use MultiSourceInfoMergeExecutor instead.")
 class MultiSourceInfoMerge(PipelineStep):
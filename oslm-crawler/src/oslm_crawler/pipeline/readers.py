@@ -1,10 +1,17 @@
 import json
+import itertools
 import traceback
-import jsonlines
+from typing import Iterator
 from .base import PipelineStep, PipelineResult, PipelineData
 from pathlib import Path
 from collections import defaultdict
 
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
 
 class OrgLinksReader(PipelineStep):
     
@@ -91,6 +98,14 @@ class OrgLinksReader(PipelineStep):
         
 
 class JsonlineReader(PipelineStep):
+    """
+    Reads a jsonl file lazily. `rows` yields the records one by one, `run`
+    yields them in `PipelineData` batches of `batch_size` (the whole file as
+    one batch by default). Records are cut to `required_keys` minus
+    `drop_keys`; the values of `shared` are attached to every record by
+    reference, so a side table like `repo_org_mapper` exists once however many
+    records carry it.
+    """
     
     ptype = "📖 READER"
     required_keys = []
@@ -99,17 +114,21 @@ class JsonlineReader(PipelineStep):
         self,
         path: Path,
         required_keys: list[str] | None = None,
-        drop_keys: list[str] | None = None
+        drop_keys: list[str] | None = None,
+        batch_size: int | None = None,
+        shared: dict | None = None,
     ):
         self.required_keys = required_keys
         if drop_keys:
             self.drop_keys = drop_keys
         else:
             self.drop_keys = []
-        self.path = path
+        self.path = Path(path)
         assert self.path.suffix == '.jsonl', 'The path must end with a filename that has a `.jsonl` suffix.'
         assert self.path.exists(), f'{self.path} not exists.'
         self.input = self.path
+        self.batch_size = batch_size
+        self.shared = shared or {}
         
     def parse_input(self, input_data: PipelineData | None = None):
         if input_data is None:
@@ -117,18 +136,60 @@ class JsonlineReader(PipelineStep):
             return 
         self.data = input_data.data.copy()
         
+    def rows(self) -> Iterator[dict]:
+        keys = None
+        if self.required_keys is not None:
+            keys = [k for k in self.required_keys if k not in self.drop_keys]
+        drop = set(self.drop_keys)
+        with open(self.input, 'rb') as f:
+            for i, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    item = loads(line)
+                except ValueError as e:
+                    raise ValueError(f"Invalid json at line {i} of {self.input}") from e
+                if keys is not None:
+                    try:
+                        item = {k: item[k] for k in keys}
+                    except KeyError as e:
+                        raise KeyError(f"key '{e.args[0]}' not found at line {i} of {self.input}")
+                elif drop:
+                    item = {k: v for k, v in item.items() if k not in drop}
+                if self.shared:
+                    item.update(self.shared)
+                yield item
+    
+    def __iter__(self) -> Iterator[PipelineData]:
+        for item in self.rows():
+            yield PipelineData(item, None, None)
+        
     def run(self) -> PipelineResult:
-        content = []
+        rows = self.rows()
         try:
-            with jsonlines.open(self.input, 'r') as reader:
-                for line in reader:
-                    content.append(line)
-            yield PipelineData({
-                "content": content,
-                "total_lines": len(content)
-            }, {"total_lines": len(content)}, None)
+            while True:
+                content = list(itertools.islice(rows, self.batch_size))
+                if not content and self.batch_size is not None:
+                    break
+                yield PipelineData({
+                    "content": content,
+                    "total_lines": len(content)
+                }, {"total_lines": len(content)}, None)
+                if self.batch_size is None:
+                    break
         except Exception as e:
             error_msg = traceback.format_exc()
             yield PipelineData(None, None, {
                 "type": type(e), "details": error_msg
-            })    
+            })
+
+
+class JsonlineRows:
+    """Records of several readers in turn, read again from disk on every pass."""
+
+    def __init__(self, *readers: JsonlineReader):
+        self.readers = readers
+
+    def __iter__(self) -> Iterator[PipelineData]:
+        for reader in self.readers:
+            yield from reader
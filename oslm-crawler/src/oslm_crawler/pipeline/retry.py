@@ -0,0 +1,105 @@
+import time
+import heapq
+import random
+import requests
+from dataclasses import dataclass
+from collections import defaultdict
+from typing import Hashable
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    base_delay: float = 5
+    max_delay: float = 120
+    factor: float = 2
+    jitter: float = 0.5
+    max_retries: int | None = None  # None defers to the crawler's max_retries
+
+    def delay(self, attempt: int) -> float:
+        """Delay before the `attempt`-th retry (1-based), randomly shortened by up to `jitter`."""
+        delay = min(self.max_delay, self.base_delay * self.factor ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+
+# Looked up along the MRO of the raised exception, so subclasses inherit the
+# policy of their closest listed base.
+DEFAULT_POLICIES: dict[type[BaseException], RetryPolicy] = {
+    # Slow page loads and dropped connections usually pass quickly.
+    TimeoutException: RetryPolicy(base_delay=2, max_delay=60),
+    requests.ConnectionError: RetryPolicy(base_delay=1, max_delay=60),
+    requests.Timeout: RetryPolicy(base_delay=2, max_delay=60),
+    # An overloaded server (408, 429, 5xx) needs time to cool down.
+    requests.HTTPError: RetryPolicy(base_delay=10, max_delay=300),
+    # A crashed or hung browser, the pool recreates the driver in the meantime.
+    WebDriverException: RetryPolicy(base_delay=5, max_delay=120),
+}
+DEFAULT_POLICY = RetryPolicy()
+# Other client errors (404 of a removed repo, 401 of a gated one) come back the
+# same on every attempt.
+RETRYABLE_STATUS = {408, 429}
+NO_RETRY = RetryPolicy(max_retries=0)
+
+
+class RetryScheduler:
+    """
+    Keeps failed tasks in a heap keyed by the time they become ready again, so
+    the run loops can keep collecting results while retries wait out their
+    backoff instead of sleeping.
+    """
+
+    def __init__(
+        self,
+        max_retries: int,
+        policies: dict[type[BaseException], RetryPolicy] | None = None,
+        default: RetryPolicy | None = None,
+    ):
+        self.max_retries = max_retries
+        self.policies = DEFAULT_POLICIES if policies is None else policies
+        self.default = DEFAULT_POLICY if default is None else default
+        self.attempts: dict[Hashable, int] = defaultdict(int)
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def policy_for(self, exc: BaseException | None) -> RetryPolicy:
+        if isinstance(exc, requests.HTTPError) and exc.response is not None:
+            status = exc.response.status_code
+            if 400 <= status < 500 and status not in RETRYABLE_STATUS:
+                return NO_RETRY
+        for cls in type(exc).__mro__:
+            if cls in self.policies:
+                return self.policies[cls]
+        return self.default
+
+    def backoff(self, task: Hashable, exc: BaseException | None) -> float | None:
+        """Count a failure of `task` and return its retry delay, or None when retries are exhausted."""
+        policy = self.policy_for(exc)
+        limit = self.max_retries if policy.max_retries is None else policy.max_retries
+        if self.attempts[task] >= limit:
+            return None
+        self.attempts[task] += 1
+        return policy.delay(self.attempts[task])
+
+    def schedule(self, task: Hashable, exc: BaseException | None) -> bool:
+        delay = self.backoff(task, exc)
+        if delay is None:
+            return False
+        heapq.heappush(self._heap, (time.monotonic() + delay, self._counter, task))
+        self._counter += 1
+        return True
+
+    def pop_ready(self) -> list[Hashable]:
+        now = time.monotonic()
+        ready = []
+        while self._heap and self._heap[0][0] <= now:
+            ready.append(heapq.heappop(self._heap)[2])
+        return ready
+
+    def next_delay(self) -> float | None:
+        """Seconds until the next retry is ready, None when nothing is scheduled."""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
@@ -1,11 +1,59 @@
-import jsonlines
+import os
+import json
+import math
+import time
+import sqlite3
 import traceback
+from typing import Literal
+from datetime import datetime
+from collections import defaultdict
 from .base import PipelineStep, PipelineResult, PipelineData
+from ..database.sqlite import TableInitializer, SOURCE_TABLES, upsert_sql
 from pathlib import Path
 from loguru import logger
 
+try:
+    import orjson
+except ImportError:  # The `orjson` extra; the stdlib encoder writes the same bytes.
+    orjson = None
+
+# Compact like orjson, which has no option for the spaced separators.
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+
+
+def _finite(obj):
+    # NaN and infinities become null, as orjson writes them.
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def dumps(obj) -> bytes:
+    """One compact JSON line without its newline, NaN as null, with orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    try:
+        return _encoder.encode(obj).encode('utf-8')
+    except ValueError:
+        return _encoder.encode(_finite(obj)).encode('utf-8')
+
 
 class JsonlineWriter(PipelineStep):
+    """
+    Records are buffered and written once `flush_every` records or `flush_bytes`
+    bytes are pending or `flush_interval` seconds passed since the last write,
+    whichever comes first (`None` disables a limit). Only `write` buffers, the
+    `parse_input`/`run` step writes each record through as before. `flush` and
+    `close` write the rest; a `Checkpoint` flushes its writers before it syncs,
+    and `tell` counts the pending bytes.
+    """
     
     ptype = "✍️ WRITER"
     required_keys = []
@@ -15,7 +63,12 @@ class JsonlineWriter(PipelineStep):
         path: str,
         required_keys: list[str] | None = None,
         drop_keys: list[str] | None = None,
+        mode: Literal['w', 'a'] = 'w',
+        flush_every: int | None = 256,
+        flush_bytes: int | None = 1 << 20,
+        flush_interval: float | None = 1.0,
     ):
+        assert mode in ['w', 'a'], f"Unknown mode: {mode}"
         self.required_keys = required_keys
         if drop_keys:
             self.drop_keys = drop_keys
@@ -25,38 +78,82 @@ class JsonlineWriter(PipelineStep):
         assert self.path.suffix == '.jsonl', 'The path must end with a filename that has a `.jsonl` suffix.'
         self.path.parent.mkdir(exist_ok=True)
         self.path.touch()
-        self.f = open(self.path, 'w')
-        self.writer = jsonlines.Writer(self.f)
+        # Binary, so the encoded lines go out as they are and `tell` is a byte offset.
+        self.f = open(self.path, mode + 'b')
+        self.flush_every = flush_every
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._keys = None
+        self._pending = []
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
     
     def parse_input(self, input_data: PipelineData | None = None):
-        if self.required_keys is None:
-            self.required_keys = list(input_data.data.keys())
-        self.required_keys = [x for x in self.required_keys if x not in self.drop_keys]
-        self.data = input_data.data.copy()
-        required_data = {}
-        for k in self.required_keys:
-            if k not in self.data:
-                raise KeyError(f"key '{k}' not found in input_data.data "
-                               f"{list(input_data.data.keys())} of {self.__class__}")
-            required_data[k] = self.data[k]
-        self.input = required_data
+        if self._keys is None:
+            # Without required keys, the keys of the first record are kept.
+            if self.required_keys is None:
+                self.required_keys = list(input_data.data.keys())
+            self.required_keys = [x for x in self.required_keys if x not in self.drop_keys]
+            self._keys = self.required_keys
+        self.data = input_data.data
+        try:
+            self.input = {k: self.data[k] for k in self._keys}
+        except KeyError as e:
+            raise KeyError(f"key '{e.args[0]}' not found in input_data.data "
+                           f"{list(input_data.data.keys())} of {self.__class__}")
         
     def run(self) -> PipelineResult:
+        res = self._write_input()
+        self.flush()
+        yield res
+        
+    def write(self, input_data: PipelineData) -> PipelineData:
+        """`parse_input` and `run` in one call, without the generator."""
+        self.parse_input(input_data)
+        return self._write_input()
+    
+    def _write_input(self) -> PipelineData:
         try:
-            self.writer.write(self.input)
-            self.f.flush()
-            yield PipelineData(self.data, None, None)
+            line = dumps(self.input) + b'\n'
         except Exception:
             logger.exception(f"Error write jsonline data:\n {self.input}")
-            yield PipelineData(None, None, {
+            return PipelineData(None, None, {
                 'input': self.input,
                 'error_msg': traceback.format_exc(),
             })
+        self._pending.append(line)
+        self._pending_bytes += len(line)
+        if (
+            (self.flush_every is not None and len(self._pending) >= self.flush_every)
+            or (self.flush_bytes is not None and self._pending_bytes >= self.flush_bytes)
+            or (self.flush_interval is not None and time.monotonic() - self._last_flush >= self.flush_interval)
+        ):
+            self.flush()
+        return PipelineData(self.data, None, None)
+    
+    @property
+    def buffered(self) -> bool:
+        return bool(self._pending)
+    
+    def tell(self) -> int:
+        """Size of the file once the pending records are written."""
+        return self.f.tell() + self._pending_bytes
+    
+    def flush(self, fsync: bool = False):
+        if self._pending:
+            self.f.write(b''.join(self._pending))
+            self._pending.clear()
+            self._pending_bytes = 0
+        self.f.flush()
+        if fsync:
+            os.fsync(self.f.fileno())
+        self._last_flush = time.monotonic()
         
     def close(self) -> bool:
         try:
-            self.writer.close()
-            self.f.close()
+            if not self.f.closed:
+                self.flush()
+                self.f.close()
             return True
         except Exception:
             logger.exception(f'Error when close JsonlineWriter with path={self.path}')
@@ -73,9 +170,11 @@ class ModelDatasetJsonlineWriter(PipelineStep):
         dataset_path: str,
         model_drop_keys: list[str] | None = None,
         dataset_drop_keys: list[str] | None = None,
+        mode: Literal['w', 'a'] = 'w',
+        **flush_policy,
     ):
-        self.model_writer = JsonlineWriter(model_path, drop_keys=model_drop_keys)
-        self.dataset_writer = JsonlineWriter(dataset_path, drop_keys=dataset_drop_keys)
+        self.model_writer = JsonlineWriter(model_path, drop_keys=model_drop_keys, mode=mode, **flush_policy)
+        self.dataset_writer = JsonlineWriter(dataset_path, drop_keys=dataset_drop_keys, mode=mode, **flush_policy)
     
     def parse_input(self, input_data: PipelineData | None = None):
         if 'model_name' in input_data.data or input_data.data.get('category', None) == 'models':
@@ -87,12 +186,20 @@ class ModelDatasetJsonlineWriter(PipelineStep):
         else:
             raise RuntimeError(f"'model_name' or 'dataset_name' not found in {input_data.data.keys()}")
     
+    @property
+    def last_writer(self) -> JsonlineWriter:
+        return self.model_writer if self.next_write == 'models' else self.dataset_writer
+    
     def run(self) -> PipelineResult:
-        match self.next_write:
-            case "models":
-                yield next(self.model_writer.run())
-            case "datasets":
-                yield next(self.dataset_writer.run())
+        yield next(self.last_writer.run())
+        
+    def write(self, input_data: PipelineData) -> PipelineData:
+        self.parse_input(input_data)
+        return self.last_writer._write_input()
+    
+    def flush(self, fsync: bool = False):
+        self.model_writer.flush(fsync)
+        self.dataset_writer.flush(fsync)
                 
     def close(self) -> bool:
         self.model_writer.close()
@@ -145,19 +252,98 @@ class ListWriter(PipelineStep):
         return True
     
 
-# TODO database writer    
 class DBWriter(PipelineStep):
+    """
+    Upserts processed records into the SQLite store (`database/sqlite.py`), in
+    one `executemany` per table once `batch_size` records are buffered and on
+    `flush`/`close`. The table follows the `source` of a record unless `table`
+    is given. When a batch fails, every record of it comes back as an error,
+    from `run` or from `flush`.
+    """
     
     ptype = "✍️ WRITER"
     
     def __init__(
         self,
-        conn,
+        conn: sqlite3.Connection | str | Path | None = None,
+        table: str | None = None,
+        batch_size: int = 500,
+        date_enter_db: str | None = None,
     ):
-        raise NotImplementedError
+        self.own_conn = not isinstance(conn, sqlite3.Connection)
+        self.conn = TableInitializer(conn)._init_database()
+        self.table = table
+        self.batch_size = batch_size
+        self.date_enter_db = date_enter_db or str(datetime.today().date())
+        self.buffers = defaultdict(list)
+        self.records = defaultdict(list)
+        self.statements = {}
     
     def parse_input(self, input_data: PipelineData | None = None):
-        raise NotImplementedError
-    
+        self.data = input_data.data
+        table = self.table
+        if table is None:
+            category = 'models' if 'model_name' in self.data else 'datasets'
+            table = SOURCE_TABLES.get((self.data.get('source'), category))
+            if table is None:
+                raise KeyError(f"No table for source {self.data.get('source')!r} and {category} of {self.__class__}")
+        if table not in self.statements:
+            self.statements[table] = upsert_sql(table)
+        _, params = self.statements[table]
+        record = self.data | {'date_enter_db': self.data.get('date_enter_db', self.date_enter_db)}
+        self.next_table = table
+        self.input = tuple(record.get(k) for k in params)
+        
     def run(self) -> PipelineResult:
-        yield PipelineData(None, str(NotImplementedError()), None)
+        self.buffers[self.next_table].append(self.input)
+        self.records[self.next_table].append(self.data)
+        if len(self.buffers[self.next_table]) < self.batch_size:
+            yield PipelineData(self.data, None, None)
+            return
+        errors = self._write(self.next_table)
+        if errors:
+            yield from errors
+        else:
+            yield PipelineData(self.data, None, None)
+            
+    def _write(self, table: str) -> list[PipelineData]:
+        rows = self.buffers[table]
+        records = self.records[table]
+        if not rows:
+            return []
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(self.statements[table][0], rows)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        except Exception:
+            logger.exception(f"Error write {len(rows)} records to table {table}")
+            error_msg = traceback.format_exc()
+            return [
+                PipelineData(None, None, {'input': record, 'error_msg': error_msg})
+                for record in records
+            ]
+        finally:
+            rows.clear()
+            records.clear()
+        return []
+        
+    def flush(self) -> list[PipelineData]:
+        """Write all buffered records. Returns an error per record of the batches that failed."""
+        errors = []
+        for table in list(self.buffers):
+            errors.extend(self._write(table))
+        return errors
+    
+    def close(self) -> bool:
+        try:
+            errors = self.flush()
+            if self.own_conn:
+                self.conn.close()
+            return not errors
+        except Exception:
+            logger.exception('Error when close DBWriter')
+            return False
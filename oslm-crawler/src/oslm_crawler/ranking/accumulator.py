@@ -0,0 +1,164 @@
+import sqlite3
+import threading
+import pandas as pd
+from pathlib import Path
+from loguru import logger
+from ..database.columnar import read_frame
+
+# name key, columns kept from the earliest month, columns kept at their maximum
+CATEGORIES: dict[str, tuple[str, list[str], list[str]]] = {
+    'models': (
+        'model_name',
+        ['org', 'repo', 'model_name', 'modality'],
+        ['likes', 'community', 'descendants'],
+    ),
+    'datasets': (
+        'dataset_name',
+        ['org', 'repo', 'dataset_name', 'modality', 'lifecycle'],
+        ['likes', 'community', 'dataset_usage'],
+    ),
+}
+
+
+def fold(frames: list[pd.DataFrame], name_key: str, first: list[str], peak: list[str]) -> pd.DataFrame:
+    """
+    One row per repo/name over `frames`, oldest first: the `first` columns of
+    its earliest row, the summed `accumulated_downloads` and the `peak` columns
+    at their maximum. Folding the result again with newer frames gives the same
+    rows as folding all frames at once.
+    """
+    df = pd.concat(frames, ignore_index=True)
+    key = df['repo'].astype(str) + '/' + df[name_key].astype(str)
+    groups = df.groupby(key, sort=False)
+    res = df.loc[~key.duplicated(), first].set_index(key[~key.duplicated()])
+    res['accumulated_downloads'] = groups['accumulated_downloads'].sum()
+    for col in peak:
+        res[col] = groups[col].max()
+    return res.reset_index(drop=True)
+
+
+def to_records(df: pd.DataFrame) -> list[dict]:
+    names = list(df.columns)
+    columns = [df[col].to_numpy(dtype=object, na_value=None).tolist() for col in names]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+class Accumulator:
+    """
+    Running totals of the merged snapshots (`data/<date>/merged-*-info.jsonl`)
+    in one SQLite file, together with the dates folded into them and the size
+    and mtime of their files. `accumulate` folds only the snapshots after the
+    last folded one into the stored totals; when a folded snapshot changed it
+    starts over, and a cutoff before the last folded date is computed from the
+    snapshots without touching the stored totals.
+    """
+
+    def __init__(self, data_dir: str | Path, path: str | Path | None = None):
+        self.data_dir = Path(data_dir)
+        self.path = Path(path) if path is not None else self.data_dir / 'accumulator.db'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Totals keep the values as they were read, so the columns have no type.
+        tables = '\n'.join(
+            f"CREATE TABLE IF NOT EXISTS {category} (seq INTEGER PRIMARY KEY, "
+            f"{', '.join(self._columns(category))});"
+            for category in CATEGORIES
+        )
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS folded (
+                date TEXT PRIMARY KEY,
+                models TEXT NOT NULL,
+                datasets TEXT NOT NULL
+            );
+            {tables}
+        """)
+
+    @staticmethod
+    def _columns(category: str) -> list[str]:
+        _, first, peak = CATEGORIES[category]
+        return first + ['accumulated_downloads'] + peak
+
+    def _signature(self, date: str) -> tuple[str, str]:
+        signature = []
+        for category in CATEGORIES:
+            stat = (self.data_dir / date / f'merged-{category}-info.jsonl').stat()
+            signature.append(f'{stat.st_mtime_ns}:{stat.st_size}')
+        return tuple(signature)
+
+    def folded(self) -> list[str]:
+        with self._lock:
+            return [date for date, in self._conn.execute("SELECT date FROM folded ORDER BY date")]
+
+    def _month(self, date: str, category: str) -> pd.DataFrame:
+        name_key, first, peak = CATEGORIES[category]
+        columns = list(dict.fromkeys(first + ['downloads_last_month'] + peak))
+        df = read_frame(self.data_dir / date / f'merged-{category}-info.jsonl', columns)
+        return df.rename(columns={'downloads_last_month': 'accumulated_downloads'})
+
+    def _load(self, category: str) -> pd.DataFrame:
+        columns = self._columns(category)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(columns)} FROM {category} ORDER BY seq").fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def _save(self, totals: dict[str, pd.DataFrame], folded: list[tuple[str, tuple[str, str]]]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM folded")
+                self._conn.executemany(
+                    "INSERT INTO folded (date, models, datasets) VALUES (?, ?, ?)",
+                    [(date, *signature) for date, signature in folded],
+                )
+                for category, df in totals.items():
+                    columns = self._columns(category)
+                    self._conn.execute(f"DELETE FROM {category}")
+                    self._conn.executemany(
+                        f"INSERT INTO {category} (seq, {', '.join(columns)}) "
+                        f"VALUES (?, {', '.join('?' * len(columns))})",
+                        ((i, *row.values()) for i, row in enumerate(to_records(df[columns]))),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def accumulate(self, dates: list[str]) -> dict[str, pd.DataFrame]:
+        """The totals of the snapshots of `dates` per category, keyed by repo/name in order of first appearance."""
+        dates = sorted(dates)
+        signatures = [(date, self._signature(date)) for date in dates]
+        with self._lock:
+            stored = [(date, (m, d)) for date, m, d in self._conn.execute(
+                "SELECT date, models, datasets FROM folded ORDER BY date"
+            )]
+        common = 0
+        while common < min(len(stored), len(signatures)) and stored[common] == signatures[common]:
+            common += 1
+        if not dates:
+            return {category: pd.DataFrame(columns=self._columns(category)) for category in CATEGORIES}
+        if common == len(signatures) and common < len(stored):
+            logger.info(f"Accumulating up to {dates[-1]} from the snapshots, before the stored totals.")
+            return {
+                category: fold([self._month(date, category) for date in dates], *spec)
+                for category, spec in CATEGORIES.items()
+            }
+        if common < len(stored):
+            logger.info(f"Snapshot {stored[common][0]} changed since it was folded, accumulating from the start.")
+            common = 0
+        new = dates[common:]
+        totals = {}
+        for category, spec in CATEGORIES.items():
+            frames = [self._load(category)] if common else []
+            if new:
+                frames = [fold(frames + [self._month(date, category) for date in new], *spec)]
+            totals[category] = frames[0]
+        if new:
+            logger.info(f"Folded {len(new)} snapshots into {self.path}: {', '.join(new)}")
+            self._save(totals, signatures)
+        return totals
+
+    def close(self):
+        self._conn.close()
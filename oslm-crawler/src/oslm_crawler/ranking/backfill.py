@@ -0,0 +1,73 @@
+import os
+import multiprocessing
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from loguru import logger
+
+
+def _rank_snapshot(pipeline_cls: type, data_dir: Path, log_path: Path, steps: dict[str, dict]) -> dict[str, pd.DataFrame] | None:
+    proc = pipeline_cls(data_dir, log_path)
+    for stage, kargs in steps.items():
+        if stage != 'ranking':
+            proc = proc.step(stage, **kargs)
+    if 'ranking' not in steps:
+        return None
+    return proc._rank_tables(**steps['ranking'])
+
+
+class RankBackfill:
+    """
+    Ranks every snapshot under `data_dir` in one run of `pipeline_cls`
+    (`MergeAndRankingPipeline` or `AccumulateAndRankingPipeline`). The steps
+    and the rankings of the snapshots do not depend on each other and run in
+    `max_workers` processes; only the changes to last month do, and they are
+    taken from the rankings of the same run instead of re-reading its CSVs, so
+    the snapshots need not be ranked in date order.
+    """
+
+    def __init__(
+        self,
+        pipeline_cls: type,
+        data_dir: str | Path,
+        log_dir: str | Path,
+        max_workers: int | None = None,
+    ):
+        self.pipeline_cls = pipeline_cls
+        self.data_dir = Path(data_dir)
+        self.log_dir = Path(log_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def dates(self) -> list[str]:
+        # The first snapshot has no downloads of a month before it.
+        return [path.name for path in sorted(self.data_dir.glob("????-??-??"))[1:] if path.is_dir()]
+
+    def run(self, steps: dict[str, dict]) -> dict[str, dict[str, pd.DataFrame] | None]:
+        """Run `steps`, stage name to its kargs, for every snapshot. Returns the ranking tables per date."""
+        dates = self.dates()
+        workers = min(self.max_workers, len(dates))
+        logger.info(f"Ranking {len(dates)} snapshots with {workers} workers.")
+        jobs = {
+            date: (self.pipeline_cls, self.data_dir / date, self.log_dir / f'{date}.log', steps)
+            for date in dates
+        }
+        if workers <= 1:
+            tables = {date: _rank_snapshot(*job) for date, job in jobs.items()}
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+                futures = {date: pool.submit(_rank_snapshot, *job) for date, job in jobs.items()}
+                tables = {date: future.result() for date, future in futures.items()}
+        if 'ranking' not in steps:
+            return tables
+        for date in dates:
+            last_path = self.pipeline_cls._get_last_month_path(date, self.data_dir, dates)
+            if last_path is None:
+                last = None
+            elif last_path.name in tables:
+                last = tables[last_path.name]
+            else:
+                last = self.pipeline_cls._load_last_month(last_path)
+            self.pipeline_cls._save_ranking(self.data_dir / date, tables[date], last)
+        logger.success(f"Ranked {len(dates)} snapshots.")
+        return tables
@@ -0,0 +1,112 @@
+import pandas as pd
+
+LIFECYCLES = {
+    'pretraining': 'Pre-training',
+    'finetuning': 'Fine-tuning',
+    'preference': 'Preference'
+}
+# TODO data process tool operators
+OPERATORS = {
+    "BAAI": 24,
+    "Ali": 105,
+}
+# TODO chips model
+ADAPTED_CHIPS = {
+    "BAAI": 4,
+    "Baidu": 2,
+    "Huawei": 2,
+    "Meta": 2,
+    "Google": 2,
+    "ByteDance": 2
+}
+
+
+def _cube(df: pd.DataFrame, dim: str, downloads_key: str | None) -> pd.DataFrame:
+    """Count (and downloads) of every (org, `dim`) value, one column per measure and value."""
+    if dim not in df.columns or df.empty:
+        return pd.DataFrame()
+    agg = {'num': ('org', 'size')}
+    if downloads_key is not None:
+        agg['downloads'] = (downloads_key, 'sum')
+    return df.groupby(['org', dim], observed=True).agg(**agg).unstack(dim, fill_value=0)
+
+
+class SummaryCube:
+    """
+    Per org counts and downloads of `df` by modality and by lifecycle, each
+    from one groupby, plus the per org sums of the other columns. Summary
+    columns are then looked up instead of filtering `df` once per weight key.
+    Records of `extra` (other-source datasets) only add to the counts.
+    """
+
+    def __init__(self, df: pd.DataFrame, downloads_key: str, extra: pd.DataFrame | None = None):
+        self.orgs = df['org'].unique()
+        self.cubes = {dim: _cube(df, dim, downloads_key) for dim in ['modality', 'lifecycle']}
+        self.extra = {dim: _cube(extra, dim, None) for dim in ['modality', 'lifecycle']} if extra is not None else {}
+        columns = [c for c in ['dataset_usage', 'descendants', 'likes', 'community'] if c in df.columns]
+        self.totals = df.groupby('org', observed=True)[columns].sum()
+
+    def _lookup(self, cube: pd.DataFrame, measure: str, value: str, target_orgs) -> pd.Series:
+        if (measure, value) in cube.columns:
+            return cube[(measure, value)].reindex(target_orgs, fill_value=0)
+        return pd.Series(0, index=target_orgs)
+
+    def count(self, dim: str, value: str, target_orgs) -> pd.Series:
+        res = self._lookup(self.cubes[dim], 'num', value, target_orgs)
+        if dim in self.extra:
+            res = res + self._lookup(self.extra[dim], 'num', value, target_orgs)
+        return res
+
+    def downloads(self, dim: str, value: str, target_orgs) -> pd.Series:
+        return self._lookup(self.cubes[dim], 'downloads', value, target_orgs)
+
+    def total(self, column: str, target_orgs) -> pd.Series:
+        return self.totals[column].reindex(target_orgs, fill_value=0)
+
+
+def _split(key: str) -> tuple[str, str]:
+    """`num_finetuning` -> ('lifecycle', 'Fine-tuning'), `downloads_3d` -> ('modality', '3D')."""
+    name = key.split("_")[-1]
+    if name in LIFECYCLES:
+        return 'lifecycle', LIFECYCLES[name]
+    return 'modality', name.title()
+
+
+def data_summary(cube: SummaryCube, weights: dict, target_orgs: list) -> pd.DataFrame:
+    if target_orgs[0] == 'all':
+        target_orgs = cube.orgs
+    res = pd.DataFrame(index=target_orgs)
+    for key in weights.keys():
+        if key.startswith('num'):
+            res[key] = cube.count(*_split(key), target_orgs)
+        elif key.startswith("downloads"):
+            res[key] = cube.downloads(*_split(key), target_orgs)
+        elif key == 'dataset_usage':
+            res[key] = cube.total('dataset_usage', target_orgs)
+        elif key == 'operators':
+            res[key] = pd.Series(OPERATORS).reindex(target_orgs, fill_value=0)
+        else:
+            raise RuntimeError(f"Unrecognized field {key}")
+    res.index.name = 'org'
+    return res
+
+
+def model_summary(cube: SummaryCube, weights: dict, target_orgs: list) -> pd.DataFrame:
+    if target_orgs[0] == 'all':
+        target_orgs = cube.orgs
+    res = pd.DataFrame(index=target_orgs)
+    for key in weights.keys():
+        if key.startswith('num') and key != 'num_adapted_chips':
+            res[key] = cube.count('modality', key.split("_")[-1].title(), target_orgs)
+        elif key.startswith('downloads'):
+            res[key] = cube.downloads('modality', key.split("_")[-1].title(), target_orgs)
+        elif key in ['descendants', 'likes']:
+            res[key] = cube.total(key, target_orgs)
+        elif key == 'issue':
+            res[key] = cube.total('community', target_orgs)
+        elif key == 'num_adapted_chips':
+            res[key] = pd.Series(ADAPTED_CHIPS).reindex(target_orgs, fill_value=1)
+        else:
+            raise RuntimeError(f"Unrecognized field {key}")
+    res.index.name = 'org'
+    return res
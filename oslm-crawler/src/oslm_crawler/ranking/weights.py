@@ -0,0 +1,85 @@
+import ast
+import json
+import math
+import hashlib
+import operator
+from functools import lru_cache
+
+DIMENSION_CONFIGS = ['data_config', 'model_config', 'infra_config', 'eval_config']
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_UNARY = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def _evaluate(node: ast.AST, expr: str) -> float:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        return _BINARY[type(node.op)](_evaluate(node.left, expr), _evaluate(node.right, expr))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        return _UNARY[type(node.op)](_evaluate(node.operand, expr))
+    raise ValueError(f"Weight {expr!r} is not arithmetic of numbers with + - * /")
+
+
+@lru_cache(maxsize=None)
+def weight_value(expr: str) -> float:
+    """The value of the weight expression `expr` such as `0.5/3`, parsed once."""
+    try:
+        tree = ast.parse(expr.strip(), mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Weight {expr!r} is not arithmetic of numbers with + - * /") from None
+    try:
+        return _evaluate(tree.body, expr)
+    except ZeroDivisionError:
+        raise ValueError(f"Weight {expr!r} divides by zero") from None
+
+
+def compile_weights(weights: dict) -> dict[str, float]:
+    return {
+        k: v if isinstance(v, (int, float)) else weight_value(str(v))
+        for k, v in (weights or {}).items()
+    }
+
+
+def _check_total(name: str, weights: dict[str, float], total: float):
+    if not math.isclose(sum(weights.values()), total, rel_tol=1e-9, abs_tol=1e-9):
+        raise ValueError(f"Weights of {name} add up to {sum(weights.values())}, expected {total}")
+
+
+_compiled: dict[str, dict] = {}
+
+
+def compile_ranking(ranking: dict) -> dict:
+    """
+    The `ranking` config with its weights compiled to numbers. The weights of
+    every `weight` dimension and `ranking_weights` must add up to
+    `weights_total` when it is set. Compiled configs are cached by the hash of
+    the config and shared, they are not to be modified.
+    """
+    key = hashlib.sha1(json.dumps(ranking, sort_keys=True, default=str).encode()).hexdigest()
+    if key in _compiled:
+        return _compiled[key]
+    compiled = dict(ranking)
+    total = ranking.get('weights_total')
+    for name in DIMENSION_CONFIGS:
+        if name not in ranking:
+            continue
+        method, weights = ranking[name]
+        weights = compile_weights(weights)
+        if total is not None and method == 'weight':
+            _check_total(name, weights, total)
+        compiled[name] = [method, weights]
+    if 'ranking_weights' in ranking:
+        compiled['ranking_weights'] = compile_weights(ranking['ranking_weights'])
+        if total is not None:
+            _check_total('ranking_weights', compiled['ranking_weights'], total)
+    _compiled[key] = compiled
+    return compiled
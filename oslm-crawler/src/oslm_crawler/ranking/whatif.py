@@ -0,0 +1,146 @@
+import copy
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from loguru import logger
+from .weights import compile_ranking
+
+DIMENSIONS = ['data', 'model', 'infra', 'eval']
+
+
+def scenario_config(base: dict, overrides: dict) -> dict:
+    """
+    The `ranking` config `base` with the `overrides` of one scenario. Weights of
+    `ranking_weights` and of a `<dimension>_config` given as a mapping replace
+    single weights, a `<dimension>_config` given as a list replaces the method
+    and all its weights. `weights_total` replaces the total the weights are
+    checked against, null skips the check.
+    """
+    config = copy.deepcopy(base)
+    for key, value in (overrides or {}).items():
+        if key == 'ranking_weights':
+            config[key] = {**config[key], **value}
+        elif key == 'weights_total':
+            config[key] = value
+        elif key in [f'{dim}_config' for dim in DIMENSIONS]:
+            if isinstance(value, dict):
+                config[key] = [config[key][0], {**config[key][1], **value}]
+            else:
+                config[key] = list(value)
+        else:
+            raise ValueError(f"Unrecognized scenario key {key}, accept `ranking_weights`, `weights_total` and `<dimension>_config`.")
+    return config
+
+
+def _product(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    # values @ weights, summed column by column like `DataFrame.sum(axis=1)`,
+    # so a scenario equal to the config gives the pipeline's scores bit for bit
+    # and ties stay ties.
+    res = np.zeros((values.shape[0], weights.shape[1]))
+    for i in range(values.shape[1]):
+        res += values[:, i:i+1] * weights[i]
+    return res
+
+
+def _dense_rank(scores: np.ndarray, index: pd.Index) -> pd.DataFrame:
+    return pd.DataFrame(scores, index=index).rank(ascending=False, method='dense')
+
+
+class WhatIf:
+    """
+    The normalized summaries of one ranked snapshot, loaded once and reranked
+    under any number of weight scenarios. The scores of all scenarios of a
+    dimension are one product of its normalized summary with the matrix of
+    their weights, `average` scenarios included as equal weights.
+    """
+
+    def __init__(self, data_dir: str | Path, ranking: dict, accumulated: bool = False):
+        self.data_dir = Path(data_dir)
+        self.ranking = ranking
+        suffix = '-accumulated' if accumulated else ''
+        target_orgs = ranking.get('target_orgs', ['all'])
+        summaries = {}
+        for dim in ['infra', 'eval']:
+            df = pd.read_csv(self.data_dir / f'{dim}-summary.csv', index_col='org')
+            if target_orgs[0] != 'all':
+                df = df[df.index.isin(target_orgs)]
+            summaries[dim] = df
+        for dim in ['data', 'model']:
+            summaries[dim] = pd.read_csv(self.data_dir / f'{dim}{suffix}-summary.csv', index_col='org')
+        self.summaries = {dim: df.div(df.max()) for dim, df in summaries.items()}
+        self.orgs = self.summaries['data'].index.intersection(
+            self.summaries['model'].index
+        ).intersection(
+            self.summaries['infra'].index
+        ).intersection(
+            self.summaries['eval'].index
+        )
+
+    def _dimension_ranks(self, dim: str, configs: list[list]) -> pd.DataFrame:
+        df = self.summaries[dim]
+        values = df.to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+        weights = np.zeros((len(df.columns), len(configs)))
+        average = np.zeros(len(configs), dtype=bool)
+        for k, (method, config_weights) in enumerate(configs):
+            if method == 'average':
+                # The mean of the present values of the columns in the config.
+                average[k] = True
+                weights[:, k] = df.columns.isin(list(config_weights))
+            elif method == 'weight':
+                weights[:, k] = [config_weights.get(col, 0) for col in df.columns]
+            else:
+                raise RuntimeError(f'Unrecognized method: {method}, accept `average` or `weight`')
+        scores = _product(values, weights)
+        if average.any():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                scores[:, average] /= _product(present.astype(float), weights[:, average])
+        return _dense_rank(scores, df.index)
+
+    def rank(self, scenarios: dict[str, dict]) -> dict[str, pd.DataFrame]:
+        """
+        The overall rank table of every scenario, the dimension ranks, `score`
+        and `rank` per org. `scenarios` maps names to overrides of the ranking
+        config, see `scenario_config`.
+        """
+        configs = {
+            name: compile_ranking(scenario_config(self.ranking, overrides))
+            for name, overrides in scenarios.items()
+        }
+        names = list(configs)
+        logger.info(f"Ranking {len(names)} scenarios of {self.data_dir}")
+        ranks = {
+            dim: self._dimension_ranks(dim, [configs[name][f'{dim}_config'] for name in names]).loc[self.orgs]
+            for dim in DIMENSIONS
+        }
+        gains = {dim: 1 / np.log2(ranks[dim].to_numpy() + 1) for dim in DIMENSIONS}
+        weights = [configs[name]['ranking_weights'] for name in names]
+        score = np.zeros((len(self.orgs), len(names)))
+        for dim in DIMENSIONS:
+            score += gains[dim] * np.array([w.get(dim, 0) for w in weights])
+        overall = _dense_rank(score, self.orgs)
+        tables = {}
+        for k, name in enumerate(names):
+            table = pd.DataFrame({dim: ranks[dim][k].astype(int) for dim in DIMENSIONS}, index=self.orgs)
+            table['score'] = score[:, k]
+            table['rank'] = overall[k].astype(int)
+            table.index.name = 'org'
+            tables[name] = table
+        return tables
+
+
+def sensitivity(tables: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    How the overall rank of every org moves over the scenarios of `WhatIf.rank`,
+    by the rank of the first scenario. Orgs with the same rank in all of them
+    are `stable`.
+    """
+    ranks = pd.DataFrame({name: table['rank'] for name, table in tables.items()})
+    res = pd.DataFrame(index=ranks.index)
+    res['rank'] = ranks.iloc[:, 0]
+    res['best'] = ranks.min(axis=1)
+    res['worst'] = ranks.max(axis=1)
+    res['spread'] = res['worst'] - res['best']
+    res['stable'] = res['spread'] == 0
+    return res.sort_values(['rank', 'spread'])
@@ -0,0 +1,117 @@
+import time
+import threading
+import pytest
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from oslm_crawler.crawler.utils import init_session
+from oslm_crawler.crawler.huggingface import HFModelHTTPPage, HFDatasetHTTPPage
+from oslm_crawler.pipeline import retry
+from oslm_crawler.pipeline.base import PipelineData
+from oslm_crawler.pipeline.crawlers import HFDetailPageCrawler
+
+FIXTURES = Path(__file__).parent / 'fixtures/huggingface'
+ROUTES = {
+    '/api/models/zai-org/GLM-4.5': 'api-models-zai-org-GLM-4.5.json',
+    '/zai-org/GLM-4.5': 'zai-org-GLM-4.5.html',
+    '/api/datasets/openai/gsm8k': 'api-datasets-openai-gsm8k.json',
+    '/datasets/openai/gsm8k': 'datasets-openai-gsm8k.html',
+}
+
+
+class RecordedHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        name = ROUTES.get(self.path)
+        if self.path.endswith('/busy'):
+            self.send_response(503)
+            self.end_headers()
+            return
+        if name is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = (FIXTURES / name).read_bytes()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json' if name.endswith('.json') else 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_model_http_page(base_url):
+    with init_session() as session:
+        info = HFModelHTTPPage(session, f"{base_url}/zai-org/GLM-4.5").scrape()
+    assert info.error_msg is None
+    assert info.repo == 'zai-org'
+    assert info.model_name == 'GLM-4.5'
+    assert info.downloads_last_month == 52108
+    assert info.likes == 1312
+    assert info.community == 27
+    assert info.descendants == 48
+    assert info.metadata['pipeline_tag'] == 'text-generation'
+
+
+def test_dataset_http_page(base_url):
+    with init_session() as session:
+        info = HFDatasetHTTPPage(session, f"{base_url}/datasets/openai/gsm8k").scrape()
+    assert info.error_msg is None
+    assert info.repo == 'openai'
+    assert info.dataset_name == 'gsm8k'
+    assert info.downloads_last_month == 402331
+    assert info.likes == 838
+    assert info.community == 16
+    assert info.dataset_usage == 1034
+
+
+def test_missing_page(base_url):
+    with init_session() as session:
+        info = HFModelHTTPPage(session, f"{base_url}/zai-org/missing").scrape()
+    assert info.error_msg is not None
+    assert info.downloads_last_month is None
+
+
+def test_detail_page_crawler_http_backend(base_url):
+    crawler = HFDetailPageCrawler(threads=2, max_retries=0, backend='http', fallback=False)
+    crawler.parse_input(PipelineData({
+        "category": "models",
+        "repo_org_mapper": {},
+        "detail_urls": [f"{base_url}/zai-org/GLM-4.5", f"{base_url}/zai-org/missing"],
+    }, None, None))
+    results = list(crawler.run())
+    data = [r.data for r in results if r.error is None]
+    errors = [r.error for r in results if r.error is not None]
+    assert len(data) == 1 and len(errors) == 1
+    assert data[0]['downloads_last_month'] == 52108
+    assert "repo_org_mapper" in data[0]
+    assert errors[0]['detail_link'].endswith('/zai-org/missing')
+    assert crawler._pool is None and crawler._session is None
+
+
+def test_detail_page_crawler_retries_without_blocking(base_url, monkeypatch):
+    monkeypatch.setattr(retry, 'DEFAULT_POLICIES', {})
+    monkeypatch.setattr(retry, 'DEFAULT_POLICY', retry.RetryPolicy(base_delay=0.3, jitter=0))
+    crawler = HFDetailPageCrawler(threads=2, max_retries=2, backend='http', fallback=False)
+    crawler.parse_input(PipelineData({
+        "category": "models",
+        "detail_urls": [f"{base_url}/zai-org/busy", f"{base_url}/zai-org/GLM-4.5"],
+    }, None, None))
+    start = time.monotonic()
+    results = crawler.run()
+    # The good page is yielded while the busy one waits for its retries.
+    first = next(results)
+    assert first.error is None and time.monotonic() - start < 0.3
+    last = next(results)
+    assert last.error['detail_link'].endswith('/zai-org/busy')
+    assert time.monotonic() - start >= 0.9
@@ -1,7 +1,10 @@
 import pytest
 import time
+from fnmatch import fnmatch
 from pprint import pprint
-from oslm_crawler.crawler.utils import WebDriverPool
+from oslm_crawler import budget
+from oslm_crawler.crawler import utils
+from oslm_crawler.crawler.utils import WebDriverPool, lean_chrome_options
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 def scrape_website(url, drivers_pool):
@@ -35,3 +38,142 @@ def test_webdriver_pool():
         for future in as_completed(futures):
             result = future.result()
             pprint(result)
+
+
+def test_lean_chrome_options():
+    options = lean_chrome_options()
+    assert options.page_load_strategy == 'eager'
+    assert '--headless' in options.arguments
+    assert '--blink-settings=imagesEnabled=false' in options.arguments
+    assert options.experimental_options['prefs']['profile.managed_default_content_settings.images'] == 2
+
+
+def test_lean_blocked_urls_keep_page_scripts():
+    scripts = [
+        'https://g.alicdn.com/code/lib/react/18.2.0/umd/react.production.min.js',
+        'https://modelscope.oss-cn-beijing.aliyuncs.com/static/js/main.8f2c1d.js',
+        'https://huggingface.co/front/build/kube-5e1a2b3/index.js',
+    ]
+    trackers = ['https://hm.baidu.com/hm.js?abc', 'https://www.googletagmanager.com/gtag/js?id=G-1']
+    assert not [url for url in scripts if any(fnmatch(url, p) for p in utils.LEAN_BLOCKED_URLS)]
+    assert all(any(fnmatch(url, p) for p in utils.LEAN_BLOCKED_URLS) for url in trackers)
+
+
+class FakeChrome:
+
+    def __init__(self, service=None, options=None):
+        time.sleep(0.2)
+        self.session_id = str(id(self))
+        self.window_handles = ['main']
+
+    def quit(self):
+        pass
+
+
+def test_pool_warm_up_resolves_driver_once(monkeypatch):
+    installs = []
+
+    class FakeManager:
+        def install(self):
+            installs.append(1)
+            return '/usr/bin/chromedriver'
+
+    monkeypatch.setattr(utils, '_chromedriver_path', None)
+    monkeypatch.setattr(utils, 'ChromeDriverManager', FakeManager)
+    monkeypatch.setattr(utils, 'Service', lambda path: path)
+    monkeypatch.setattr(utils.webdriver, 'Chrome', FakeChrome)
+    start = time.monotonic()
+    with WebDriverPool(size=8) as pool:
+        assert pool._current_size == 8
+        assert time.monotonic() - start < 1.2
+        # Replacing an unhealthy driver does not probe for chromedriver again.
+        pool._recreate_driver_if_needed(pool._pool.get())
+        assert pool._current_size == 8
+    assert len(installs) == 1
+
+
+@pytest.fixture
+def fake_chrome(monkeypatch):
+    monkeypatch.setattr(utils, '_chromedriver_path', '/usr/bin/chromedriver')
+    monkeypatch.setattr(utils, 'Service', lambda path: path)
+    monkeypatch.setattr(utils.webdriver, 'Chrome', FakeChrome)
+
+
+def test_pool_grows_and_shrinks(fake_chrome):
+    with WebDriverPool(size=1, max_size=3, grow_wait=0.05, idle_timeout=0.3) as pool:
+        with ThreadPoolExecutor(3) as executor:
+            def use():
+                with pool.get_driver():
+                    time.sleep(0.5)
+            list(executor.map(lambda _: use(), range(3)))
+        assert pool._current_size == 3 and pool.metrics.grown == 2
+        time.sleep(0.35)
+        # Idle drivers are retired down to the base size on the next checkout.
+        with pool.get_driver():
+            pass
+        assert pool._current_size == 1 and pool.metrics.shrunk == 2
+
+
+def test_pool_shrinks_on_return_under_light_load(fake_chrome):
+    with WebDriverPool(size=1, max_size=3, grow_wait=0.05, idle_timeout=0.3) as pool:
+        with ThreadPoolExecutor(3) as executor:
+            def use():
+                with pool.get_driver():
+                    time.sleep(0.3)
+            list(executor.map(lambda _: use(), range(3)))
+        assert pool._current_size == 3
+        # One caller keeps reusing the same driver, the other two go idle and
+        # are retired when a driver comes back.
+        seen = set()
+        deadline = time.monotonic() + 0.6
+        while time.monotonic() < deadline:
+            with pool.get_driver() as driver:
+                seen.add(driver.session_id)
+                time.sleep(0.05)
+        assert len(seen) == 1
+        assert pool._current_size == 1 and pool.metrics.shrunk == 2
+
+
+def test_pool_metrics_count_every_checkout(fake_chrome):
+    with WebDriverPool(size=4) as pool:
+        def use(_):
+            for _ in range(200):
+                with pool.get_driver():
+                    pass
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(use, range(8)))
+        assert pool.report()['acquired'] == 1600
+
+
+def test_pool_recycles_by_pages(fake_chrome):
+    with WebDriverPool(size=1, max_pages=2) as pool:
+        seen = []
+        for _ in range(5):
+            with pool.get_driver() as driver:
+                seen.append(driver.session_id)
+        assert len(set(seen)) == 3
+        assert pool.metrics.recycled == {'pages': 2}
+        assert pool._current_size == 1 and len(pool._stats) == 1
+        assert pool.report()['acquired'] == 5
+
+
+def test_pools_share_driver_budget(fake_chrome):
+    budget.install(budget.ResourceBudget.create(max_drivers=3))
+    try:
+        with WebDriverPool(size=2, max_size=3, grow_wait=0.05) as first:
+            with WebDriverPool(size=2) as second:
+                # Only one permit is left for the second pool.
+                assert first._current_size == 2 and second._current_size == 1
+                with first.get_driver(), first.get_driver():
+                    first._grow()
+                    assert first._current_size == 2
+            # Drivers of the closed pool went back to the budget.
+            first._grow()
+            assert first._current_size == 3
+    finally:
+        budget.install(None)
+
+
+def test_process_tree_rss():
+    import os
+    assert utils._process_tree_rss(os.getpid()) > 0
@@ -0,0 +1,68 @@
+import jsonlines
+from oslm_crawler.pipeline.base import PipelineData
+from oslm_crawler.pipeline.checkpoint import Checkpoint
+from oslm_crawler.pipeline.writers import JsonlineWriter
+
+
+def _write(writer, link):
+    writer.parse_input(PipelineData({'link': link}, None, None))
+    return next(writer.run())
+
+
+def _interrupted_run(save_dir):
+    checkpoint = Checkpoint(save_dir, fsync_every=2)
+    checkpoint.restore(save_dir / 'raw-models-info.jsonl')
+    writer = JsonlineWriter(save_dir / 'raw-models-info.jsonl', mode='a')
+    for i in range(3):
+        _write(writer, f'https://hf.co/org/m{i}')
+        checkpoint.record('crawl_detail_page', f'https://hf.co/org/m{i}', writer)
+    # Written but not checkpointed, then a torn line.
+    _write(writer, 'https://hf.co/org/m3')
+    writer.f.write(b'{"link": "https://hf.co/or')
+    writer.f.flush()
+    checkpoint.f.write('{"stage": "crawl_detail_page", "key": "https:')
+    checkpoint.f.flush()
+
+
+def test_resume_cuts_output_back_to_checkpoint(tmp_path):
+    _interrupted_run(tmp_path)
+    checkpoint = Checkpoint(tmp_path)
+    assert checkpoint.done('crawl_detail_page', 'https://hf.co/org/m2')
+    assert not checkpoint.done('crawl_detail_page', 'https://hf.co/org/m3')
+    assert checkpoint.restore(tmp_path / 'raw-models-info.jsonl')
+    writer = JsonlineWriter(tmp_path / 'raw-models-info.jsonl', mode='a')
+    _write(writer, 'https://hf.co/org/m3')
+    checkpoint.record('crawl_detail_page', 'https://hf.co/org/m3', writer)
+    checkpoint.close()
+    writer.close()
+    with jsonlines.open(tmp_path / 'raw-models-info.jsonl') as f:
+        assert [item['link'][-2:] for item in f] == ['m0', 'm1', 'm2', 'm3']
+    # The torn manifest line is gone, so the entry appended after it survives.
+    assert Checkpoint(tmp_path).done('crawl_detail_page', 'https://hf.co/org/m3')
+
+
+def test_fresh_checkpoint_discards_manifest(tmp_path):
+    _interrupted_run(tmp_path)
+    checkpoint = Checkpoint(tmp_path, fresh=True)
+    assert not checkpoint.done('crawl_detail_page', 'https://hf.co/org/m0')
+    assert not checkpoint.restore(tmp_path / 'raw-models-info.jsonl')
+    assert (tmp_path / 'raw-models-info.jsonl').stat().st_size == 0
+
+
+def test_replaced_file_is_restored_to_its_new_size(tmp_path):
+    checkpoint = Checkpoint(tmp_path)
+    writer = JsonlineWriter(tmp_path / 'raw-models-info.jsonl')
+    for i in range(3):
+        _write(writer, f'https://hf.co/org/m{i}')
+        checkpoint.record('crawl_detail_page', f'https://hf.co/org/m{i}', writer)
+    writer.close()
+    rewritten = JsonlineWriter(tmp_path / 'raw-models-info.tmp.jsonl')
+    _write(rewritten, 'https://hf.co/org/m0')
+    rewritten.close()
+    (tmp_path / 'raw-models-info.tmp.jsonl').replace(tmp_path / 'raw-models-info.jsonl')
+    checkpoint.record_replaced('post_process', tmp_path / 'raw-models-info.jsonl')
+    checkpoint.close()
+    size = (tmp_path / 'raw-models-info.jsonl').stat().st_size
+    assert Checkpoint(tmp_path).offsets['raw-models-info.jsonl'] == size
+    assert Checkpoint(tmp_path).restore(tmp_path / 'raw-models-info.jsonl')
+    assert (tmp_path / 'raw-models-info.jsonl').stat().st_size == size
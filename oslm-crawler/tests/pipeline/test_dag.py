@@ -0,0 +1,120 @@
+import time
+import threading
+import pytest
+from oslm_crawler.pipeline.base import PipelineData, PipelineStep
+from oslm_crawler.pipeline.dag import StreamingDAG, Stage, MapStep
+
+
+def item(i):
+    return PipelineData({'i': i}, None, None)
+
+
+class Collect(PipelineStep):
+    """Buffers its inputs and emits them on flush, like the info processors do."""
+
+    def __init__(self):
+        self.buffer = []
+
+    def parse_input(self, input_data=None):
+        self.input = input_data
+
+    def run(self):
+        self.buffer.append(self.input)
+        return None
+
+    def flush(self):
+        yield from self.buffer
+
+
+class SumStream(PipelineStep):
+
+    def parse_input(self, input_data=None):
+        self.input = input_data
+
+    def run(self):
+        yield PipelineData({'sum': sum(d.data['i'] for d in self.input)}, None, None)
+
+
+def test_items_stream_through_stages():
+    seen = {}
+
+    def first(inp):
+        seen.setdefault('first_done', time.monotonic())
+        return item(inp.data['i'] * 2)
+
+    def second(inp):
+        time.sleep(0.01)
+        seen.setdefault('second_start', time.monotonic())
+        return item(inp.data['i'] + 1)
+
+    def source():
+        for i in range(20):
+            time.sleep(0.01)
+            yield item(i)
+
+    dag = StreamingDAG().add(
+        Stage('double', lambda: MapStep(first))
+    ).add(
+        Stage('inc', lambda: MapStep(second), workers=4), after='double'
+    )
+    results = sorted(d.data['i'] for _, d in dag.run({'double': source()}))
+    assert results == [i * 2 + 1 for i in range(20)]
+    # The second stage started long before the source was exhausted.
+    assert seen['second_start'] - seen['first_done'] < 0.1
+
+
+def test_bounded_queues_apply_backpressure():
+    produced = []
+
+    def source():
+        for i in range(50):
+            produced.append(i)
+            yield item(i)
+
+    dag = StreamingDAG(maxsize=2).add(Stage('slow', lambda: MapStep(lambda d: d), maxsize=2))
+    stream = dag.run({'slow': source()})
+    next(stream)
+    time.sleep(0.2)
+    # One item consumed, the rest wait in the small queues instead of piling up.
+    assert len(produced) <= 8
+    assert len(list(stream)) == 49
+
+
+def test_route_flush_and_errors():
+    errors = []
+
+    def split(inp):
+        if inp.data['i'] == 3:
+            return PipelineData(None, None, {'i': 3})
+        return inp
+
+    dag = StreamingDAG(on_error=lambda stage, d: errors.append((stage, d.error))).add(
+        Stage('split', lambda: MapStep(split), route=lambda d: 'even' if d.data['i'] % 2 == 0 else 'odd')
+    ).add(
+        Stage('even', Collect, flush=lambda step: step.flush()), after='split'
+    ).add(
+        Stage('odd', SumStream, stream=True), after='split'
+    )
+    results = list(dag.run({'split': [item(i) for i in range(6)]}))
+    assert sorted(d.data['i'] for s, d in results if s == 'even') == [0, 2, 4]
+    assert [d.data['sum'] for s, d in results if s == 'odd'] == [1 + 5]
+    assert errors == [('split', {'i': 3})]
+
+
+def test_failure_stops_every_stage():
+    def boom(inp):
+        if inp.data['i'] == 5:
+            raise ValueError("boom")
+        return inp
+
+    def endless():
+        i = 0
+        while True:
+            yield item(i)
+            i += 1
+
+    dag = StreamingDAG().add(Stage('boom', lambda: MapStep(boom), maxsize=1))
+    before = threading.active_count()
+    with pytest.raises(ValueError):
+        list(dag.run({'boom': endless()}))
+    assert threading.active_count() == before
@@ -0,0 +1,171 @@
+import json
+import time
+import threading
+import pytest
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from oslm_crawler.pipeline import retry
+from oslm_crawler.pipeline.base import PipelineData
+from oslm_crawler.pipeline.engine import AsyncCrawlEngine
+from oslm_crawler.pipeline.crawlers import HFRepoPageCrawler, HFDetailPageCrawler
+
+FIXTURES = Path(__file__).parents[1] / 'crawler/fixtures/huggingface'
+MODELS = [{"id": f"zai-org/model-{i}"} for i in range(5)]
+
+
+class HubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.startswith('/api/models?author=zai-org'):
+            # Two pages, linked like the Hub does.
+            if 'cursor=2' in self.path:
+                self._send(json.dumps(MODELS[3:]).encode(), 'application/json')
+            else:
+                link = f'<http://{self.headers["Host"]}/api/models?author=zai-org&cursor=2>; rel="next"'
+                self._send(json.dumps(MODELS[:3]).encode(), 'application/json', {'Link': link})
+        elif self.path == '/api/datasets?author=zai-org&limit=1000':
+            self._send(b'[]', 'application/json')
+        elif self.path == '/api/models/zai-org/GLM-4.5':
+            self._send((FIXTURES / 'api-models-zai-org-GLM-4.5.json').read_bytes(), 'application/json')
+        elif self.path == '/zai-org/GLM-4.5':
+            self._send((FIXTURES / 'zai-org-GLM-4.5.html').read_bytes(), 'text/html')
+        elif self.path.endswith('/busy'):
+            self.send_response(503)
+            self.end_headers()
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def _send(self, body, content_type, headers=None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_engine_bounds_per_host():
+    lock = threading.Lock()
+    in_flight = {'a': 0, 'b': 0}
+    peak = {'a': 0, 'b': 0}
+
+    def fetch(host):
+        with lock:
+            in_flight[host] += 1
+            peak[host] = max(peak[host], in_flight[host])
+        time.sleep(0.02)
+        with lock:
+            in_flight[host] -= 1
+        return host
+
+    with AsyncCrawlEngine(concurrency=16, per_host=3) as engine:
+        for i in range(20):
+            host = 'a' if i % 2 else 'b'
+            engine.submit((f"http://{host}/{i}", 'models'), fetch, host)
+        results = list(engine.as_completed())
+    assert len(results) == 20
+    assert peak['a'] <= 3 and peak['b'] <= 3
+
+
+def test_engine_per_host_is_bounded_by_default():
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    def fetch(i):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return i
+
+    with AsyncCrawlEngine(concurrency=32) as engine:
+        assert engine.per_host == 8
+        for i in range(64):
+            engine.submit(f"https://huggingface.co/{i}", fetch, i)
+        results = list(engine.as_completed())
+    assert len(results) == 64
+    assert peak[0] <= 8
+    assert AsyncCrawlEngine(concurrency=4, per_host=16).per_host == 4
+    crawler = HFRepoPageCrawler()
+    assert crawler.per_host == 16 and crawler.rate == 10.0
+
+
+def test_engine_delayed_resubmit():
+    calls = []
+    with AsyncCrawlEngine(concurrency=4, per_host=4) as engine:
+        engine.submit('http://a/0', calls.append, 0)
+        for task, _ in engine.as_completed():
+            if len(calls) < 3:
+                engine.submit(task, calls.append, len(calls), delay=0.01)
+    assert calls == [0, 1, 2]
+
+
+def test_repo_page_crawler_async_http(base_url):
+    crawler = HFRepoPageCrawler(max_retries=0, backend='http', engine='async', per_host=2)
+    crawler.parse_input(PipelineData({
+        "HuggingFace": [f"{base_url}/zai-org"],
+        "target_sources": ["HuggingFace"],
+    }, None, None))
+    results = {r.data['category']: r for r in crawler.run()}
+    models = results['models']
+    assert models.error is None
+    assert models.message['total_links'] == 5
+    assert models.data['detail_urls'][-1] == f"{base_url}/zai-org/model-4"
+    assert results['datasets'].data['detail_urls'] == []
+
+
+def test_detail_page_crawler_async_http(base_url, monkeypatch):
+    monkeypatch.setattr(retry, 'DEFAULT_POLICIES', {})
+    monkeypatch.setattr(retry, 'DEFAULT_POLICY', retry.RetryPolicy(base_delay=0.5))
+    crawler = HFDetailPageCrawler(max_retries=1, backend='http', fallback=False, engine='async')
+    crawler.parse_input(PipelineData({
+        "category": "models",
+        "detail_urls": [f"{base_url}/zai-org/GLM-4.5", f"{base_url}/zai-org/busy"],
+    }, None, None))
+    start = time.monotonic()
+    results = list(crawler.run())
+    data = [r.data for r in results if r.error is None]
+    errors = [r.error for r in results if r.error is not None]
+    assert len(data) == 1 and len(errors) == 1
+    assert data[0]['downloads_last_month'] == 52108
+    assert errors[0]['detail_link'].endswith('/zai-org/busy')
+    # The failed page is retried once after its backoff.
+    assert time.monotonic() - start >= 0.25
+
+
+@pytest.mark.parametrize('engine', ['thread', 'async'])
+def test_detail_page_crawler_reads_stream(base_url, engine):
+    def repo_results():
+        # Repo pages finish one after another while detail pages are crawled.
+        for url in [f"{base_url}/zai-org/GLM-4.5", f"{base_url}/zai-org/GLM-4.5"]:
+            yield PipelineData({"category": "models", "detail_urls": [url], "repo_org_mapper": {}}, None, None)
+            time.sleep(0.2)
+
+    crawler = HFDetailPageCrawler(max_retries=0, backend='http', fallback=False, engine=engine)
+    crawler.parse_input(repo_results())
+    start = time.monotonic()
+    first = None
+    results = []
+    for r in crawler.run():
+        first = first or time.monotonic() - start
+        results.append(r)
+    assert [r.data['downloads_last_month'] for r in results] == [52108, 52108]
+    assert results[0].data['repo_org_mapper'] == {}
+    assert first < 0.2
@@ -0,0 +1,101 @@
+import jsonlines
+from oslm_crawler.pipeline.base import PipelineData
+from oslm_crawler.pipeline.incremental import IncrementalPlanner, find_previous_snapshot
+
+
+def _write_snapshot(root, date, source, filename, items):
+    path = root / date / source
+    path.mkdir(parents=True, exist_ok=True)
+    with jsonlines.open(path / filename, 'w') as f:
+        f.write_all(items)
+
+
+def _item(link, downloads, date_crawl, key='downloads_last_month', **kw):
+    return {'repo': 'org', 'link': link, key: downloads, 'date_crawl': date_crawl,
+            'img_path': 'x.png', 'error_msg': None, **kw}
+
+
+def test_find_previous_snapshot(tmp_path):
+    for d in ['2025-07-07', '2025-08-07', '2025-09-07']:
+        (tmp_path / d / 'HuggingFace').mkdir(parents=True)
+    (tmp_path / '2025-09-01').mkdir()
+    assert find_previous_snapshot(tmp_path, 'HuggingFace', '2025-09-07').parent.name == '2025-08-07'
+    assert find_previous_snapshot(tmp_path, 'HuggingFace', '2025-12-07') is None
+
+
+def test_hf_plan_uses_cheap_path(tmp_path):
+    _write_snapshot(tmp_path, '2025-08-07', 'HuggingFace', 'raw-models-info.jsonl', [
+        _item('https://hf.co/org/hot', 5000, '2025-08-07'),
+        _item('https://hf.co/org/tail', 3, '2025-08-07'),
+        _item('https://hf.co/org/broken', None, '2025-08-07'),
+    ])
+    planner = IncrementalPlanner('HuggingFace', tmp_path, date='2025-09-07')
+    plan = planner.plan('models', [
+        'https://hf.co/org/hot', 'https://hf.co/org/tail',
+        'https://hf.co/org/broken', 'https://hf.co/org/new',
+    ])
+    assert plan.full == ['https://hf.co/org/hot', 'https://hf.co/org/broken', 'https://hf.co/org/new']
+    assert plan.cheap == ['https://hf.co/org/tail']
+    assert plan.carried == []
+
+
+def test_hf_cheap_crawl_is_not_a_full_crawl(tmp_path):
+    _write_snapshot(tmp_path, '2025-08-07', 'HuggingFace', 'raw-models-info.jsonl', [
+        _item('https://hf.co/org/tail', 3, '2025-08-07', model_name='tail'),
+        _item('https://hf.co/org/cheap', 3, '2025-08-07', model_name='cheap',
+              crawl_mode='cheap', last_full_crawl='2025-06-01'),
+    ])
+    planner = IncrementalPlanner('HuggingFace', tmp_path, date='2025-09-07')
+    plan = planner.plan('models', ['https://hf.co/org/tail', 'https://hf.co/org/cheap', 'https://hf.co/org/new'])
+    assert plan.full == ['https://hf.co/org/cheap', 'https://hf.co/org/new']
+    assert plan.cheap == ['https://hf.co/org/tail']
+    cheap = planner.mark(_item('https://hf.co/org/tail', 4, '2025-09-07', model_name='tail'))
+    assert cheap['crawl_mode'] == 'cheap' and cheap['last_full_crawl'] == '2025-08-07'
+    full = planner.mark(_item('https://hf.co/org/new', 4, '2025-09-07', model_name='new'))
+    assert full['crawl_mode'] == 'full' and 'last_full_crawl' not in full
+
+    # A month later the cheap crawl still dates back to the full one.
+    _write_snapshot(tmp_path, '2025-09-07', 'HuggingFace', 'raw-models-info.jsonl', [cheap])
+    planner = IncrementalPlanner('HuggingFace', tmp_path, date='2025-11-06')
+    assert planner.plan('models', ['https://hf.co/org/tail']).full == ['https://hf.co/org/tail']
+
+
+def test_ms_plan_carries_forward_until_refresh(tmp_path):
+    _write_snapshot(tmp_path, '2025-07-07', 'ModelScope', 'raw-models-info.jsonl', [
+        _item('https://ms.cn/org/tail', 5, '2025-07-07', key='total_downloads'),
+    ])
+    _write_snapshot(tmp_path, '2025-08-07', 'ModelScope', 'raw-models-info.jsonl', [
+        _item('https://ms.cn/org/tail', 12, '2025-08-07', key='total_downloads'),
+        _item('https://ms.cn/org/stale', 12, '2025-08-07', key='total_downloads', carried_from='2025-05-07'),
+    ])
+    planner = IncrementalPlanner('ModelScope', tmp_path, date='2025-09-07', cheap_path=False)
+    full, cheap, carried = planner.split(PipelineData({
+        'category': 'models',
+        'detail_urls': ['https://ms.cn/org/tail', 'https://ms.cn/org/stale'],
+        'repo_org_mapper': {'org': 'Org'},
+    }, None, None))
+    assert full.data['detail_urls'] == ['https://ms.cn/org/stale']
+    assert cheap is None
+    assert len(carried) == 1
+    record = carried[0].data
+    assert record['date_crawl'] == '2025-09-07' and record['carried_from'] == '2025-08-07'
+    assert record['crawl_mode'] == 'carried' and record['carried_downloads_last_month'] == 7
+    assert record['img_path'] is None and record['repo_org_mapper'] == {'org': 'Org'}
+    assert planner.stats == {'full': 1, 'cheap': 0, 'carried': 1}
+
+
+def test_ms_carried_downloads_follow_the_record(tmp_path):
+    _write_snapshot(tmp_path, '2025-08-07', 'ModelScope', 'raw-models-info.jsonl', [
+        _item('https://ms.cn/org/tail', 12, '2025-08-07', key='total_downloads', model_name='tail',
+              carried_from='2025-07-07', carried_downloads_last_month=7),
+        _item('https://ms.cn/org/stale', 12, '2025-08-07', key='total_downloads', model_name='stale',
+              carried_from='2025-05-07', carried_downloads_last_month=7),
+    ])
+    planner = IncrementalPlanner('ModelScope', tmp_path, date='2025-09-07', cheap_path=False)
+    plan = planner.plan('models', ['https://ms.cn/org/tail', 'https://ms.cn/org/stale'])
+    assert plan.carried[0]['carried_from'] == '2025-07-07'
+    assert plan.carried[0]['carried_downloads_last_month'] == 7
+    assert planner.mark(plan.carried[0]) is plan.carried[0]
+    refreshed = planner.mark(_item('https://ms.cn/org/stale', 40, '2025-09-07', key='total_downloads',
+                                   model_name='stale'))
+    assert refreshed['crawl_mode'] == 'full' and refreshed['downloads_since'] == '2025-05-07'
@@ -0,0 +1,42 @@
+import jsonlines
+from oslm_crawler.pipeline.readers import JsonlineReader, JsonlineRows
+
+
+def _jsonl(path, n, **extra):
+    with jsonlines.open(path, 'w') as f:
+        f.write_all({'repo': 'org', 'model_name': f'm{i}', 'likes': i, **extra} for i in range(n))
+    return path
+
+
+def test_jsonline_reader_batches_lazily(tmp_path):
+    reader = JsonlineReader(_jsonl(tmp_path / 'raw-models-info.jsonl', 5))
+    # The whole file as one batch, as before.
+    res = next(reader.run())
+    assert res.data['total_lines'] == 5 and res.data['content'][4]['likes'] == 4
+    reader = JsonlineReader(tmp_path / 'raw-models-info.jsonl', batch_size=2)
+    batches = reader.run()
+    assert [x['model_name'] for x in next(batches).data['content']] == ['m0', 'm1']
+    assert [b.data['total_lines'] for b in batches] == [2, 1]
+    empty = JsonlineReader(_jsonl(tmp_path / 'empty.jsonl', 0), batch_size=2)
+    assert list(empty.run()) == []
+    assert next(JsonlineReader(tmp_path / 'empty.jsonl').run()).data['content'] == []
+
+
+def test_jsonline_reader_projection_and_shared_tables(tmp_path):
+    path = _jsonl(tmp_path / 'raw-models-info.jsonl', 3, metadata={'big': 'x' * 100})
+    assert list(JsonlineReader(path, required_keys=['repo', 'model_name', 'metadata'], drop_keys=['metadata']).rows()) == [
+        {'repo': 'org', 'model_name': f'm{i}'} for i in range(3)
+    ]
+    assert 'metadata' not in next(JsonlineReader(path, drop_keys=['metadata']).rows())
+    res = next(JsonlineReader(path, required_keys=['downloads']).run())
+    assert res.data is None and 'downloads' in res.error['details']
+    mapper = {'org': 'Org'}
+    rows = JsonlineRows(
+        JsonlineReader(path, shared={'repo_org_mapper': mapper}),
+        JsonlineReader(_jsonl(tmp_path / 'raw-datasets-info.jsonl', 2), shared={'repo_org_mapper': mapper}),
+    )
+    for _ in range(2):
+        # Read again on every pass, one mapper for all rows.
+        items = [inp.data for inp in rows]
+        assert len(items) == 5
+        assert all(item['repo_org_mapper'] is mapper for item in items)
@@ -0,0 +1,62 @@
+import time
+import requests
+from selenium.common.exceptions import TimeoutException
+from oslm_crawler.pipeline.retry import RetryPolicy, RetryScheduler
+
+
+def test_policy_backoff_and_jitter():
+    policy = RetryPolicy(base_delay=1, max_delay=8, factor=2, jitter=0.5)
+    for attempt, full in [(1, 1), (2, 2), (3, 4), (4, 8), (6, 8)]:
+        delay = policy.delay(attempt)
+        assert full * 0.5 <= delay <= full
+
+
+def test_policy_lookup_follows_mro():
+    timeout = RetryPolicy(base_delay=1)
+    scheduler = RetryScheduler(3, policies={
+        TimeoutException: timeout,
+        requests.RequestException: RetryPolicy(base_delay=7),
+    })
+    assert scheduler.policy_for(TimeoutException()) is timeout
+    assert scheduler.policy_for(requests.HTTPError()).base_delay == 7
+    assert scheduler.policy_for(ValueError()) is scheduler.default
+
+
+def test_schedule_until_exhausted():
+    scheduler = RetryScheduler(2, policies={
+        KeyError: RetryPolicy(max_retries=0),
+    }, default=RetryPolicy(base_delay=0, jitter=0))
+    assert scheduler.schedule('a', ValueError())
+    assert scheduler.schedule('a', ValueError())
+    assert not scheduler.schedule('a', ValueError())
+    assert not scheduler.schedule('b', KeyError())
+    assert scheduler.pop_ready() == ['a', 'a']
+    assert len(scheduler) == 0 and scheduler.next_delay() is None
+
+
+def test_ready_order_by_time():
+    scheduler = RetryScheduler(5, policies={
+        KeyError: RetryPolicy(base_delay=0.2, jitter=0),
+    }, default=RetryPolicy(base_delay=0, jitter=0))
+    scheduler.schedule('slow', KeyError())
+    scheduler.schedule('fast', ValueError())
+    assert scheduler.pop_ready() == ['fast']
+    assert 0 < scheduler.next_delay() <= 0.2
+    time.sleep(scheduler.next_delay())
+    assert scheduler.pop_ready() == ['slow']
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+def test_client_errors_fail_fast():
+    scheduler = RetryScheduler(3, default=RetryPolicy(base_delay=0, jitter=0))
+    assert scheduler.backoff('gone', _http_error(404)) is None
+    assert scheduler.backoff('gated', _http_error(401)) is None
+    for status in [408, 429, 500, 503]:
+        assert scheduler.backoff(status, _http_error(status)) is not None
+    # Without a response there is no status to tell, so it is retried.
+    assert scheduler.backoff('unknown', requests.HTTPError()) is not None
@@ -1,5 +1,7 @@
+import pytest
 import jsonlines
 from pathlib import Path
+from oslm_crawler.pipeline import writers
 from oslm_crawler.pipeline.writers import JsonlineWriter
 from oslm_crawler.pipeline.base import PipelineData
 
@@ -22,4 +24,53 @@ def test_jsonline_writer():
         assert 'def' in res.keys()
         assert 'repo_org_mapper' not in res.keys()
     tmp_path.unlink()
-    
\ No newline at end of file
+    
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_jsonline_writer_flush_policy(tmp_path, monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(writers, 'orjson', None)
+    path = tmp_path / 'raw-models-info.jsonl'
+    writer = JsonlineWriter(path, flush_every=3, flush_bytes=None, flush_interval=None)
+    items = [{'link': f'https://hf.co/org/m{i}', 'name': '模型', 'metadata': {'n': i}} for i in range(4)]
+    for item in items[:2]:
+        assert writer.write(PipelineData(item, None, None)).data is item
+    assert path.stat().st_size == 0 and writer.buffered
+    writer.write(PipelineData(items[2], None, None))
+    assert not writer.buffered and path.stat().st_size == writer.tell()
+    writer.write(PipelineData(items[3], None, None))
+    offset = writer.tell()
+    assert writer.close()
+    assert path.stat().st_size == offset
+    with jsonlines.open(path) as f:
+        assert list(f) == items
+
+
+def test_orjson_and_stdlib_write_the_same_bytes(monkeypatch):
+    if writers.orjson is None:
+        pytest.skip('orjson is not installed')
+    items = [
+        {'link': 'https://hf.co/org/m', 'name': '模型', 'downloads': 12, 'score': 0.25, 'ratio': -1.5,
+         'missing': None, 'ok': True, 'tags': ['a', 'b'], 'metadata': {'n': 1, 'nested': {'x': []}}},
+        {'score': float('nan'), 'values': [float('inf'), 1.0], 'ids': {1: 'one'}},
+        {},
+    ]
+    fast = [writers.dumps(item) for item in items]
+    monkeypatch.setattr(writers, 'orjson', None)
+    assert [writers.dumps(item) for item in items] == fast
+    assert fast[1] == b'{"score":null,"values":[null,1.0],"ids":{"1":"one"}}'
+
+
+def test_checkpoint_holds_lines_of_buffered_records(tmp_path):
+    from oslm_crawler.pipeline.checkpoint import Checkpoint
+    checkpoint = Checkpoint(tmp_path, fsync_every=100, fsync_interval=100)
+    writer = JsonlineWriter(tmp_path / 'raw-models-info.jsonl', flush_every=100, flush_interval=None)
+    for i in range(3):
+        writer.write(PipelineData({'link': f'm{i}'}, None, None))
+        checkpoint.record('crawl_detail_page', f'm{i}', writer)
+    checkpoint.f.flush()
+    # Nothing in the manifest may point past what is in the output file.
+    assert checkpoint.path.stat().st_size == 0
+    checkpoint.sync()
+    assert Checkpoint(tmp_path).offsets['raw-models-info.jsonl'] == writer.tell() > 0
+    assert Checkpoint(tmp_path).done('crawl_detail_page', 'm2')
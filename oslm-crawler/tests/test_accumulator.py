@@ -0,0 +1,76 @@
+import jsonlines
+from oslm_crawler.ranking.accumulator import Accumulator, to_records
+
+
+def _snapshot(data_dir, date, models, datasets=()):
+    (data_dir / date).mkdir(parents=True, exist_ok=True)
+    for category, items in (('models', models), ('datasets', datasets)):
+        with jsonlines.open(data_dir / date / f'merged-{category}-info.jsonl', 'w') as f:
+            f.write_all(items)
+
+
+def _model(org, name, downloads, likes, modality='Language'):
+    return {
+        'org': org, 'repo': org, 'model_name': name, 'modality': modality,
+        'downloads_last_month': downloads, 'likes': likes, 'community': 0, 'descendants': 1,
+    }
+
+
+def _dataset(name, downloads, usage):
+    return {
+        'org': 'BAAI', 'repo': 'BAAI', 'dataset_name': name, 'modality': 'Language', 'lifecycle': 'SFT',
+        'downloads_last_month': downloads, 'likes': 0, 'community': 0, 'dataset_usage': usage,
+    }
+
+
+def _fill(tmp_path):
+    _snapshot(tmp_path, '2025-06-07', [_model('Qwen', 'Qwen3-8B', 10, 5)], [_dataset('CCI4.0', 1, 3)])
+    _snapshot(tmp_path, '2025-07-07', [
+        _model('Qwen', 'Qwen3-4B', 3, 1),
+        _model('Alibaba', 'Qwen3-8B', 20, 2, 'Vision'),
+    ], [_dataset('CCI4.0', 2, 1)])
+    _snapshot(tmp_path, '2025-08-07', [_model('Qwen', 'Qwen3-8B', 30, 9)], [_dataset('CCI4.0', 4, 2)])
+
+
+def test_folding_a_new_month_matches_folding_from_scratch(tmp_path):
+    _fill(tmp_path)
+    dates = ['2025-06-07', '2025-07-07', '2025-08-07']
+    scratch = Accumulator(tmp_path, tmp_path / 'scratch.db').accumulate(dates)
+
+    accumulator = Accumulator(tmp_path)
+    accumulator.accumulate(dates[:2])
+    accumulator.close()
+    accumulator = Accumulator(tmp_path)
+    assert accumulator.folded() == dates[:2]
+    totals = accumulator.accumulate(dates)
+    assert accumulator.folded() == dates
+    for category in ('models', 'datasets'):
+        assert to_records(totals[category]) == to_records(scratch[category])
+    assert to_records(totals['models']) == [
+        {'org': 'Qwen', 'repo': 'Qwen', 'model_name': 'Qwen3-8B', 'modality': 'Language',
+         'accumulated_downloads': 40, 'likes': 9, 'community': 0, 'descendants': 1},
+        {'org': 'Qwen', 'repo': 'Qwen', 'model_name': 'Qwen3-4B', 'modality': 'Language',
+         'accumulated_downloads': 3, 'likes': 1, 'community': 0, 'descendants': 1},
+        {'org': 'Alibaba', 'repo': 'Alibaba', 'model_name': 'Qwen3-8B', 'modality': 'Vision',
+         'accumulated_downloads': 20, 'likes': 2, 'community': 0, 'descendants': 1},
+    ]
+    assert to_records(totals['datasets'])[0]['dataset_usage'] == 3
+
+
+def test_earlier_cutoff_and_changed_snapshot(tmp_path):
+    _fill(tmp_path)
+    dates = ['2025-06-07', '2025-07-07', '2025-08-07']
+    accumulator = Accumulator(tmp_path)
+    accumulator.accumulate(dates)
+
+    totals = accumulator.accumulate(dates[:1])
+    assert to_records(totals['models'])[0]['accumulated_downloads'] == 10
+    assert accumulator.folded() == dates
+
+    _snapshot(tmp_path, '2025-07-07', [_model('Qwen', 'Qwen3-8B', 100, 1)], [])
+    totals = accumulator.accumulate(dates)
+    assert to_records(totals['models']) == [
+        {'org': 'Qwen', 'repo': 'Qwen', 'model_name': 'Qwen3-8B', 'modality': 'Language',
+         'accumulated_downloads': 140, 'likes': 9, 'community': 0, 'descendants': 1},
+    ]
+    assert accumulator.folded() == dates
@@ -0,0 +1,69 @@
+import pandas as pd
+from oslm_crawler.ranking.backfill import RankBackfill
+
+
+class Pipeline:
+    """Ranks the orgs of `scores.csv` in a snapshot, the last month is the snapshot before it."""
+
+    def __init__(self, data_dir, log_path):
+        self.data_dir = data_dir
+
+    def step(self, stage, **kargs):
+        scores = pd.read_csv(self.data_dir / 'scores.csv', index_col='org')
+        (scores * kargs['scale']).to_csv(self.data_dir / 'scaled.csv')
+        return self
+
+    def _rank_tables(self, **kargs):
+        df = pd.read_csv(self.data_dir / 'scaled.csv', index_col='org')
+        df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
+        return {'rank': df}
+
+    @staticmethod
+    def _get_last_month_path(date, data_dir, ranked=()):
+        dates = sorted(p.name for p in data_dir.glob('????-??-??'))
+        i = dates.index(date)
+        return data_dir / dates[i - 1] if i > 0 else None
+
+    @staticmethod
+    def _load_last_month(path):
+        return {'rank': pd.read_csv(path / 'rank.csv', index_col='org')}
+
+    @staticmethod
+    def _save_ranking(data_dir, tables, last):
+        if last is not None:
+            tables['rank']['delta rank'] = last['rank']['rank'] - tables['rank']['rank']
+        tables['rank'].to_csv(data_dir / 'rank.csv')
+
+
+def _fill(tmp_path):
+    scores = {
+        '2025-06-07': {'Ali': 1, 'Baidu': 2},
+        '2025-07-07': {'Ali': 3, 'Baidu': 2},
+        '2025-08-07': {'Ali': 3, 'Baidu': 5},
+    }
+    for date, values in scores.items():
+        (tmp_path / date).mkdir()
+        pd.DataFrame({'org': list(values), 'score': list(values.values())}).to_csv(tmp_path / date / 'scores.csv', index=False)
+    # The first snapshot is only ever a last month, ranked by an earlier run.
+    pd.DataFrame({'org': ['Ali', 'Baidu'], 'rank': [2, 1]}).to_csv(tmp_path / '2025-06-07' / 'rank.csv', index=False)
+
+
+def test_ranks_every_snapshot_with_deltas_of_the_same_run(tmp_path):
+    _fill(tmp_path)
+    tables = RankBackfill(Pipeline, tmp_path, tmp_path / 'logs', 1).run({'scale': {'scale': 2}, 'ranking': {}})
+    assert list(tables) == ['2025-07-07', '2025-08-07']
+    july = pd.read_csv(tmp_path / '2025-07-07' / 'rank.csv', index_col='org')
+    august = pd.read_csv(tmp_path / '2025-08-07' / 'rank.csv', index_col='org')
+    assert july['score'].tolist() == [6, 4]
+    assert july['delta rank'].tolist() == [1, -1]
+    assert august['delta rank'].tolist() == [-1, 1]
+
+
+def test_workers_give_the_same_files(tmp_path):
+    for name, workers in (('one', 1), ('two', 2)):
+        (tmp_path / name).mkdir()
+        _fill(tmp_path / name)
+        RankBackfill(Pipeline, tmp_path / name, tmp_path / 'logs', workers).run({'scale': {'scale': 3}, 'ranking': {}})
+    for date in ('2025-07-07', '2025-08-07'):
+        for file in ('scaled.csv', 'rank.csv'):
+            assert (tmp_path / 'one' / date / file).read_text() == (tmp_path / 'two' / date / file).read_text()
@@ -0,0 +1,175 @@
+import json
+import time
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from oslm_crawler.ai.classification import ClassificationService
+from oslm_crawler.pipeline.base import PipelineData
+
+
+class FakeChatCompletions(BaseHTTPRequestHandler):
+    """Answers /v1/chat/completions like the classification prompts ask for, after `delay` seconds."""
+
+    delay = 0.3
+    starts = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        cls = FakeChatCompletions
+        with cls.lock:
+            cls.starts.append(time.monotonic())
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        links = body['messages'][-1]['content'].splitlines()[1:]
+        time.sleep(self.delay)
+        with cls.lock:
+            cls.in_flight -= 1
+        if any('broken' in link for link in links):
+            self.send_error(500)
+            return
+        content = json.dumps({'infos': [
+            {'link': link, 'modality': 'Language', 'is_large_model': True} for link in links
+        ]})
+        payload = json.dumps({'choices': [{'message': {'role': 'assistant', 'content': content}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    FakeChatCompletions.starts = []
+    FakeChatCompletions.max_in_flight = 0
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeChatCompletions)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}/v1'
+    httpd.shutdown()
+
+
+def classifier(base_url):
+    def classify(links: list[str]) -> list[dict]:
+        request = urllib.request.Request(
+            f'{base_url}/chat/completions',
+            data=json.dumps({
+                'model': 'fake',
+                'messages': [{'role': 'user', 'content': "Here are the model links:\n" + "\n".join(links)}],
+            }).encode(),
+            headers={'Content-Type': 'application/json'},
+        )
+        with urllib.request.urlopen(request) as response:
+            completion = json.loads(response.read())
+        return json.loads(completion['choices'][0]['message']['content'])['infos']
+    return classify
+
+
+def _collect(service, n):
+    results = []
+    while len(results) < n:
+        results.extend(service.completed(block=True))
+    return results
+
+
+def test_batches_run_concurrently(server):
+    service = ClassificationService(concurrency=4)
+    for i in range(8):
+        service.submit(classifier(server), [f'https://hf.co/org/model-{i}-{j}' for j in range(3)], f'batch-{i}')
+    # Submitting does not wait for the LLM, and neither does a non-blocking poll.
+    assert list(service.completed()) == []
+    assert service.pending == 8
+    results = _collect(service, 8)
+    # Four batches were in flight together, never more.
+    assert FakeChatCompletions.max_in_flight == 4
+    assert sorted(records for records, _ in results) == [f'batch-{i}' for i in range(8)]
+    assert all(len(infos) == 3 for _, infos in results)
+    assert service.pending == 0
+    service.close()
+
+
+def test_rate_limit(server):
+    FakeChatCompletions.delay = 0
+    try:
+        service = ClassificationService(concurrency=4, rate=2)
+        for i in range(4):
+            service.submit(classifier(server), [f'https://hf.co/org/model-{i}'], i)
+        _collect(service, 4)
+        service.close()
+    finally:
+        FakeChatCompletions.delay = 0.3
+    starts = sorted(FakeChatCompletions.starts)
+    # Two start at once from the full bucket, the others wait for refills.
+    assert starts[-1] - starts[0] >= 0.9
+
+
+def test_failed_batch_comes_back_empty(server):
+    service = ClassificationService(concurrency=2)
+    service.submit(classifier(server), ['https://hf.co/org/broken'], 'bad')
+    service.submit(classifier(server), ['https://hf.co/org/model'], 'good')
+    results = dict(_collect(service, 2))
+    assert results['bad'] == []
+    assert results['good'][0]['modality'] == 'Language'
+    service.close()
+
+
+def _hf_model(i, downloads, img_path=None):
+    return PipelineData({
+        'repo': 'org', 'model_name': f'model-{i}', 'downloads_last_month': downloads, 'likes': 1,
+        'community': 0, 'descendants': 0, 'date_crawl': '2025-09-07', 'link': f'https://huggingface.co/org/model-{i}',
+        'img_path': img_path, 'error_msg': None, 'metadata': None, 'repo_org_mapper': {'org': 'Org'},
+    }, None, None)
+
+
+def test_processor_emits_every_record_once_in_order(tmp_path, monkeypatch):
+    processors = pytest.importorskip('oslm_crawler.pipeline.processors')
+    from oslm_crawler.ai.model_info_generator import ModelInfo
+    from oslm_crawler.ai.screenshot_checker import CheckResponse
+
+    classified, checked = [], []
+
+    def classify(links):
+        classified.append(links)
+        time.sleep(0.05)
+        return [ModelInfo(link=link, modality='Language', is_large_model='small' not in link) for link in links]
+
+    def verify(requests):
+        checked.append([request.link for request in requests])
+        return [CheckResponse(request.link, request.source, downloads_last_month=500) for request in requests]
+
+    monkeypatch.setattr(processors, 'verify_screenshots', verify)
+    processor = processors.HFInfoProcessor(
+        tmp_path / 'dataset-info.json', tmp_path / 'model-info.json',
+        ai_check=True, buffer_size=4, llm_concurrency=1, heuristics=False,
+    )
+    processor.classify_fns['models'] = classify
+    screenshot = tmp_path / 'zero.png'
+    screenshot.write_bytes(b'png')
+    inputs = [_hf_model(i, 100 + i) for i in range(10)]
+    inputs[3] = _hf_model(3, 0, str(screenshot))
+    inputs[7] = _hf_model(7, 0, str(screenshot))
+    inputs[5].data['model_name'] = 'small'
+    inputs[5].data['link'] = 'https://huggingface.co/org/small'
+
+    outputs = []
+    for inp in inputs:
+        processor.parse_input(inp)
+        outputs.extend(processor.run())
+    outputs.extend(processor.flush(update_infos=True))
+
+    assert all(out.error is None for out in outputs)
+    # Batches classified in order, the two records with zero downloads parked
+    # until their screenshots were read, the small model dropped.
+    assert [out.data['model_name'] for out in outputs] == [f'model-{i}' for i in [0, 1, 2, 4, 6, 8, 9, 3, 7]]
+    assert [out.data['downloads_last_month'] for out in outputs] == [100, 101, 102, 104, 106, 108, 109, 500, 500]
+    assert [len(links) for links in classified] == [4, 4, 2]
+    assert checked == [['https://huggingface.co/org/model-3', 'https://huggingface.co/org/model-7']]
+    assert processor.classifier.pending == 0
+    assert json.loads((tmp_path / 'model-info.json').read_text())['org/model-3']['is_large_model'] is True
@@ -0,0 +1,46 @@
+import os
+import jsonlines
+import pytest
+from oslm_crawler.database.columnar import columnar_path, convert, has_columnar, read_frame
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+ROWS = [
+    {'org': 'Ali', 'repo': 'Qwen', 'dataset_name': f'd{i}', 'modality': m, 'lifecycle': 'Fine-tuning',
+     'downloads_last_month': i * 10, 'likes': i, 'date_crawl': '2025-08-07'}
+    for i, m in enumerate(['Language', None, 'Language', 'Vision'])
+]
+
+
+def _jsonl(path, rows):
+    with jsonlines.open(path, 'w') as f:
+        f.write_all(rows)
+    return path
+
+
+def test_columnar_copy_is_typed_and_dictionary_encoded(tmp_path):
+    path = _jsonl(tmp_path / 'merged-datasets-info.jsonl', ROWS)
+    assert convert(path) == columnar_path(path) == tmp_path / 'merged-datasets-info.parquet'
+    schema = pq.read_schema(columnar_path(path))
+    for name in ['org', 'modality', 'lifecycle']:
+        assert pa.types.is_dictionary(schema.field(name).type)
+    assert pa.types.is_string(schema.field('repo').type)
+    assert pa.types.is_integer(schema.field('downloads_last_month').type)
+    df = read_frame(path, ['org', 'modality', 'downloads_last_month'])
+    assert list(df.columns) == ['org', 'modality', 'downloads_last_month']
+    assert df['modality'].dtype == 'category' and df['modality'].isna().sum() == 1
+    assert df['downloads_last_month'].tolist() == [0, 10, 20, 30]
+
+
+def test_stale_columnar_copy_is_ignored(tmp_path):
+    path = _jsonl(tmp_path / 'merged-datasets-info.jsonl', ROWS)
+    assert not has_columnar(path)
+    convert(path)
+    assert has_columnar(path)
+    _jsonl(path, ROWS[:2])
+    stat = columnar_path(path).stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert not has_columnar(path)
+    df = read_frame(path)
+    assert len(df) == 2 and df['modality'].isna().tolist() == [False, True]
@@ -0,0 +1,55 @@
+from oslm_crawler.ai.heuristics import ModelHeuristics, family
+
+
+LABELED = {
+    **{f'BAAI/bge-model-{i}': {'modality': 'Vector', 'is_large_model': True} for i in range(20)},
+    **{f'openai/whisper-model-{i}': {'modality': 'Speech', 'is_large_model': True} for i in range(20)},
+    **{f'google/bert-model-{i}': {'modality': None, 'is_large_model': False} for i in range(20)},
+    **{f'Qwen/Qwen2.5-{size}-Instruct': {'modality': 'Language', 'is_large_model': True}
+       for size in ['0.5B', '1.5B', '3B', '7B', '14B', '72B']},
+}
+
+
+def test_family_strips_sizes_and_variants():
+    assert family('Qwen2.5-7B-Instruct') == family('Qwen2.5-72B-Instruct-AWQ') == 'qwen2'
+    assert family('Llama-3.1-8B-Instruct') == 'llama'
+    assert family('bge-m3') != family('bge-reranker-v2-m3')
+
+
+def test_name_rules_pipeline_tag_and_siblings():
+    heuristics = ModelHeuristics(LABELED)
+    assert heuristics.classify('BAAI/bge-small-zh-v1.5').label == ('Vector', True)
+    assert heuristics.classify('openai/whisper-large-v3').label == ('Speech', True)
+    assert heuristics.classify('dslim/bert-base-NER').label == (None, False)
+    assert heuristics.classify('someone/mystery-model') is None
+    guess = heuristics.classify('someone/mystery-model', {'pipeline_tag': 'automatic-speech-recognition'})
+    assert guess.label == ('Speech', True) and guess.rule.startswith('pipeline_tag')
+    guess = heuristics.classify('Qwen/Qwen2.5-32B-Instruct')
+    assert guess.label == ('Language', True) and guess.rule == 'siblings'
+    # Siblings labeled during the run count as well, but a few are not enough.
+    for size in ['0.6B', '1.7B', '4B']:
+        heuristics.learn(f'Qwen/Qwen3-{size}', ('Language', True))
+    assert heuristics.classify('Qwen/Qwen3-8B') is None
+    for size in ['14B', '32B', '235B-A22B']:
+        heuristics.learn(f'Qwen/Qwen3-{size}', ('Language', True))
+    assert heuristics.classify('Qwen/Qwen3-8B').label == ('Language', True)
+
+
+def test_conflicting_signals_are_left_to_the_llm():
+    infos = dict(LABELED)
+    # Half of the whisper-named models turn out to be multimodal, the rule loses trust.
+    infos.update({f'x/whisper-omni-{i}': {'modality': 'Multimodal', 'is_large_model': True} for i in range(40)})
+    heuristics = ModelHeuristics(infos)
+    assert heuristics.confidence['speech'] < 0.85
+    assert heuristics.classify('y/whisper-tiny') is None
+    # A speech pipeline tag against a bert name is no certainty either.
+    assert ModelHeuristics(LABELED).classify('z/bert-asr', {'pipeline_tag': 'fill-mask'}) is None
+
+
+def test_generic_pipeline_tags_are_left_to_the_llm():
+    heuristics = ModelHeuristics(LABELED)
+    # gpt2 is text-generation as well, the tag alone does not tell a large model.
+    assert heuristics.classify('someone/mystery-model', {'pipeline_tag': 'text-generation'}) is None
+    assert heuristics.classify('someone/mystery-model', {'pipeline_tag': 'text-to-image'}) is None
+    guess = heuristics.classify('Qwen/Qwen2.5-32B-Instruct', {'pipeline_tag': 'text-generation'})
+    assert guess.label == ('Language', True) and guess.rule == 'siblings'
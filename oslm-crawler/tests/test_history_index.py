@@ -0,0 +1,83 @@
+import jsonlines
+from oslm_crawler.database.history_index import HistoryIndex, nearest_date
+
+
+def _snapshot(data_dir, date, source, category, items):
+    path = data_dir / date / source / f'raw-{category}-info.jsonl'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with jsonlines.open(path, 'w') as f:
+        f.write_all(items)
+    return path
+
+
+def test_nearest_date():
+    dates = ['2025-06-07', '2025-07-07', '2025-08-07']
+    assert nearest_date(dates, '2025-07-09') == '2025-07-07'
+    assert nearest_date(dates, '2025-07-22') == '2025-07-07'
+    assert nearest_date(dates, '2025-07-23') == '2025-08-07'
+    assert nearest_date(dates, '2025-05-01') is None
+    assert nearest_date([], '2025-05-01') is None
+
+
+def test_lookup_by_source_category_and_snapshot(tmp_path):
+    _snapshot(tmp_path, '2025-07-07', 'ModelScope', 'models', [
+        {'repo': 'Qwen', 'model_name': 'Qwen3-8B', 'total_downloads': 100},
+    ])
+    _snapshot(tmp_path, '2025-07-07', 'ModelScope', 'datasets', [
+        {'repo': 'Qwen', 'dataset_name': 'Qwen3-8B', 'total_downloads': 7},
+    ])
+    _snapshot(tmp_path, '2025-08-07', 'OpenDataLab', 'datasets', [
+        {'repo': 'OpenDataLab', 'dataset_name': 'MinerU', 'total_downloads': 42},
+    ])
+    index = HistoryIndex.open(tmp_path)
+    snapshot = index.last_month('2025-08-07', 'ModelScope')
+    assert snapshot == '2025-07-07'
+    assert index.downloads('ModelScope', 'models', 'Qwen/Qwen3-8B', snapshot) == 100
+    assert index.downloads('ModelScope', 'datasets', 'Qwen/Qwen3-8B', snapshot) == 7
+    assert index.downloads('ModelScope', 'models', 'Qwen/Qwen3-4B', snapshot) is None
+    assert index.downloads('ModelScope', 'models', 'Qwen/Qwen3-8B', None) is None
+    # OpenDataLab has no snapshot a month before 2025-08-07.
+    assert index.last_month('2025-08-07', 'OpenDataLab') is None
+    assert index.dates() == ['2025-07-07', '2025-08-07']
+
+
+def test_refresh_only_indexes_new_or_changed_files(tmp_path):
+    path = _snapshot(tmp_path, '2025-07-07', 'BAAIData', 'datasets', [
+        {'repo': 'BAAI', 'dataset_name': 'CCI4.0', 'total_downloads': 1},
+    ])
+    index = HistoryIndex.open(tmp_path)
+    assert index.refresh() == 0
+    _snapshot(tmp_path, '2025-08-07', 'BAAIData', 'datasets', [
+        {'repo': 'BAAI', 'dataset_name': 'CCI4.0', 'total_downloads': 5},
+    ])
+    assert index.refresh() == 1
+    with jsonlines.open(path, 'w') as f:
+        f.write_all([{'repo': 'BAAI', 'dataset_name': 'Infinity-Instruct', 'total_downloads': 3}])
+    # A reopened index sees what the last run left and the rewritten file.
+    index.close()
+    index = HistoryIndex(tmp_path)
+    assert index.refresh() == 1
+    assert index.downloads('BAAIData', 'datasets', 'BAAI/CCI4.0', '2025-07-07') is None
+    assert index.downloads('BAAIData', 'datasets', 'BAAI/Infinity-Instruct', '2025-07-07') == 3
+    assert index.last_month('2025-09-07', 'BAAIData') == '2025-08-07'
+
+
+def test_torn_file_is_read_again(tmp_path):
+    _snapshot(tmp_path, '2025-07-07', 'ModelScope', 'models', [
+        {'repo': 'Qwen', 'model_name': 'Qwen3-8B', 'total_downloads': 100},
+    ])
+    path = _snapshot(tmp_path, '2025-08-07', 'ModelScope', 'models', [
+        {'repo': 'Qwen', 'model_name': 'Qwen3-8B', 'total_downloads': 150},
+    ])
+    # The crawl of today is still writing its second record.
+    with open(path, 'a') as f:
+        f.write('{"repo": "Qwen", "model_name": "Qwen3-4B", "total_dow')
+    index = HistoryIndex.open(tmp_path)
+    assert index.dates('ModelScope') == ['2025-07-07']
+    assert index.downloads('ModelScope', 'models', 'Qwen/Qwen3-8B', '2025-07-07') == 100
+    with open(path, 'a') as f:
+        f.write('nloads": 20}\n')
+    assert index.refresh() == 1
+    assert index.dates('ModelScope') == ['2025-07-07', '2025-08-07']
+    assert index.downloads('ModelScope', 'models', 'Qwen/Qwen3-4B', '2025-08-07') == 20
+    assert index.refresh() == 0
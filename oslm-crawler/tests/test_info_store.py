@@ -0,0 +1,87 @@
+import json
+import multiprocessing
+from oslm_crawler.database.info_store import InfoStore
+
+
+def _write(path, n):
+    json_path = path / 'model-info.json'
+    json_path.write_text(json.dumps({
+        f'org/model-{i}': {'modality': 'Language', 'is_large_model': True} for i in range(n)
+    }, indent=4))
+    return json_path
+
+
+def test_migrates_json_and_merges_edits(tmp_path):
+    json_path = _write(tmp_path, 3)
+    store = InfoStore.from_json(json_path)
+    assert len(store) == 3
+    assert store['org/model-1'] == {'modality': 'Language', 'is_large_model': True}
+    assert store.get('org/missing') is None
+    store['org/model-7'] = {'modality': 'Vision', 'is_large_model': True}
+    store.close()
+    # An unchanged JSON is not read again.
+    store = InfoStore.from_json(json_path)
+    assert len(store) == 4
+    store.close()
+    # Edits of the JSON are merged in, the store keeps its own infos.
+    edited = json.loads(json_path.read_text())
+    edited['org/model-1']['modality'] = 'Speech'
+    edited['org/model-8'] = {'modality': 'Language', 'is_large_model': False}
+    json_path.write_text(json.dumps(edited, indent=4))
+    store = InfoStore.from_json(json_path)
+    assert len(store) == 5
+    assert store['org/model-1']['modality'] == 'Speech'
+    assert store.export_json()
+    assert set(json.loads(json_path.read_text())) == set(store)
+    store.close()
+
+
+def test_export_keeps_json_edited_after_import(tmp_path):
+    json_path = _write(tmp_path, 2)
+    store = InfoStore.from_json(json_path)
+    store['org/model-9'] = {'modality': 'Speech', 'is_large_model': True}
+    _write(tmp_path, 4)
+    assert not store.export_json()
+    assert len(json.loads(json_path.read_text())) == 4
+    store.close()
+    store = InfoStore.from_json(json_path)
+    assert len(store) == 5
+    assert store.export_json()
+    assert len(json.loads(json_path.read_text())) == 5
+    store.close()
+
+
+def test_update_and_export(tmp_path):
+    json_path = _write(tmp_path, 2)
+    store = InfoStore.from_json(json_path)
+    assert not store.export_json()
+    store.update({
+        'org/model-1': {'modality': 'Vision', 'is_large_model': False},
+        'org/model-9': {'modality': 'Speech', 'is_large_model': True},
+    })
+    assert store['org/model-1']['modality'] == 'Vision'
+    assert 'org/model-9' in store
+    assert store.export_json()
+    assert not store.export_json()
+    exported = json.loads(json_path.read_text())
+    assert list(exported) == ['org/model-0', 'org/model-1', 'org/model-9']
+    assert exported == store.to_dict()
+    store.close()
+
+
+def _update_from_other_process(db_path, i):
+    store = InfoStore(db_path)
+    store.update({f'proc/model-{i}-{j}': {'modality': 'Language'} for j in range(50)})
+    store.close()
+
+
+def test_processes_share_store(tmp_path):
+    store = InfoStore.from_json(_write(tmp_path, 1))
+    ctx = multiprocessing.get_context('spawn')
+    procs = [ctx.Process(target=_update_from_other_process, args=(store.path, i)) for i in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert len(store) == 1 + 3 * 50
+    store.close()
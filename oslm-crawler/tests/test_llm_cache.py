@@ -0,0 +1,78 @@
+import time
+from dataclasses import dataclass, asdict
+from oslm_crawler.ai.llm_cache import LLMCache, cached, prompt_hash, record_response
+
+
+@dataclass
+class Info:
+    link: str
+    modality: str | None = None
+    is_large_model: bool | None = None
+
+    def model_dump(self):
+        return asdict(self)
+
+
+def settled(info):
+    return info.is_large_model is not None
+
+
+class FakeLLM:
+
+    def __init__(self, parses=True, leave_out=()):
+        self.asked = []
+        self.parses = parses
+        self.leave_out = leave_out
+
+    def __call__(self, urls):
+        self.asked.append(list(urls))
+        if not self.parses:
+            return [Info(url) for url in urls]
+        record_response(f"raw answer for {len(urls)} links")
+        return [
+            Info(url, 'Language', True) if 'unknown' not in url else Info(url)
+            for url in urls if url not in self.leave_out
+        ]
+
+
+def _classify(tmp_path, llm, **kargs):
+    cache = LLMCache(tmp_path / 'llm-cache.db', **kargs)
+    return cached('fake-model', prompt_hash('prompt v1'), Info, settled, cache=lambda: cache)(llm), cache
+
+
+def test_settled_links_cost_nothing_again(tmp_path):
+    llm = FakeLLM()
+    classify, cache = _classify(tmp_path, llm)
+    first = classify(['https://hf.co/a/m1', 'https://hf.co/a/m2'])
+    assert sorted(i.link for i in first) == ['https://hf.co/a/m1', 'https://hf.co/a/m2']
+    again = classify(['https://hf.co/a/m1/', 'https://hf.co/a/m2', 'https://hf.co/a/m3'])
+    assert llm.asked == [['https://hf.co/a/m1', 'https://hf.co/a/m2'], ['https://hf.co/a/m3']]
+    assert {i.link: i.modality for i in again} == {
+        'https://hf.co/a/m1': 'Language', 'https://hf.co/a/m2': 'Language', 'https://hf.co/a/m3': 'Language'}
+    # Another prompt version asks again.
+    other = cached('fake-model', prompt_hash('prompt v2'), Info, settled, cache=lambda: cache)(llm)
+    other(['https://hf.co/a/m1'])
+    assert llm.asked[-1] == ['https://hf.co/a/m1']
+
+
+def test_negative_results_expire(tmp_path):
+    llm = FakeLLM(leave_out=['https://hf.co/a/gone'])
+    classify, cache = _classify(tmp_path, llm, negative_ttl_days=0.2 / 86400)
+    urls = ['https://hf.co/a/m1', 'https://hf.co/a/unknown', 'https://hf.co/a/gone']
+    res = classify(urls)
+    # The left-out link is not returned, so the processors keep treating it as unclassified.
+    assert sorted(i.link for i in res) == ['https://hf.co/a/m1', 'https://hf.co/a/unknown']
+    res = classify(urls)
+    assert len(llm.asked) == 1
+    assert sorted(i.link for i in res) == ['https://hf.co/a/m1', 'https://hf.co/a/unknown']
+    time.sleep(0.3)
+    classify(urls)
+    assert llm.asked[-1] == ['https://hf.co/a/unknown', 'https://hf.co/a/gone']
+
+
+def test_failed_parse_is_not_cached(tmp_path):
+    llm = FakeLLM(parses=False)
+    classify, cache = _classify(tmp_path, llm)
+    classify(['https://hf.co/a/m1'])
+    classify(['https://hf.co/a/m1'])
+    assert len(llm.asked) == 2
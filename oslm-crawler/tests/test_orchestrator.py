@@ -0,0 +1,74 @@
+import json
+import time
+from pathlib import Path
+from oslm_crawler import budget
+from oslm_crawler.orchestrator import CrawlOrchestrator
+
+
+def fake_pipeline(name, conf, progress):
+    # Holds a driver for a while, like a crawl step would.
+    pbar = progress(total=3, desc=f"Crawling {name}...")
+    assert budget.acquire_driver()
+    start = time.time()
+    try:
+        for _ in range(3):
+            time.sleep(0.2)
+            pbar.update(1)
+        end = time.time()
+    finally:
+        budget.release_driver()
+    pbar.write(f"{name} crawled 3 repos.")
+    pbar.close()
+    (Path(conf['save_dir']) / f'{name}.json').write_text(json.dumps([start, end]))
+
+
+def failing_pipeline(name, conf, progress):
+    if name == 'BAAIDataPipeline':
+        raise RuntimeError("site is down")
+    fake_pipeline(name, conf, progress)
+
+
+def _pipelines(tmp_path):
+    return {
+        name: {'task_name': name, 'save_dir': str(tmp_path)}
+        for name in ['HuggingFacePipeline', 'BAAIDataPipeline']
+    }
+
+
+def _spans(tmp_path):
+    return sorted(json.loads(p.read_text()) for p in tmp_path.glob('*Pipeline.json'))
+
+
+def test_pipelines_run_in_parallel(tmp_path):
+    codes = CrawlOrchestrator(_pipelines(tmp_path), log_dir=tmp_path / 'logs', runner=fake_pipeline).run()
+    assert codes == {'HuggingFacePipeline': 0, 'BAAIDataPipeline': 0}
+    (a_start, a_end), (b_start, b_end) = _spans(tmp_path)
+    assert b_start < a_end
+    assert (tmp_path / 'logs/HuggingFacePipeline.log').exists()
+    assert 'Started BAAIDataPipeline' in (tmp_path / 'logs/orchestrator.log').read_text()
+
+
+def test_driver_budget_is_shared(tmp_path):
+    codes = CrawlOrchestrator(
+        _pipelines(tmp_path), max_drivers=1, log_dir=tmp_path / 'logs', runner=fake_pipeline).run()
+    assert set(codes.values()) == {0}
+    (a_start, a_end), (b_start, b_end) = _spans(tmp_path)
+    # The second pipeline only gets the driver once the first one is done.
+    assert b_start >= a_end
+
+
+def test_failed_pipeline_does_not_stop_others(tmp_path):
+    codes = CrawlOrchestrator(_pipelines(tmp_path), log_dir=tmp_path / 'logs', runner=failing_pipeline).run()
+    assert codes['HuggingFacePipeline'] == 0 and codes['BAAIDataPipeline'] != 0
+    assert 'site is down' in (tmp_path / 'logs/BAAIDataPipeline.log').read_text()
+
+
+def test_shared_log_path_is_split():
+    pipelines = CrawlOrchestrator._separate_logs({
+        'HuggingFacePipeline': {'task_name': 'hf-task', 'log_path': 'logs/run/running.log'},
+        'ModelScopePipeline': {'task_name': 'ms-task', 'log_path': 'logs/run/running.log'},
+        'OpenDataLabPipeline': {'task_name': 'odl-task', 'log_path': None},
+    })
+    assert pipelines['HuggingFacePipeline']['log_path'] == str(Path('logs/run/hf-task/running.log'))
+    assert pipelines['ModelScopePipeline']['log_path'] == str(Path('logs/run/ms-task/running.log'))
+    assert pipelines['OpenDataLabPipeline']['log_path'] is None
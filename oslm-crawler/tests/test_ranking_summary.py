@@ -0,0 +1,43 @@
+import pandas as pd
+from oslm_crawler.ranking.summary import SummaryCube, data_summary, model_summary
+
+DATASETS = pd.DataFrame([
+    {'org': 'BAAI', 'modality': 'Language', 'lifecycle': 'Pre-training', 'downloads_last_month': 10, 'dataset_usage': 1},
+    {'org': 'BAAI', 'modality': 'Vision', 'lifecycle': 'Fine-tuning', 'downloads_last_month': 5, 'dataset_usage': 0},
+    {'org': 'Ali', 'modality': 'Language', 'lifecycle': 'Fine-tuning', 'downloads_last_month': 7, 'dataset_usage': 2},
+    {'org': 'Ali', 'modality': None, 'lifecycle': 'Evaluation', 'downloads_last_month': 100, 'dataset_usage': 0},
+])
+OTHER = pd.DataFrame([
+    {'org': 'Meta', 'modality': 'Vision', 'lifecycle': 'Pre-training'},
+    {'org': 'BAAI', 'modality': 'Vision', 'lifecycle': 'Pre-training'},
+])
+
+
+def test_data_summary_from_one_cube():
+    weights = dict.fromkeys([
+        'num_language', 'num_vision', 'num_3d', 'downloads_language', 'downloads_vision',
+        'num_pretraining', 'num_finetuning', 'downloads_finetuning', 'dataset_usage', 'operators',
+    ], 0)
+    res = data_summary(SummaryCube(DATASETS, 'downloads_last_month', OTHER), weights, ['BAAI', 'Ali', 'Meta'])
+    assert list(res.columns) == list(weights) and res.index.name == 'org'
+    assert res.loc['BAAI'].tolist() == [1, 2, 0, 10, 5, 2, 1, 5, 1, 24]
+    assert res.loc['Ali'].tolist() == [1, 0, 0, 7, 0, 0, 1, 7, 2, 105]
+    # Other-source datasets only count, they have no downloads.
+    assert res.loc['Meta'].tolist() == [0, 1, 0, 0, 0, 1, 0, 0, 0, 0]
+    assert data_summary(SummaryCube(DATASETS, 'downloads_last_month'), {'num_language': 0}, ['all']).index.tolist() == [
+        'BAAI', 'Ali'
+    ]
+
+
+def test_model_summary_accepts_categorical_columns():
+    models = pd.DataFrame({
+        'org': pd.Categorical(['Ali', 'Ali', 'Baidu']),
+        'modality': pd.Categorical(['Language', 'Vector', 'Language'], categories=['Language', 'Vector', 'Speech']),
+        'accumulated_downloads': [3, 4, 5],
+        'likes': [1, 1, 1], 'community': [2, 0, 0], 'descendants': [0, 1, 0],
+    })
+    weights = dict.fromkeys(['num_language', 'num_speech', 'downloads_vector', 'likes', 'issue', 'descendants', 'num_adapted_chips'], 0)
+    res = model_summary(SummaryCube(models, 'accumulated_downloads'), weights, ['Ali', 'Baidu', 'Huawei'])
+    assert res.loc['Ali'].tolist() == [1, 0, 4, 2, 2, 1, 1]
+    assert res.loc['Baidu'].tolist() == [1, 0, 0, 1, 0, 0, 2]
+    assert res.loc['Huawei'].tolist() == [0, 0, 0, 0, 0, 0, 2]
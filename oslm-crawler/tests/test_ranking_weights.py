@@ -0,0 +1,41 @@
+import pytest
+from oslm_crawler.ranking.weights import weight_value, compile_weights, compile_ranking
+
+RANKING = {
+    'data_config': ['average', {'num_language': 0}],
+    'model_config': ['weight', {'downloads_language': '0.6*0.5', 'downloads_vision': '0.6*0.5', 'likes': 0.4}],
+    'ranking_weights': {'data': '0.5/3', 'model': 0.5, 'infra': '0.5/3', 'eval': '0.5/3'},
+    'weights_total': 1,
+}
+
+
+def test_weight_value_is_the_arithmetic_value():
+    for expr in ['0.5/3', '0.6*0.02', '1 - 0.25', '-(1/4) + 1', '(1+2)*3', '2']:
+        assert weight_value(expr) == eval(expr)
+    assert compile_weights({'a': 1, 'b': '1/12', 'c': 0.5}) == {'a': 1, 'b': 1/12, 'c': 0.5}
+
+
+@pytest.mark.parametrize('expr', [
+    "__import__('os').system('true')", 'abs(-1)', 'x', '2**10', '1/0', "'a'", '1;2', 'True', '',
+])
+def test_weight_value_rejects_anything_else(expr):
+    with pytest.raises(ValueError):
+        weight_value(expr)
+
+
+def test_compile_ranking_checks_totals_and_caches():
+    compiled = compile_ranking(RANKING)
+    assert compiled['model_config'] == ['weight', {'downloads_language': 0.3, 'downloads_vision': 0.3, 'likes': 0.4}]
+    assert compiled['ranking_weights']['data'] == 0.5/3
+    # Unchanged input, average weights and the input itself are left as they are.
+    assert compiled['data_config'] == ['average', {'num_language': 0}]
+    assert RANKING['ranking_weights']['data'] == '0.5/3'
+    assert compile_ranking(dict(RANKING)) is compiled
+
+    with pytest.raises(ValueError, match='ranking_weights'):
+        compile_ranking({**RANKING, 'ranking_weights': {**RANKING['ranking_weights'], 'eval': 0.3}})
+    with pytest.raises(ValueError, match='model_config'):
+        compile_ranking({**RANKING, 'model_config': ['weight', {'likes': 0.4}]})
+    # Only `weight` dimensions are checked, and nothing without a total.
+    compile_ranking({**RANKING, 'data_config': ['average', {'num_language': 3}]})
+    compile_ranking({**RANKING, 'weights_total': None, 'model_config': ['weight', {'likes': 0.4}]})
@@ -0,0 +1,66 @@
+import io
+import base64
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+screenshot_checker = pytest.importorskip('oslm_crawler.ai.screenshot_checker')
+from oslm_crawler.ai.screenshot_checker import CheckRequest, CheckResponse, encode_screenshot
+
+
+def _page(path, size, boxes):
+    img = Image.new('RGB', size, 'white')
+    for box in boxes:
+        img.paste((0, 0, 0), box)
+    img.save(path)
+    return str(path)
+
+
+def _decode(encoded):
+    return Image.open(io.BytesIO(base64.b64decode(encoded)))
+
+
+def test_encode_trims_blank_margins(tmp_path):
+    path = _page(tmp_path / 'page.png', (800, 600), [(100, 100, 300, 200)])
+    img = _decode(encode_screenshot(path))
+    assert img.size == (200, 100) and img.mode == 'L'
+
+
+def test_encode_downscales_to_max_side(tmp_path):
+    path = _page(tmp_path / 'page.png', (3000, 1200), [(10, 10, 2990, 20), (10, 1180, 2990, 1190)])
+    # Trimmed to 2980x1180 first.
+    assert _decode(encode_screenshot(path, max_side=1024)).size == (1024, 405)
+    with open(path, 'rb') as f:
+        # Nothing to do, the file goes out as it is.
+        assert encode_screenshot(path, max_side=None) == base64.b64encode(f.read()).decode('utf-8')
+
+
+def test_encode_crops_fractions_of_the_page(tmp_path):
+    path = _page(tmp_path / 'page.png', (1000, 500), [(100, 100, 200, 150), (700, 300, 900, 400)])
+    img = _decode(encode_screenshot(path, crop=(0.5, 0.0, 1.0, 1.0)))
+    # Only the box in the right half is left, trimmed to its bounds.
+    assert img.size == (200, 100)
+
+
+def test_verify_screenshots_encodes_then_checks_one_batch(tmp_path, monkeypatch):
+    batches = []
+
+    def check_image_info(requests):
+        batches.append(requests)
+        return [CheckResponse(req.link, req.source, downloads=7) for req in requests]
+
+    monkeypatch.setattr(screenshot_checker, 'check_image_info', check_image_info)
+    requests = [
+        CheckRequest(_page(tmp_path / f'{i}.png', (400, 300), [(10, 10, 50, 50)]), f'https://ms.cn/{i}', 'ModelScope')
+        for i in range(5)
+    ]
+    requests.insert(2, CheckRequest(str(tmp_path / 'missing.png'), 'https://ms.cn/missing', 'ModelScope'))
+    responses = screenshot_checker.verify_screenshots(requests)
+
+    assert len(batches) == 1
+    assert [req.link for req in batches[0]] == [f'https://ms.cn/{i}' for i in range(5)]
+    assert all(req.img is not None for req in batches[0])
+    by_link = {res.link: res for res in responses}
+    assert len(responses) == 6
+    assert by_link['https://ms.cn/missing'].error is not None
+    assert by_link['https://ms.cn/missing'].downloads is None
+    assert all(by_link[f'https://ms.cn/{i}'].downloads == 7 for i in range(5))
@@ -0,0 +1,77 @@
+import pytest
+from oslm_crawler.database.sqlite import TableInitializer, connect
+from oslm_crawler.pipeline.base import PipelineData
+from oslm_crawler.pipeline.writers import DBWriter
+
+
+def _model(date, downloads, **kargs):
+    return PipelineData({
+        'org': 'Qwen', 'repo': 'Qwen', 'model_name': 'Qwen3-8B', 'modality': 'Language',
+        'downloads_last_month': downloads, 'total_downloads': downloads * 3, 'likes': 1, 'community': 0,
+        'date_crawl': date, 'link': 'https://modelscope.cn/models/Qwen/Qwen3-8B', 'source': 'ModelScope',
+        'img_path': None,
+    } | kargs, None, None)
+
+
+def test_tables_and_indexes(tmp_path):
+    conn = TableInitializer(tmp_path / 'oslm.db')._init_database()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {
+        'hf_models', 'hf_datasets', 'ms_models', 'ms_datasets', 'open_data_lab_datasets', 'baai_data_datasets'}
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list('hf_datasets')")}
+    assert indexes == {'idx_hf_datasets_repo_name_date', 'idx_hf_datasets_org_date'}
+
+
+def test_batched_upserts(tmp_path):
+    path = tmp_path / 'oslm.db'
+    writer = DBWriter(path, batch_size=2, date_enter_db='2025-09-10')
+    for data in [_model('2025-08-07', 10), _model('2025-09-07', 20)]:
+        writer.parse_input(data)
+        assert next(writer.run()).error is None
+    # The second record filled the batch.
+    assert connect(path).execute("SELECT COUNT(*) FROM ms_models").fetchone()[0] == 2
+    writer.parse_input(_model('2025-09-07', 30))
+    next(writer.run())
+    writer.parse_input(PipelineData({
+        'org': 'BAAI', 'repo': 'BAAI', 'dataset_name': 'CCI4.0', 'modality': 'Language', 'lifecycle': 'Pre-training',
+        'downloads_last_month': 5, 'total_downloads': 50, 'likes': 2, 'date_crawl': '2025-09-07',
+        'link': 'https://data.baai.ac.cn/datadetail/CCI4.0', 'source': 'BAAIData',
+    }, None, None))
+    next(writer.run())
+    assert writer.close()
+
+    conn = connect(path)
+    rows = conn.execute(
+        "SELECT date_crawl, downloads_last_month, date_last_crawl, date_enter_db FROM ms_models ORDER BY date_crawl"
+    ).fetchall()
+    assert rows == [('2025-08-07', 10, None, '2025-09-10'), ('2025-09-07', 30, '2025-08-07', '2025-09-10')]
+    assert conn.execute(
+        "SELECT org, total_downloads FROM baai_data_datasets WHERE org = 'BAAI' AND date_crawl = '2025-09-07'"
+    ).fetchall() == [('BAAI', 50)]
+
+
+def test_unknown_source_is_an_error(tmp_path):
+    writer = DBWriter(tmp_path / 'oslm.db')
+    with pytest.raises(KeyError):
+        writer.parse_input(_model('2025-09-07', 1, source='GitHub'))
+    writer.close()
+
+
+def test_failed_batch_reports_every_record(tmp_path):
+    writer = DBWriter(tmp_path / 'oslm.db', batch_size=3)
+    outs = []
+    for data in [_model('2025-07-07', 1), _model('2025-08-07', 2, likes={'bad': 1}), _model('2025-09-07', 3)]:
+        writer.parse_input(data)
+        outs.append(list(writer.run()))
+    assert [len(out) for out in outs] == [1, 1, 3]
+    assert [out.error['input']['date_crawl'] for out in outs[2]] == ['2025-07-07', '2025-08-07', '2025-09-07']
+
+    writer.parse_input(_model('2025-10-07', 4, likes={'bad': 1}))
+    next(writer.run())
+    errors = writer.flush()
+    assert [out.error['input']['date_crawl'] for out in errors] == ['2025-10-07']
+    writer.parse_input(_model('2025-11-07', 5))
+    next(writer.run())
+    assert writer.close()
+    assert connect(tmp_path / 'oslm.db').execute("SELECT COUNT(*) FROM ms_models").fetchone()[0] == 1
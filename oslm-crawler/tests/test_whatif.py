@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from oslm_crawler.ranking.whatif import WhatIf, scenario_config, sensitivity
+
+RANKING = {
+    'data_config': ['average', {'num_language': 0, 'downloads_language': 0}],
+    'model_config': ['weight', {'downloads_language': '0.6', 'likes': 0.4}],
+    'infra_config': ['average', {'num_operators': 0, 'support_lifecycle': 0}],
+    'eval_config': ['average', {'num_leaderboards': 0}],
+    'ranking_weights': {'data': '1/3', 'model': '1/3', 'infra': '1/6', 'eval': '1/6'},
+    'target_orgs': ['all'],
+}
+
+
+def _write(path, rows):
+    pd.DataFrame(rows).set_index('org').to_csv(path)
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    orgs = ['Ali', 'Baidu', 'BAAI']
+    _write(tmp_path / 'data-summary.csv', {'org': orgs, 'num_language': [3, 1, 2], 'downloads_language': [10, 30, 20]})
+    _write(tmp_path / 'model-summary.csv', {'org': orgs, 'downloads_language': [100, 50, 10], 'likes': [1, 9, 5]})
+    _write(tmp_path / 'infra-summary.csv', {
+        'org': orgs + ['Huawei'], 'num_operators': [1, 2, 3, 4], 'support_lifecycle': [4, 3, 2, 1], 'deep_learning_framework': [0, 0, 1, 1],
+    })
+    _write(tmp_path / 'eval-summary.csv', {'org': orgs + ['Huawei'], 'num_leaderboards': [5, 1, 2, 0], 'num_evaluated_models': [1, 1, 1, 1]})
+    return tmp_path
+
+
+def _expected_rank(summary, method, weights):
+    df = summary.div(summary.max())
+    if method == 'average':
+        score = df[[c for c in df.columns if c in weights]].mean(axis=1)
+    else:
+        score = df.mul(pd.Series({k: eval(str(v)) for k, v in weights.items() if k in df.columns})).sum(axis=1)
+    return score.rank(ascending=False, method='dense').astype(int)
+
+
+def test_scenario_config_overrides():
+    config = scenario_config(RANKING, {'ranking_weights': {'eval': 0.3}, 'model_config': {'likes': 1}})
+    assert config['ranking_weights'] == {'data': '1/3', 'model': '1/3', 'infra': '1/6', 'eval': 0.3}
+    assert config['model_config'] == ['weight', {'downloads_language': '0.6', 'likes': 1}]
+    config = scenario_config(RANKING, {'data_config': ['weight', {'num_language': 1}]})
+    assert config['data_config'] == ['weight', {'num_language': 1}]
+    assert RANKING['ranking_weights']['eval'] == '1/6'
+    with pytest.raises(ValueError):
+        scenario_config(RANKING, {'target_orgs': ['Ali']})
+
+
+def test_scenarios_rank_like_the_pipeline(snapshot):
+    scenarios = {
+        'config': {},
+        'data-weight': {'data_config': ['weight', {'num_language': 1}]},
+        'model-only': {'ranking_weights': {'data': 0, 'model': 1, 'infra': 0, 'eval': 0}},
+    }
+    tables = WhatIf(snapshot, RANKING).rank(scenarios)
+    assert list(tables) == list(scenarios)
+    for name, overrides in scenarios.items():
+        config = scenario_config(RANKING, overrides)
+        table = tables[name]
+        # Huawei has no data or model summary.
+        assert table.index.tolist() == ['Ali', 'Baidu', 'BAAI']
+        for dim in ['data', 'model', 'infra', 'eval']:
+            summary = pd.read_csv(snapshot / f'{dim}-summary.csv', index_col='org')
+            if dim in ['infra', 'eval']:
+                summary = summary[summary.columns.intersection(config[f'{dim}_config'][1].keys())]
+            expected = _expected_rank(summary, *config[f'{dim}_config'])
+            assert table[dim].tolist() == expected.loc[table.index].tolist()
+        gains = 1 / np.log2(table[['data', 'model', 'infra', 'eval']] + 1)
+        score = gains.mul({k: eval(str(v)) for k, v in config['ranking_weights'].items()}).sum(axis=1)
+        assert table['score'].tolist() == pytest.approx(score.tolist())
+        assert table['rank'].tolist() == score.rank(ascending=False, method='dense').astype(int).tolist()
+
+    assert tables['model-only']['rank'].tolist() == tables['model-only']['model'].tolist()
+    report = sensitivity(tables)
+    assert report['rank'].tolist() == sorted(report['rank'].tolist())
+    assert (report['spread'] == report['worst'] - report['best']).all()
+    assert report['stable'].tolist() == (report['spread'] == 0).tolist()